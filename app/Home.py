@@ -6,12 +6,11 @@ if str(root_path) not in sys.path:
     sys.path.append(str(root_path))
 
 import streamlit as st
-import pandas as pd
-
-from app.components.data_source import select_data_source
-from src.viz.charts import line_trend, bar_growth
+from app.components.perf_panel import perf_begin, perf_end
+from src.perf import section
 
 st.set_page_config(page_title="Vahan Growth Dashboard", layout="wide")
+perf = perf_begin("home")
 
 # ---- HERO ----
 st.markdown(
@@ -21,68 +20,77 @@ st.markdown(
     """
 )
 
-# ---- DATA SOURCE (same toggle as pages) ----
-df, source = select_data_source("registrations.parquet")
+# Data stack (pandas/pyarrow, ~0.5 s cold) is imported after the hero is sent,
+# so a fresh container paints something before it finishes loading.
+import pandas as pd
+from app.components.data_source import (select_source, select_growth_cube, select_forecasts,
+                                        select_share_index, cached_view)
+from src.data.storage import processed_filters
+from src.analytics import kpis, fastest_category, leaders, projection
+from src.features.growth import cube_slice, ALL_CATEGORIES
+from src.viz.charts import line_trend
 
-# Ensure TOTAL rows exist (for category-wide KPIs)
-if "TOTAL" not in df["manufacturer"].unique():
-    tot = df.groupby(["date","year","quarter","category"], as_index=False)["registrations"].sum()
-    tot["manufacturer"] = "TOTAL"
-    df = pd.concat([df, tot], ignore_index=True)
+# ---- DATA SOURCE (same toggle as pages) ----
+# (only TOTAL rows are needed here; pushed down to the parquet reader)
+with section("load data"):
+    source = select_source()
+    cube = select_growth_cube(source, filters=processed_filters(manufacturers=["TOTAL"]))
 
 # ---- KPI STRIP (latest quarter across all categories) ----
-f = df[df["manufacturer"] == "TOTAL"].copy()
-latest_date = f["date"].max()
-ts_total = f.groupby("date", as_index=True)["registrations"].sum().sort_index()
-
-def pct(new, old):
-    if old is None or pd.isna(old) or old == 0: return None
-    return (new - old) / old * 100
-
-curr = int(ts_total.loc[latest_date])
-qoq = pct(curr, ts_total.shift(1).get(latest_date))
-yoy = pct(curr, ts_total.shift(4).get(latest_date))
+k = kpis(cube)
+if not k:  # e.g. an empty DB backend
+    st.info("No data in selected range.")
+    perf_end(perf)
+    st.stop()
+latest_date = k["date"]
+curr, qoq, yoy = k["registrations"], k["qoq_pct"], k["yoy_pct"]
 
 c1, c2, c3, c4 = st.columns([1,1,1,1])
-c1.metric("Total registrations (latest qtr)", f"{curr:,}", help=str(df.loc[df['date']==latest_date, 'quarter'].iloc[0]))
+c1.metric("Total registrations (latest qtr)", f"{curr:,}", help=k["quarter"])
 c2.metric("QoQ %", f"{qoq:.2f}%" if qoq is not None else "—")
 c3.metric("YoY %", f"{yoy:.2f}%" if yoy is not None else "—")
-c4.write(" ")  # spacer
+# next quarter, all categories (fitted by the pipeline; see src/features/forecast.py)
+nxt = projection(select_forecasts(source), categories=ALL_CATEGORIES)
+if nxt.empty:
+    c4.metric("Next-quarter projection", "—")
+else:
+    p = nxt.iloc[0]
+    c4.metric(f"Projection ({p['quarter']})", f"{int(p['forecast']):,}",
+              delta=f"{p['qoq_pct']:+.2f}% QoQ" if pd.notna(p["qoq_pct"]) else None,
+              help=f"80% range {int(p['lower']):,} – {int(p['upper']):,} ({p['model']})")
 c4.caption("Data source: " + ("Uploaded CSV" if source == "uploaded" else "Mock (processed)"))
 
 st.divider()
 
-# ---- QUICK VIEW: TOTAL trend by category ----
+# ---- QUICK VIEW + INSIGHTS (built once per dataset version; see cached_view) ----
+def build_view():
+    cats = [c for c in cube.index.levels[0] if c != ALL_CATEGORIES]
+    f_cat = cube_slice(cube, categories=cats, manufacturers="TOTAL", end=latest_date)
+    fig = line_trend(f_cat, x="date", y="registrations", color="category", title="")
+
+    # Category YoY
+    top_cat = fastest_category(cube, date=latest_date)
+
+    # Manufacturer YoY / share gain (within each category): lookups in the precomputed share index
+    index = select_share_index(source)
+    mfr_latest = leaders(index, date=latest_date, by="yoy")
+    gainers = leaders(index, date=latest_date, by="gain")
+    return fig, top_cat, mfr_latest, gainers
+
+with section("view: home"):
+    fig, top_cat, mfr_latest, gainers = cached_view("home", source, build_view)
+
 st.subheader("TOTAL registrations — quick trend by category")
-f_cat = df[(df["manufacturer"]=="TOTAL") & (df["date"]<=latest_date)]
-st.plotly_chart(
-    line_trend(f_cat, x="date", y="registrations", color="category", title=""),
-    use_container_width=True
-)
+with section("render: trend chart"):
+    st.plotly_chart(fig, use_container_width=True)
 
-# ---- INSIGHTS: top-growing category & manufacturer (latest quarter) ----
 st.subheader("Quick insights (latest quarter)")
 
-# Category YoY
-f_cat_sorted = f_cat.sort_values("date").copy()
-f_cat_sorted["prev_y"] = f_cat_sorted.groupby("category")["registrations"].shift(4)
-f_cat_sorted["yoy_pct"] = (f_cat_sorted["registrations"] - f_cat_sorted["prev_y"]) / f_cat_sorted["prev_y"] * 100
-cat_latest = (f_cat_sorted[f_cat_sorted["date"]==latest_date]
-              .sort_values("yoy_pct", ascending=False)[["category","yoy_pct"]])
-
-# Manufacturer YoY (within each category)
-f_mfr = df[df["manufacturer"]!="TOTAL"].sort_values("date").copy()
-f_mfr["prev_y"] = f_mfr.groupby(["category","manufacturer"])["registrations"].shift(4)
-f_mfr["yoy_pct"] = (f_mfr["registrations"] - f_mfr["prev_y"]) / f_mfr["prev_y"] * 100
-mfr_latest = (f_mfr[f_mfr["date"]==latest_date]
-              .sort_values("yoy_pct", ascending=False)[["category","manufacturer","yoy_pct"]]
-              .groupby("category", as_index=False).head(1))
-
-colA, colB = st.columns(2)
+colA, colB, colC = st.columns(3)
 with colA:
     st.markdown("**Fastest-growing category (YoY)**")
-    if not cat_latest.empty and pd.notna(cat_latest.iloc[0]["yoy_pct"]):
-        st.success(f"• {cat_latest.iloc[0]['category']} — {cat_latest.iloc[0]['yoy_pct']:.2f}% YoY")
+    if top_cat:
+        st.success(f"• {top_cat['category']} — {top_cat['yoy_pct']:.2f}% YoY")
     else:
         st.info("Insufficient last-year data for YoY.")
 
@@ -96,6 +104,16 @@ with colB:
     else:
         st.info("Insufficient last-year data for YoY.")
 
+with colC:
+    st.markdown("**Biggest market-share gain vs last quarter**")
+    if not gainers.empty:
+        st.markdown("\n".join(
+            f"- {r.category}: **{r.manufacturer}** ({r.share_chg_qoq_pp:+.2f} pp → {r.share_pct:.1f}%)"
+            for r in gainers.itertuples()
+        ))
+    else:
+        st.info("Needs at least two quarters of data.")
+
 st.divider()
 
 # ---- HOW TO USE ----
@@ -104,6 +122,9 @@ st.markdown(
     ### How to use
     - Go to **Overview** for category totals and growth.
     - Go to **Manufacturers** to compare brands and see QoQ/YoY.
+    - Go to **Leaderboard** for market share, ranks and rank movement per quarter.
     - Use the **Data source** switcher (left sidebar) to upload your own CSV or use the mock dataset.
     """
 )
+
+perf_end(perf)
@@ -5,14 +5,85 @@ root_path = Path(__file__).resolve().parents[2]
 if str(root_path) not in sys.path:
     sys.path.append(str(root_path))
 
+import hashlib
+import io
+
 import streamlit as st
-from src.data.storage import load_processed
-from src.data.ingest_upload import parse_uploaded_csv
+from src.cache import LRUCache, _freeze
+from src.config import DATA_BACKEND, UPLOAD_CACHE_MB, VIEW_CACHE_MB
+from src.data.storage import load_processed_cached, dataset_version
+from src.analytics import CUBE_NAME, growth_cube, load_forecasts, load_share_index
+from src.features.forecast import FORECAST_NAME
+from src.features.share import SHARE_NAME
+
+# Parsed uploads, shared by every session in this process and keyed by the
+# sha256 of the file bytes: re-uploads and reruns are hits, and N analysts
+# uploading the same export share one (df, cube) pair.
+UPLOAD_CACHE = LRUCache(max_items=32, max_bytes=UPLOAD_CACHE_MB * 1024 ** 2)
+
+# Derived frames + figures per (view, dataset version, filter state), shared
+# across sessions: a rerun triggered by an unrelated widget, or a second analyst
+# on the same filters, gets the built view back instead of recomputing it.
+# Figures aren't counted in the byte budget; max_items bounds them.
+VIEW_CACHE = LRUCache(max_items=256, max_bytes=VIEW_CACHE_MB * 1024 ** 2)
+
+
+def _parse_upload(up) -> str:
+    """Parse an UploadedFile through the shared cache; returns its content key."""
+    ss = st.session_state
+    # same widget file as last rerun -> reuse the digest instead of re-hashing
+    if ss.get("uploaded_file_id") == up.file_id and ss.get("uploaded_key") in UPLOAD_CACHE:
+        return ss["uploaded_key"]
+    data = up.getvalue()
+    key = hashlib.sha256(data).hexdigest()
+
+    def build():
+        from src.data.ingest_upload import parse_uploaded_csv  # upload path only
+        from src.features.growth import build_growth_cube
+        df = parse_uploaded_csv(io.BytesIO(data))
+        return df, build_growth_cube(df)
 
-def select_data_source(default_parquet="registrations.parquet"):
+    UPLOAD_CACHE.get_or_build(key, build)
+    ss["uploaded_file_id"] = up.file_id
+    return key
+
+
+def select_data_source(default_parquet="registrations.parquet", filters=None, columns=None):
+    """
+    Sidebar source switch + the active source's rows. For the processed
+    dataset, filters/columns are pushed down to the parquet reader (see
+    src.data.storage.processed_filters); uploads are already in memory and
+    come back whole.
+    """
+    return _source_rows(select_source(), default_parquet, filters, columns)
+
+
+def select_series_keys(default_parquet="registrations.parquet"):
+    """
+    Sidebar source switch + one row per (category, manufacturer) with its
+    first_date / last_date, for filter widgets. With DATA_BACKEND=db this is a
+    GROUP BY on the DB's series index, not the full query_growth.
+    """
+    source = select_source()
+    if source == "mock" and DATA_BACKEND == "db":
+        from src.data.db import load_series_keys_db
+        return load_series_keys_db(), source
+    df, source = _source_rows(source, default_parquet, None, ["date", "category", "manufacturer"])
+    keys = cached_view("series_keys", source, lambda: (
+        df.groupby(["category", "manufacturer"], observed=True)["date"]
+        .agg(first_date="min", last_date="max").reset_index()))
+    return keys, source
+
+
+def select_source() -> str:
+    """
+    Sidebar source switch only: "uploaded" when a parsed upload is in
+    UPLOAD_CACHE, else "mock". Reads no data, for pages that work off the
+    cube / share index (select_growth_cube etc.).
+    """
     ss = st.session_state
     ss.setdefault("source_choice", "mock")   # "mock" | "uploaded"
-    ss.setdefault("uploaded_df", None)
+    ss.setdefault("uploaded_key", None)      # sha256 of the bytes -> UPLOAD_CACHE
     ss.setdefault("uploaded_name", "")
 
     st.sidebar.markdown("### Data source")
@@ -30,20 +101,101 @@ def select_data_source(default_parquet="registrations.parquet"):
         )
         if up is not None:
             try:
-                df = parse_uploaded_csv(up)
-                ss["uploaded_df"] = df
+                ss["uploaded_key"] = _parse_upload(up)
                 ss["uploaded_name"] = up.name
             except Exception as e:
                 st.sidebar.error(f"Upload parse failed: {e}")
 
         # Show persistent status + return cached upload if present
-        if ss["uploaded_df"] is not None:
+        cached = UPLOAD_CACHE.get(ss["uploaded_key"]) if ss["uploaded_key"] else None
+        if cached is not None:
             st.sidebar.success(f"Using uploaded CSV: {ss['uploaded_name']}")
-            return ss["uploaded_df"], "uploaded"
+            return "uploaded"
+        if ss["uploaded_key"]:
+            st.sidebar.warning("Uploaded CSV was evicted from the shared cache; please re-upload.")
+            ss["uploaded_key"] = None
 
         st.sidebar.info("No upload yet; using mock processed data temporarily.")
-        return load_processed(default_parquet), "mock"
+        return "mock"
 
     # Using mock
     st.sidebar.info("Using processed mock dataset.")
-    return load_processed(default_parquet), "mock"
\ No newline at end of file
+    return "mock"
+
+
+def select_growth_cube(source, filters=None):
+    """
+    Growth cube for the active source. filters are pushed down for the
+    processed cube; the uploaded cube is returned whole (slice it in memory).
+    """
+    if source == "uploaded":
+        cached = UPLOAD_CACHE.get(st.session_state["uploaded_key"])
+        if cached is None:  # evicted by another session since select_source ran
+            st.warning("Uploaded CSV was evicted from the shared cache; please re-upload.")
+            st.stop()
+        return cached[1]
+    return growth_cube(filters)
+
+
+def select_forecasts(source):
+    """
+    Forecasts for the active source: read from the processed dir, or fitted
+    once per uploaded file (memoized with the views) for uploads.
+    """
+    if source == "uploaded":
+        from src.features.forecast import forecast_cube
+        cube = select_growth_cube(source)
+        return cached_view("forecasts", source, lambda: forecast_cube(cube))
+    return load_forecasts()
+
+
+def select_share_index(source):
+    """Market-share/rank index for the active source (built once per uploaded file)."""
+    if source == "uploaded":
+        from src.features.share import ShareIndex, build_share_index
+        cube = select_growth_cube(source)
+        return cached_view("share_index", source, lambda: ShareIndex(build_share_index(cube)))
+    return load_share_index()
+
+
+def source_version(source, default_parquet="registrations.parquet"):
+    """Hashable token that changes whenever the active source's data does."""
+    if source == "uploaded":
+        return ("uploaded", st.session_state["uploaded_key"])
+    if DATA_BACKEND == "db":
+        from src.data.db import db_version
+        return ("db", db_version())
+    versions = []
+    for name in (default_parquet, CUBE_NAME, FORECAST_NAME, SHARE_NAME):
+        try:
+            versions.append(dataset_version(name))
+        except FileNotFoundError:
+            versions.append(None)
+    return tuple(versions)
+
+
+def cached_view(view: str, source, build, date_range=None, categories=None, manufacturers=None, **params):
+    """
+    build() memoized on (view, source version, date_range, categories,
+    manufacturers, any other filter params). Results are shared between
+    sessions — don't mutate them.
+    """
+    key = (view, source_version(source), _freeze(date_range), _freeze(categories), _freeze(manufacturers),
+           tuple(sorted((k, _freeze(v)) for k, v in params.items())))
+    return VIEW_CACHE.get_or_build(key, build)
+
+
+def _source_rows(source, default_parquet, filters, columns):
+    if source == "uploaded":
+        cached = UPLOAD_CACHE.get(st.session_state["uploaded_key"])
+        if cached is not None:
+            return cached[0], source
+    return _load_processed(default_parquet, filters, columns), "mock"
+
+
+def _load_processed(name, filters, columns):
+    if DATA_BACKEND == "db":
+        # rollups/lags are computed by the database; see src/data/db.py
+        from src.data.db import load_processed_db
+        return load_processed_db(filters, columns)
+    return load_processed_cached(name, filters=filters, columns=columns)
@@ -0,0 +1,20 @@
+# app/components/downloads.py
+import streamlit as st
+from src.export import EXPORT_FORMATS, export_bytes, zip_bundle
+
+
+def download_menu(views: dict, label: str, key: str):
+    """
+    Format picker + download buttons for {file stem: frame}. The first view is
+    the main download; all of them go into the zip bundle. Serialization runs
+    only when a button is clicked (callable data), never on a plain rerun.
+    """
+    fmt = st.radio("Download format", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_fmt")
+    ext, mime, _ = EXPORT_FORMATS[fmt]
+    (name, df), = list(views.items())[:1]
+
+    c1, c2 = st.columns(2)
+    c1.download_button(f"{label} ({fmt})", lambda: export_bytes(df, fmt), f"{name}.{ext}", mime,
+                       key=f"{key}_one", on_click="ignore")
+    c2.download_button(f"All views ({fmt}, zip)", lambda: zip_bundle(views, fmt), f"{key}_views.zip",
+                       "application/zip", key=f"{key}_zip", on_click="ignore")
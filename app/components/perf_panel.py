@@ -0,0 +1,60 @@
+# app/components/perf_panel.py
+import streamlit as st
+from src.perf import Capture, start_recording, stop_recording
+
+_HANDLE_KEY = "_perf_handle"
+
+
+def perf_begin(page: str):
+    """
+    Sidebar "Performance" panel, top half: the opt-in toggles. Call before the
+    page does any work; returns a handle for perf_end (None when disabled, in
+    which case the instrumentation costs ~nothing). Call perf_end before
+    st.stop() too: nothing renders after a stop.
+
+    The handle is kept in session_state, so if the previous run raised before
+    its perf_end, its capture (tracemalloc is process-wide) is stopped here.
+    """
+    _stop(st.session_state.pop(_HANDLE_KEY, None))
+    with st.sidebar.expander("Performance", expanded=False):
+        on = st.toggle("Time this page", key="perf_on")
+        cpu = st.toggle("cProfile (this session's thread)", key="perf_cpu", disabled=not on)
+        mem = st.toggle("tracemalloc (process-wide, slow)", key="perf_mem", disabled=not on)
+        out = st.container()
+    if not on:
+        stop_recording()
+        return None
+    rec = start_recording(page)
+    handle = st.session_state[_HANDLE_KEY] = [rec, Capture(cpu=cpu, memory=mem).start(), out]
+    return handle
+
+
+def perf_end(handle):
+    """Bottom half: fill the panel with this run's timings (and captures, if on)."""
+    if not handle:  # disabled, or already ended
+        return
+    rec, cap, out = handle
+    _stop(handle)
+    with out:
+        st.caption(f"Script run: {rec.elapsed_ms():,.0f} ms, {len(rec.spans)} timed calls")
+        if rec.spans:
+            st.dataframe(rec.summary(), hide_index=True, use_container_width=True)
+        if cap.peak_mb is not None:
+            st.caption(f"Peak traced memory: {cap.peak_mb:,.1f} MB")
+            st.dataframe({"allocated at": [a for a, _ in cap.top_allocations],
+                          "MB": [round(mb, 2) for _, mb in cap.top_allocations]},
+                         hide_index=True, use_container_width=True)
+        if cap.profiler:
+            st.code(cap.profile_text(), language=None)
+
+
+def _stop(handle):
+    # idempotent: the handle is emptied on the first call
+    if not handle:
+        return
+    _, cap, _ = handle
+    handle.clear()
+    try:
+        cap.stop()
+    finally:
+        stop_recording()
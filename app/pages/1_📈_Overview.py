@@ -6,18 +6,36 @@ if str(root_path) not in sys.path:
     sys.path.append(str(root_path))
 
 import streamlit as st
-import pandas as pd
-from app.components.data_source import select_data_source
+from app.components.perf_panel import perf_begin, perf_end
+from src.perf import section
+
+perf = perf_begin("overview")
+st.title("Overview")
+st.caption("Totals by category (shows the TOTAL rollup; use Manufacturers page for brand drill-down).")
+
+# data stack imported after the header is sent (see Home.py)
+from app.components.data_source import select_source, select_growth_cube, select_forecasts, cached_view
+from app.components.downloads import download_menu
+from src.data.storage import processed_filters
+from src.analytics import latest_rows, summarize, snapshot, projection
+from src.features.growth import cube_slice, ALL_CATEGORIES
 from src.viz.charts import line_trend, bar_growth
 
 # Load data (Mock parquet or Uploaded CSV)
-df, source = select_data_source("registrations.parquet")
+# (TOTAL rows only; pushed down to the parquet reader)
+total_only = processed_filters(manufacturers=["TOTAL"])
+with section("load data"):
+    source = select_source()
+    cube = select_growth_cube(source, filters=total_only)
 
-st.title("Overview")
-st.caption("Totals by category (shows the TOTAL rollup; use Manufacturers page for brand drill-down).")
+if cube.empty:  # e.g. an empty DB backend
+    st.info("No data in selected range.")
+    perf_end(perf)
+    st.stop()
 
 # --- Filters ---
-min_date, max_date = df["date"].min(), df["date"].max()
+dates = cube.index.levels[2]
+min_date, max_date = dates.min(), dates.max()
 date_range = st.slider(
     "Date range",
     min_value=min_date.to_pydatetime(),
@@ -26,82 +44,90 @@ date_range = st.slider(
     format="YYYY-MM-DD",
 )
 
-cats = sorted(df["category"].unique().tolist())
+cats = sorted(c for c in cube.index.levels[0] if c != ALL_CATEGORIES)
 sel_cats = st.multiselect("Vehicle categories", cats, default=cats)
 
-# Apply filters — use only TOTAL manufacturer here
-f = df[
-    (df["date"] >= pd.to_datetime(date_range[0])) &
-    (df["date"] <= pd.to_datetime(date_range[1])) &
-    (df["category"].isin(sel_cats)) &
-    (df["manufacturer"] == "TOTAL")
-].copy()
+# Derived frames + figures for this filter state (memoized; see cached_view)
+def build_view():
+    # Apply filters — use only TOTAL manufacturer here
+    f = cube_slice(cube, categories=sel_cats, manufacturers="TOTAL",
+                   start=date_range[0], end=date_range[1])
+    if f.empty:
+        return f, None, None, None, None, None
+    latest = latest_rows(f)
+
+    fig1 = line_trend(f, x="date", y="registrations", color="category", title="TOTAL registrations over time")
+    yoy_latest = latest[["category", "yoy_pct"]]
+    fig2 = bar_growth(yoy_latest, x="category", y="yoy_pct", color=None, title="YoY % by category (TOTAL)")
+
+    snap = snapshot(latest, by="category").rename(columns={
+        "category": "Category",
+        "registrations": "Registrations (latest qtr)",
+        "qoq_pct": "QoQ %",
+        "yoy_pct": "YoY %"
+    })
+
+    # next quarter per category (precomputed by the pipeline; see src/features/forecast.py)
+    proj = projection(select_forecasts(source), categories=sel_cats).drop(columns=["date", "manufacturer"])
+    proj = proj.rename(columns={
+        "category": "Category",
+        "quarter": "Quarter",
+        "forecast": "Projection",
+        "lower": "Low (80%)",
+        "upper": "High (80%)",
+        "qoq_pct": "QoQ %",
+        "yoy_pct": "YoY %",
+        "model": "Model",
+        "backtest_mape_pct": "Backtest MAPE %"
+    })
+    return f, latest, fig1, fig2, snap, proj
+
+with section("view: overview"):
+    f, latest, fig1, fig2, snap, proj = cached_view("overview", source, build_view,
+                                                    date_range=date_range, categories=sel_cats)
 
 if f.empty:
     st.info("No data in selected range.")
+    perf_end(perf)
     st.stop()
 
 # --- KPIs for latest quarter (sum across selected categories) ---
-latest_date = f["date"].max()
-ts_total = f.groupby("date", as_index=True)["registrations"].sum().sort_index()
-
-curr_val = int(ts_total.loc[latest_date])
-prev_q_val = ts_total.shift(1).get(latest_date, None)
-prev_y_val = ts_total.shift(4).get(latest_date, None)
+k = summarize(latest)
 
-def fmt_pct(new, old):
-    if old is None or pd.isna(old) or old == 0:
-        return "—"
-    return f"{(new - old) / old * 100:.2f}%"
+def fmt_pct(p):
+    return "—" if p is None else f"{p:.2f}%"
 
 k1, k2, k3 = st.columns(3)
-k1.metric("Total registrations (latest quarter)", f"{curr_val:,}", help=str(f[f['date']==latest_date]['quarter'].iloc[0]))
-k2.metric("QoQ %", fmt_pct(curr_val, prev_q_val))
-k3.metric("YoY %", fmt_pct(curr_val, prev_y_val))
+k1.metric("Total registrations (latest quarter)", f"{k['registrations']:,}", help=k["quarter"])
+k2.metric("QoQ %", fmt_pct(k["qoq_pct"]))
+k3.metric("YoY %", fmt_pct(k["yoy_pct"]))
 
 st.divider()
 
 # --- Trend: TOTAL by category
 st.subheader("Trend — TOTAL by category")
-fig1 = line_trend(f, x="date", y="registrations", color="category", title="TOTAL registrations over time")
-st.plotly_chart(fig1, use_container_width=True)
+with section("render: trend chart"):
+    st.plotly_chart(fig1, use_container_width=True)
 
 # --- YoY growth by category (latest quarter)
 st.subheader("YoY growth by category (latest quarter)")
-f_sorted = f.sort_values("date")
-f_sorted["prev_y"] = f_sorted.groupby("category")["registrations"].shift(4)
-f_sorted["yoy_pct"] = (f_sorted["registrations"] - f_sorted["prev_y"]) / f_sorted["prev_y"] * 100
-yoy_latest = (
-    f_sorted[f_sorted["date"] == latest_date]
-    .groupby("category", as_index=False)["yoy_pct"]
-    .mean()
-)
-fig2 = bar_growth(yoy_latest, x="category", y="yoy_pct", color=None, title="YoY % by category (TOTAL)")
-st.plotly_chart(fig2, use_container_width=True)
+with section("render: YoY chart"):
+    st.plotly_chart(fig2, use_container_width=True)
 
 # --- Category snapshot (latest quarter) ---
 st.subheader("Latest-quarter snapshot (by category)")
-fs = f.sort_values("date").copy()
-fs["prev_q"] = fs.groupby("category")["registrations"].shift(1)
-fs["qoq_pct"] = (fs["registrations"] - fs["prev_q"]) / fs["prev_q"] * 100
-fs["prev_y"] = fs.groupby("category")["registrations"].shift(4)
-fs["yoy_pct"] = (fs["registrations"] - fs["prev_y"]) / fs["prev_y"] * 100
-
-snap = (
-    fs[fs["date"] == latest_date][["category", "registrations", "qoq_pct", "yoy_pct"]]
-    .rename(columns={
-        "category": "Category",
-        "registrations": "Registrations (latest qtr)",
-        "qoq_pct": "QoQ %",
-        "yoy_pct": "YoY %"
-    })
-    .sort_values("Registrations (latest qtr)", ascending=False)
-)
+with section("render: snapshot table"):
+    st.dataframe(snap, use_container_width=True)
+
+# --- Next-quarter projection by category ---
+st.subheader("Next-quarter projection (by category)")
+if proj.empty:
+    st.info("No projections for this dataset.")
+else:
+    st.dataframe(proj, use_container_width=True, hide_index=True)
 
-snap["QoQ %"] = snap["QoQ %"].round(2)
-snap["YoY %"] = snap["YoY %"].round(2)
-st.dataframe(snap, use_container_width=True)
+# Download current TOTAL-filtered data (serialized on click)
+download_menu({"total_filtered": f, "category_snapshot": snap, "category_projection": proj},
+              "Download filtered TOTAL data", key="overview")
 
-# Download current TOTAL-filtered data
-csv_bytes = f.to_csv(index=False).encode("utf-8")
-st.download_button("Download filtered TOTAL data (CSV)", csv_bytes, "total_filtered.csv", "text/csv")
+perf_end(perf)
@@ -6,18 +6,33 @@ if str(root_path) not in sys.path:
     sys.path.append(str(root_path))
 
 import streamlit as st
-import pandas as pd
-from app.components.data_source import select_data_source
+from app.components.perf_panel import perf_begin, perf_end
+from src.perf import section
+
+perf = perf_begin("manufacturers")
+st.title("Manufacturers")
+st.caption("Drill-down by manufacturer with QoQ/YoY growth.")
+
+# data stack imported after the header is sent (see Home.py)
+from app.components.data_source import select_series_keys, select_growth_cube, select_forecasts, cached_view
+from app.components.downloads import download_menu
+from src.data.storage import processed_filters
+from src.analytics import latest_rows, snapshot, projection
+from src.features.growth import cube_slice
 from src.viz.charts import line_trend, bar_growth
 
 # Load data (Mock parquet or Uploaded CSV)
-df, source = select_data_source("registrations.parquet")
+# (only the series and their date spans here; growth rows are read per selection below)
+with section("load data"):
+    keys, source = select_series_keys("registrations.parquet")
 
-st.title("Manufacturers")
-st.caption("Drill-down by manufacturer with QoQ/YoY growth.")
+if keys.empty:  # e.g. an empty DB backend
+    st.info("No data for selected filters.")
+    perf_end(perf)
+    st.stop()
 
 # --- Filters ---
-min_date, max_date = df["date"].min(), df["date"].max()
+min_date, max_date = keys["first_date"].min(), keys["last_date"].max()
 date_range = st.slider(
     "Date range",
     min_value=min_date.to_pydatetime(),
@@ -26,65 +41,88 @@ date_range = st.slider(
     format="YYYY-MM-DD",
 )
 
-cats = sorted(df["category"].unique().tolist())
+cats = sorted(keys["category"].unique().tolist())
 sel_cats = st.multiselect("Vehicle categories", cats, default=cats)
 
-mf_all = sorted(df[df["category"].isin(sel_cats)]["manufacturer"].unique().tolist())
+mf_all = sorted(keys[keys["category"].isin(sel_cats)]["manufacturer"].unique().tolist())
 mf_all = [m for m in mf_all if m != "TOTAL"]
 default_mf = mf_all[:3] if len(mf_all) >= 3 else mf_all
 sel_mfrs = st.multiselect("Manufacturers", mf_all, default=default_mf)
 
-# Apply filters
-f = df[
-    (df["date"] >= pd.to_datetime(date_range[0])) &
-    (df["date"] <= pd.to_datetime(date_range[1])) &
-    (df["category"].isin(sel_cats)) &
-    (df["manufacturer"].isin(sel_mfrs))
-].copy()
+# Derived frames + figures for this filter state (memoized; see cached_view)
+def build_view():
+    # Apply filters (pushed down for the processed cube, then sliced by index)
+    cube = select_growth_cube(source, filters=processed_filters(categories=sel_cats, manufacturers=sel_mfrs))
+    f = cube_slice(cube, categories=sel_cats, manufacturers=sel_mfrs,
+                   start=date_range[0], end=date_range[1])
+    if f.empty:
+        return f, None, None, None, None
+
+    # QoQ/YoY come precomputed from the growth cube
+    latest = latest_rows(f)
+    fig1 = line_trend(f, x="date", y="registrations", color="manufacturer", title="Registrations over time")
+
+    yoy_latest = (
+        latest.groupby("manufacturer", as_index=False, observed=True)["yoy_pct"]
+        .mean()
+        .sort_values("yoy_pct", ascending=False)
+    )
+    fig2 = bar_growth(yoy_latest, x="manufacturer", y="yoy_pct", color=None, title="YoY % (latest)")
+
+    snap_m = snapshot(latest, by="manufacturer").rename(columns={
+        "manufacturer": "Manufacturer",
+        "registrations": "Registrations (latest qtr)",
+        "qoq_pct": "QoQ %",
+        "yoy_pct": "YoY %"
+    })
+
+    # next quarter per selected manufacturer (precomputed by the pipeline)
+    proj_m = projection(select_forecasts(source), categories=sel_cats, manufacturers=sel_mfrs)
+    proj_m = proj_m.drop(columns=["date"]).rename(columns={
+        "category": "Category",
+        "manufacturer": "Manufacturer",
+        "quarter": "Quarter",
+        "forecast": "Projection",
+        "lower": "Low (80%)",
+        "upper": "High (80%)",
+        "qoq_pct": "QoQ %",
+        "yoy_pct": "YoY %",
+        "model": "Model",
+        "backtest_mape_pct": "Backtest MAPE %"
+    })
+    return f, fig1, fig2, snap_m, proj_m
+
+with section("view: manufacturers"):
+    f, fig1, fig2, snap_m, proj_m = cached_view("manufacturers", source, build_view, date_range=date_range,
+                                                categories=sel_cats, manufacturers=sel_mfrs)
 
 if f.empty:
     st.info("No data for selected filters.")
+    perf_end(perf)
     st.stop()
 
-# Compute QoQ/YoY (per manufacturer within category)
-f_sorted = f.sort_values("date").copy()
-f_sorted["prev_q"] = f_sorted.groupby(["category", "manufacturer"])["registrations"].shift(1)
-f_sorted["qoq_pct"] = (f_sorted["registrations"] - f_sorted["prev_q"]) / f_sorted["prev_q"] * 100
-f_sorted["prev_y"] = f_sorted.groupby(["category", "manufacturer"])["registrations"].shift(4)
-f_sorted["yoy_pct"] = (f_sorted["registrations"] - f_sorted["prev_y"]) / f_sorted["prev_y"] * 100
-
-latest_date = f_sorted["date"].max()
-latest = f_sorted[f_sorted["date"] == latest_date]
-
 st.subheader("Registrations over time (selected manufacturers)")
-fig1 = line_trend(f, x="date", y="registrations", color="manufacturer", title="Registrations over time")
-st.plotly_chart(fig1, use_container_width=True)
+with section("render: trend chart"):
+    st.plotly_chart(fig1, use_container_width=True)
 
 st.subheader("YoY % (latest quarter)")
-yoy_latest = (
-    latest.groupby("manufacturer", as_index=False)["yoy_pct"]
-    .mean()
-    .sort_values("yoy_pct", ascending=False)
-)
-fig2 = bar_growth(yoy_latest, x="manufacturer", y="yoy_pct", color=None, title="YoY % (latest)")
-st.plotly_chart(fig2, use_container_width=True)
+with section("render: YoY chart"):
+    st.plotly_chart(fig2, use_container_width=True)
 
 # --- Manufacturer snapshot (latest quarter) ---
 st.subheader("Latest-quarter snapshot (selected manufacturers)")
-snap_m = (
-    latest[["manufacturer", "registrations", "qoq_pct", "yoy_pct"]]
-    .rename(columns={
-        "manufacturer": "Manufacturer",
-        "registrations": "Registrations (latest qtr)",
-        "qoq_pct": "QoQ %",
-        "yoy_pct": "YoY %"
-    })
-    .sort_values("Registrations (latest qtr)", ascending=False)
-)
-snap_m["QoQ %"] = snap_m["QoQ %"].round(2)
-snap_m["YoY %"] = snap_m["YoY %"].round(2)
-st.dataframe(snap_m, use_container_width=True)
+with section("render: snapshot table"):
+    st.dataframe(snap_m, use_container_width=True)
+
+# --- Next-quarter projection (selected manufacturers) ---
+st.subheader("Next-quarter projection (selected manufacturers)")
+if proj_m.empty:
+    st.info("No projections for the selected manufacturers.")
+else:
+    st.dataframe(proj_m, use_container_width=True, hide_index=True)
+
+# Download current filtered data (selected manufacturers; serialized on click)
+download_menu({"manufacturers_filtered": f, "manufacturer_snapshot": snap_m, "manufacturer_projection": proj_m},
+              "Download filtered manufacturer data", key="manufacturers")
 
-# Download current filtered data (selected manufacturers)
-csv_bytes = f_sorted.to_csv(index=False).encode("utf-8")
-st.download_button("Download filtered manufacturer data (CSV)", csv_bytes, "manufacturers_filtered.csv", "text/csv")
+perf_end(perf)
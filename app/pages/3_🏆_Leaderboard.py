@@ -0,0 +1,84 @@
+# --- make 'src' importable when Streamlit runs this page ---
+import sys
+from pathlib import Path
+root_path = Path(__file__).resolve().parents[2]  # project root
+if str(root_path) not in sys.path:
+    sys.path.append(str(root_path))
+
+import streamlit as st
+from app.components.perf_panel import perf_begin, perf_end
+from src.perf import section
+
+perf = perf_begin("leaderboard")
+st.title("Leaderboard")
+st.caption("Market share of category TOTAL, rank and rank movement per quarter (precomputed share index).")
+
+# data stack imported after the header is sent (see Home.py)
+from app.components.data_source import select_source, select_share_index, cached_view
+from app.components.downloads import download_menu
+from src.analytics import leaderboard
+from src.features.growth import ALL_CATEGORIES
+from src.viz.charts import bar_growth
+
+# Sidebar source switch (no rows loaded); everything below reads the share index
+with section("load data"):
+    source = select_source()
+    index = select_share_index(source)
+
+if not len(index):
+    st.info("No manufacturer rows in this dataset.")
+    perf_end(perf)
+    st.stop()
+
+# --- Filters ---
+quarters = {d.strftime("%Y-%m-%d"): d for d in index.dates[::-1]}
+c1, c2, c3, c4 = st.columns([1, 1, 1, 1])
+date = quarters[c1.selectbox("Quarter ending", list(quarters))]
+cats = index.categories(date)
+category = c2.selectbox("Category", cats, index=cats.index(ALL_CATEGORIES) if ALL_CATEGORIES in cats else 0,
+                        help="ALL ranks manufacturers across categories")
+orders = {"Market share": "share", "YoY %": "yoy", "Share gain (QoQ)": "gain"}
+by = orders[c3.radio("Order by", list(orders), horizontal=True)]
+n = c4.slider("Top N", 3, 50, 10)
+
+# Derived frames + figure for this filter state (memoized; see cached_view)
+def build_view():
+    full = index.leaderboard(category, date=date)
+    hhi = float((full["share_pct"].astype(float) ** 2).sum())
+    top = leaderboard(index, category=category, date=date, n=n, by=by)
+    fig = bar_growth(top, x="manufacturer", y="share_pct", color=None, title="Market share % (of category TOTAL)")
+    table = top.drop(columns=["date", "quarter", "category"]).rename(columns={
+        "rank": "Rank",
+        "rank_change": "Rank Δ (QoQ)",
+        "manufacturer": "Manufacturer",
+        "registrations": "Registrations",
+        "share_pct": "Share %",
+        "share_chg_qoq_pp": "Share Δ QoQ (pp)",
+        "share_chg_yoy_pp": "Share Δ YoY (pp)",
+        "qoq_pct": "QoQ %",
+        "yoy_pct": "YoY %"
+    }).round(2)
+    return full.iloc[0] if len(full) else None, len(full), hhi, fig, table
+
+with section("view: leaderboard"):
+    leader, n_mfrs, hhi, fig, table = cached_view("leaderboard", source, build_view, date_range=date,
+                                                  categories=category, by=by, n=n)
+
+k1, k2, k3 = st.columns(3)
+if leader is not None:
+    k1.metric("Leader", str(leader["manufacturer"]), help=f"{leader['share_pct']:.1f}% share")
+k2.metric("Manufacturers", f"{n_mfrs:,}")
+k3.metric("Concentration (HHI)", f"{hhi:,.0f}", help="Sum of squared shares: <1,500 competitive, >2,500 concentrated")
+
+st.divider()
+
+with section("render: share chart"):
+    st.plotly_chart(fig, use_container_width=True)
+
+st.subheader(f"Top {n} — {category}, quarter ending {date:%Y-%m-%d}")
+with section("render: leaderboard table"):
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+download_menu({"leaderboard": table}, "Download leaderboard", key="leaderboard")
+
+perf_end(perf)
@@ -0,0 +1,57 @@
+"""
+Figure payload and build time for line_trend: raw plotly.express (every point,
+every series, SVG) vs the capped/downsampled/WebGL path.
+
+    python -m benchmarks.bench_charts --series 20 300 --points 120 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from src.viz.charts import line_trend
+from src.utils import get_logger
+
+log = get_logger("bench_charts")
+
+
+def make_series(n_series: int, n_points: int, seed: int = 0) -> pd.DataFrame:
+    """n_series random walks of n_points daily observations each."""
+    rs = np.random.default_rng(seed)
+    steps = rs.normal(0, 1, (n_series, n_points)).cumsum(axis=1)
+    level = rs.integers(1_000, 100_000, n_series)[:, None]
+    return pd.DataFrame({
+        "date": np.tile(pd.date_range("2010-01-01", periods=n_points, freq="D"), n_series),
+        "manufacturer": pd.Categorical(np.repeat(np.char.add("M", np.arange(n_series).astype(str)), n_points)),
+        "registrations": np.maximum(level + steps * level * 0.01, 0).ravel().round(),
+    })
+
+
+def _build(fn, df):
+    t0 = time.perf_counter()
+    fig = fn(df)
+    payload = len(fig.to_json())
+    return time.perf_counter() - t0, payload, sum(len(t.x) for t in fig.data), len(fig.data)
+
+
+def main(series_counts, point_counts):
+    log.info(f"{'series':>7} {'points':>7} | {'raw MB':>7} {'raw s':>6} {'traces':>6} | "
+             f"{'new MB':>7} {'new s':>6} {'traces':>6} {'pts':>7} {'gl':>3}")
+    for s in series_counts:
+        for n in point_counts:
+            df = make_series(s, n)
+            raw = _build(lambda d: px.line(d, x="date", y="registrations", color="manufacturer"), df)
+            new = _build(lambda d: line_trend(d, color="manufacturer"), df)
+            gl = line_trend(df, color="manufacturer").data[0].type == "scattergl"
+            log.info(f"{s:>7} {n:>7} | {raw[1] / 1e6:>7.2f} {raw[0]:>6.2f} {raw[3]:>6} | "
+                     f"{new[1] / 1e6:>7.2f} {new[0]:>6.2f} {new[3]:>6} {new[2]:>7,} {'y' if gl else 'n':>3}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--series", type=int, nargs="+", default=[20, 300])
+    ap.add_argument("--points", type=int, nargs="+", default=[120, 5_000])
+    args = ap.parse_args()
+    main(args.series, args.points)
@@ -0,0 +1,31 @@
+"""
+Export cost per format on a processed-shaped frame: time to serialize and
+file size (CSV is what every rerun used to pay for, clicked or not).
+
+    python -m benchmarks.bench_export --rows 100000 1000000
+"""
+import argparse
+import time
+
+from benchmarks.bench_memory import compact_processed, raw_frame
+from src.export import EXPORT_FORMATS
+from src.utils import get_logger
+
+log = get_logger("bench_export")
+
+
+def main(sizes):
+    log.info(f"{'rows':>10} {'format':>10} {'seconds':>8} {'MB':>8}")
+    for n in sizes:
+        df = compact_processed(raw_frame(n))
+        for fmt, (_, _, serialize) in EXPORT_FORMATS.items():
+            t0 = time.perf_counter()
+            data = serialize(df)
+            log.info(f"{len(df):>10,} {fmt:>10} {time.perf_counter() - t0:>8.2f} {len(data) / 1024 ** 2:>8.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = ap.parse_args()
+    main(args.rows)
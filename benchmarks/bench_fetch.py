@@ -0,0 +1,42 @@
+"""
+Vahan fetch throughput against the local mock server: one session at a time
+(the old script's shape) vs N concurrent sessions, same simulated latency.
+
+    python -m benchmarks.bench_fetch --jobs 48 --latency 0.25 --concurrency 1 8
+"""
+import argparse
+import tempfile
+import time
+
+from src.data.fetch import DEFAULT_URL_TEMPLATE, fetch_from_vahan, make_jobs
+from src.data.mock_vahan import serve_mock_vahan
+from src.utils import get_logger
+
+log = get_logger("bench_fetch")
+
+
+def main(n_jobs: int, latency: float, fail_rate: float, concurrency_levels):
+    months = max(1, n_jobs // 3)
+    end = f"{2020 + (months - 1) // 12}-{(months - 1) % 12 + 1:02d}"
+    jobs = make_jobs(["KA"], ["2W", "3W", "4W"], "2020-01", end)
+    with serve_mock_vahan(latency=latency, fail_rate=fail_rate) as base:
+        template = DEFAULT_URL_TEMPLATE.replace("{base}", base)
+        log.info(f"{len(jobs)} report(s), {latency}s latency, {fail_rate:.0%} failures")
+        log.info(f"{'concurrency':>12} {'seconds':>10} {'reports/s':>10} {'rows':>8}")
+        for c in concurrency_levels:
+            with tempfile.TemporaryDirectory() as tmp:  # fresh checkpoints: no resume
+                t0 = time.perf_counter()
+                df = fetch_from_vahan(jobs, url_template=template, mode="http", concurrency=c,
+                                      rate=0, retries=5, backoff=0.05, out_dir=tmp)
+                dt = time.perf_counter() - t0
+            log.info(f"{c:>12} {dt:>10.2f} {len(jobs) / dt:>10.1f} {len(df):>8,}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--jobs", type=int, default=48)
+    ap.add_argument("--latency", type=float, default=0.25)
+    ap.add_argument("--fail-rate", type=float, default=0.05)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    args = ap.parse_args()
+    main(args.jobs, args.latency, args.fail_rate, args.concurrency)
@@ -0,0 +1,72 @@
+"""
+Growth engine vs the original sort+groupby+shift functions.
+
+    python -m benchmarks.bench_growth --sizes 100000 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.features.growth import add_growth
+from src.utils import get_logger
+
+log = get_logger("bench_growth")
+
+N_QUARTERS = 40
+
+
+def _legacy_add_qoq(df, group_cols=("category","manufacturer")):
+    df = df.sort_values(["date"]).copy()
+    df["prev_q"] = df.groupby(list(group_cols))["registrations"].shift(1)
+    df["qoq_pct"] = (df["registrations"] - df["prev_q"]) / df["prev_q"] * 100
+    return df
+
+
+def _legacy_add_yoy(df, group_cols=("category","manufacturer")):
+    df = df.sort_values(["date"]).copy()
+    df["prev_y"] = df.groupby(list(group_cols))["registrations"].shift(4)
+    df["yoy_pct"] = (df["registrations"] - df["prev_y"]) / df["prev_y"] * 100
+    return df
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """n_rows quarterly rows in ensure_quarter_order order (category, manufacturer, date)."""
+    rs = np.random.default_rng(seed)
+    n_groups = max(n_rows // N_QUARTERS, 1)
+    g = np.repeat(np.arange(n_groups), N_QUARTERS)[:n_rows]
+    q = np.tile(np.arange(N_QUARTERS), n_groups)[:n_rows]
+    dates = pd.period_range("2016Q1", periods=N_QUARTERS, freq="Q").to_timestamp(how="end").normalize()
+    return pd.DataFrame({
+        "date": dates[q],
+        "category": pd.Categorical(np.array(["2W", "3W", "4W"])[g % 3]),
+        "manufacturer": pd.Categorical(np.char.add("M", (g // 3).astype(str))),
+        "registrations": rs.integers(1_000, 100_000, n_rows),
+    })
+
+
+def _time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(sizes, repeat):
+    log.info(f"{'rows':>12} {'legacy qoq+yoy (s)':>20} {'add_growth (s)':>16} {'speedup':>8}")
+    for n in sizes:
+        df = make_frame(n)
+        legacy = _time(lambda d: _legacy_add_yoy(_legacy_add_qoq(d)), df, repeat=repeat)
+        engine = _time(add_growth, df, repeat=repeat)
+        log.info(f"{n:>12,} {legacy:>20.3f} {engine:>16.3f} {legacy / engine:>7.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    main(args.sizes, args.repeat)
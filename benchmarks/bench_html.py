@@ -0,0 +1,72 @@
+"""
+Report-table extraction on saved HTML pages: pd.read_html(flavor="bs4") over
+every table (the old extract_biggest_table) vs the lxml single-table parser.
+
+    python -m benchmarks.bench_html --rows 1000 10000 50000
+    python -m benchmarks.bench_html --html data/raw/saved_report.html
+"""
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data.fetch import extract_biggest_table
+from src.data.mock_vahan import render_report
+from src.utils import get_logger
+
+log = get_logger("bench_html")
+
+
+def _legacy_extract(html: str) -> pd.DataFrame:
+    tables = pd.read_html(io.StringIO(html), flavor="bs4")
+    tables.sort(key=lambda d: (d.shape[0], d.shape[1]), reverse=True)
+    return tables[0]
+
+
+def write_fixtures(out_dir: Path, sizes) -> list:
+    """Mock report pages with n maker rows each, saved as .html files."""
+    paths = []
+    for n in sizes:
+        p = out_dir / f"report_{n}.html"
+        p.write_text(render_report("KA", "2W", 2024, 1, n_makers=n), encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def _time(fn, html, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(paths, repeat: int):
+    log.info(f"{'page':<24} {'KB':>8} {'rows':>8} {'read_html s':>12} {'lxml s':>8} {'speedup':>8}")
+    for p in paths:
+        html = Path(p).read_text(encoding="utf-8")
+        t_old, old = _time(_legacy_extract, html, repeat)
+        t_new, new = _time(extract_biggest_table, html, repeat)
+        # same table, same values (read_html also coerces "12,345" -> 12345)
+        pd.testing.assert_frame_equal(new.reset_index(drop=True), old.reset_index(drop=True),
+                                      check_dtype=False, check_column_type=False)
+        log.info(f"{Path(p).name:<24} {len(html) / 1024:>8.0f} {len(new):>8,} "
+                 f"{t_old:>12.3f} {t_new:>8.3f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 50_000],
+                    help="maker rows per generated fixture page")
+    ap.add_argument("--html", nargs="+", default=None, help="saved report pages to use instead")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    if args.html:
+        main(args.html, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            main(write_fixtures(Path(tmp), args.rows), args.repeat)
@@ -0,0 +1,82 @@
+"""
+Cold-start guard: import time of each entry point in a fresh interpreter, and
+which heavy modules it pulls in. Exits 1 if an entry point loads a module it
+is supposed to defer (e.g. pandas for `04_process_csv --help`).
+
+    python -m benchmarks.bench_import --repeat 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from src.utils import get_logger
+
+log = get_logger("bench_import")
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ["pandas", "numpy", "pyarrow", "plotly.express", "sqlalchemy", "selenium", "webdriver_manager",
+         "requests", "lxml", "src.data.ingest_upload"]
+DATA_STACK = ["pandas", "numpy", "pyarrow"]
+
+# (label, python statements to time, modules that must NOT be loaded afterwards)
+CASES = [
+    ("import src.config", "import src.config", DATA_STACK + ["dotenv"]),
+    ("import src.perf", "import src.perf", DATA_STACK),
+    ("app first paint", "import streamlit, app.components.perf_panel, src.perf", DATA_STACK + ["plotly.express"]),
+    ("import src.viz.charts", "import src.viz.charts", ["plotly.express"]),
+    ("import data_source", "import app.components.data_source", ["plotly.express", "src.data.ingest_upload"]),
+    ("03_fetch --help", "_main('scripts.03_fetch_vahan_selenium')", DATA_STACK + ["selenium", "requests", "lxml"]),
+    ("04_process_csv --help", "_main('scripts.04_process_csv')", DATA_STACK),
+    ("06_generate --help", "_main('scripts.06_generate_synthetic')", DATA_STACK),
+    ("07_forecast --help", "_main('scripts.07_forecast')", DATA_STACK),
+    ("05_analytics --help", "_main('scripts.05_analytics')", []),
+]
+
+_PROBE = """
+import json, runpy, sys, time
+def _main(mod):
+    sys.argv = [mod, "--help"]
+    try:
+        runpy.run_module(mod, run_name="__main__")
+    except SystemExit:
+        pass
+t0 = time.perf_counter()
+{stmt}
+ms = (time.perf_counter() - t0) * 1000
+sys.__stdout__.write(json.dumps({{"ms": ms, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(stmt: str) -> dict:
+    code = _PROBE.format(stmt=stmt, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(out[out.rindex("{"):])
+
+
+def main(repeat: int = 3) -> int:
+    log.info(f"{'entry point':<24} {'median ms':>10} {'min ms':>8}  heavy modules loaded")
+    failures = []
+    for label, stmt, forbidden in CASES:
+        runs = [probe(stmt) for _ in range(repeat)]
+        ms = [r["ms"] for r in runs]
+        loaded = runs[-1]["loaded"]
+        bad = [m for m in forbidden if m in loaded]
+        log.info(f"{label:<24} {statistics.median(ms):>10.0f} {min(ms):>8.0f}  {', '.join(loaded) or '-'}"
+                 + (f"   <- should be lazy: {', '.join(bad)}" if bad else ""))
+        if bad:
+            failures.append(label)
+    if failures:
+        log.warning(f"Eager imports crept back in: {', '.join(failures)}")
+        return 1
+    log.info("All entry points defer their heavy imports.")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per entry point")
+    args = ap.parse_args()
+    sys.exit(main(args.repeat))
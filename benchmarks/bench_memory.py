@@ -0,0 +1,84 @@
+"""
+Memory footprint of the processed frame: old object/int64 schema vs the
+compact schema (categoricals, int32/int16, float32 %).
+
+    python -m benchmarks.bench_memory --rows 1000000
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.bench_growth import make_frame, _legacy_add_qoq, _legacy_add_yoy
+from src.data.clean import standardize, ensure_quarter_order
+from src.features.growth import add_growth, add_totals
+from src.utils import get_logger
+
+log = get_logger("bench_memory")
+
+
+def raw_frame(n_rows: int) -> pd.DataFrame:
+    """Upload-shaped input: plain string labels, int64 counts."""
+    df = make_frame(n_rows)
+    q = df["date"].dt.to_period("Q")
+    return pd.DataFrame({
+        "date": df["date"],
+        "year": df["date"].dt.year,
+        "quarter": q.astype(str),
+        "category": df["category"].astype(str),
+        "manufacturer": df["manufacturer"].astype(str),
+        "registrations": df["registrations"].astype("int64"),
+    })
+
+
+def legacy_processed(raw: pd.DataFrame) -> pd.DataFrame:
+    """Pipeline as it was: str/object labels, int64 counts, float64 growth."""
+    df = raw.copy()
+    df["category"] = df["category"].astype(object)
+    df["manufacturer"] = df["manufacturer"].astype(object)
+    df["quarter"] = df["quarter"].astype(object)
+    df = df.sort_values(["category", "manufacturer", "date"]).reset_index(drop=True)
+    tot = df.groupby(["date", "year", "quarter", "category"], as_index=False)["registrations"].sum()
+    tot["manufacturer"] = "TOTAL"
+    df = pd.concat([df, tot], ignore_index=True)
+    return _legacy_add_yoy(_legacy_add_qoq(df))
+
+
+def compact_processed(raw: pd.DataFrame) -> pd.DataFrame:
+    df = ensure_quarter_order(standardize(raw))
+    return add_growth(add_totals(df))
+
+
+def _mb(n_bytes) -> float:
+    return n_bytes / 1024 ** 2
+
+
+def _parquet_mb(df: pd.DataFrame) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "x.parquet"
+        df.to_parquet(out, index=False)
+        return _mb(out.stat().st_size)
+
+
+def main(n_rows: int):
+    raw = raw_frame(n_rows)
+    before = legacy_processed(raw)
+    after = compact_processed(raw)
+
+    mem_b = before.memory_usage(deep=True, index=False)
+    mem_a = after.memory_usage(deep=True, index=False)
+    log.info(f"processed frame, {len(after):,} rows")
+    log.info(f"{'column':<14} {'before':>16} {'after':>16} {'MB before':>10} {'MB after':>10}")
+    for col in before.columns:
+        log.info(f"{col:<14} {str(before[col].dtype):>16} {str(after[col].dtype):>16} "
+                 f"{_mb(mem_b[col]):>10.1f} {_mb(mem_a[col]):>10.1f}")
+    log.info(f"{'TOTAL (RAM)':<14} {'':>16} {'':>16} {_mb(mem_b.sum()):>10.1f} {_mb(mem_a.sum()):>10.1f}")
+    log.info(f"{'parquet file':<14} {'':>16} {'':>16} {_parquet_mb(before):>10.1f} {_parquet_mb(after):>10.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    main(args.rows)
@@ -0,0 +1,95 @@
+"""
+Memory per Streamlit-like worker: N processes each load the processed dataset
+with DATA_BACKEND=parquet (own decoded copy) vs DATA_BACKEND=shared (one
+memory-mapped Arrow snapshot). Reports load time and, with all workers alive,
+each worker's private growth (USS) and the host total (sum of PSS). Linux only
+(reads /proc/self/smaps_rollup).
+
+    python -m benchmarks.bench_shared --rows 2000000 --workers 4
+"""
+import os
+import shutil
+import tempfile
+
+# throwaway DATA_DIR / SHARED_DIR (config reads them on first access)
+_TMP = tempfile.mkdtemp(prefix="vahan_bench_")
+_SHM = tempfile.mkdtemp(prefix="vahan_bench_", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+os.environ["DATA_DIR"] = _TMP
+os.environ["SHARED_DIR"] = _SHM
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_memory import raw_frame, compact_processed
+from src.data.storage import save_processed, PARTITION_COLS
+from src.utils import get_logger
+
+log = get_logger("bench_shared")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_WORKER = """
+import json, sys, time
+def mem():
+    out = {}
+    for line in open("/proc/self/smaps_rollup"):
+        k, _, v = line.partition(":")
+        if k in ("Pss", "Private_Clean", "Private_Dirty"):
+            out[k] = int(v.split()[0]) / 1024
+    return out["Pss"], out["Private_Clean"] + out["Private_Dirty"]
+from src.data.storage import load_processed_cached
+_, uss0 = mem()
+t0 = time.perf_counter()
+df = load_processed_cached("registrations.parquet")
+ms = (time.perf_counter() - t0) * 1000
+int(df["registrations"].sum()); df["date"].max(); df["qoq_pct"].mean()  # touch the columns
+sys.stdout.write(json.dumps({"ms": ms, "uss_mb": mem()[1] - uss0}) + "\\n"); sys.stdout.flush()
+sys.stdin.readline()  # stay alive until every worker has loaded
+sys.stdout.write(json.dumps({"pss_mb": mem()[0]}) + "\\n")
+"""
+
+
+def run_workers(backend: str, n: int) -> dict:
+    env = dict(os.environ, DATA_BACKEND=backend)
+    procs = [subprocess.Popen([sys.executable, "-c", _WORKER], cwd=ROOT, env=env, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+             for _ in range(n)]
+    loaded = [json.loads(p.stdout.readline()) for p in procs]
+    for p in procs:
+        p.stdin.write("\n")
+        p.stdin.flush()
+    pss = [json.loads(p.stdout.readline())["pss_mb"] for p in procs]
+    for p in procs:
+        p.wait()
+    return {"load_ms": statistics.median(r["ms"] for r in loaded),
+            "uss_mb": statistics.median(r["uss_mb"] for r in loaded),
+            "pss_total_mb": sum(pss)}
+
+
+def main(n_rows: int, workers: int):
+    df = compact_processed(raw_frame(n_rows))
+    save_processed(df, partition_cols=PARTITION_COLS)
+    log.info(f"{n_rows:,} rows, in-memory frame {df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB")
+    del df
+
+    run_workers("shared", 1)  # publish the snapshot up front, as the first replica would
+    log.info(f"{'backend':<8} {'workers':>7} {'load ms':>8} {'USS/worker MB':>14} {'PSS total MB':>13}")
+    for backend in ("parquet", "shared"):
+        r = run_workers(backend, workers)
+        log.info(f"{backend:<8} {workers:>7} {r['load_ms']:>8.0f} {r['uss_mb']:>14.1f} {r['pss_total_mb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+    try:
+        main(args.rows, args.workers)
+    finally:
+        shutil.rmtree(_TMP, ignore_errors=True)
+        shutil.rmtree(_SHM, ignore_errors=True)
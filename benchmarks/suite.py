@@ -0,0 +1,196 @@
+"""
+Pipeline benchmark suite: every ingest/feature/storage stage, the per-page
+compute and the full scripts/04_process_csv flow, at several data scales.
+Records wall time (best of --repeat) and peak Python-heap memory (tracemalloc,
+separate run), saves baselines and flags regressions against one.
+
+    python -m benchmarks.suite --rows 10000 100000 1000000 --save-baseline main
+    python -m benchmarks.suite --rows 10000 100000 1000000 --compare main   # exit 1 on regressions
+"""
+import os
+import shutil
+import tempfile
+
+# everything below writes under a throwaway DATA_DIR (config reads it at import)
+_TMP = tempfile.mkdtemp(prefix="vahan_bench_")
+os.environ["DATA_DIR"] = _TMP
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.bench_memory import raw_frame
+from src.analytics import kpis, top_manufacturers, latest_snapshot
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.ingest_upload import parse_uploaded_csv, parse_csv_chunked
+from src.data.storage import save_processed, load_processed, processed_filters, PARTITION_COLS
+from src.data.validate import validate_csvs
+from src.features.growth import add_growth, add_totals, build_growth_cube, cube_slice
+from src.utils import get_logger
+from src.viz.charts import line_trend
+
+log = get_logger("bench_suite")
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+THRESHOLD = 0.20   # slower/bigger than baseline by more than this -> regression
+
+
+def _page_compute(cube):
+    """What Home + Overview + Manufacturers derive from the cube on a cold rerun."""
+    cats = [c for c in cube.index.levels[0] if c != "ALL"]
+    mfrs = [m for m in cube.index.levels[1] if m != "TOTAL"][:3]
+    kpis(cube)
+    top_manufacturers(cube)
+    latest_snapshot(cube, by="category")
+    latest_snapshot(cube, by="manufacturer", categories=cats, manufacturers=mfrs)
+    line_trend(cube_slice(cube, categories=cats, manufacturers="TOTAL"), color="category")
+    line_trend(cube_slice(cube, categories=cats, manufacturers=mfrs), color="manufacturer")
+
+
+def _process_csv_main(csv_path):
+    import importlib
+    importlib.import_module("scripts.04_process_csv").main(str(csv_path))
+
+
+def stages(csv_path: Path):
+    """
+    (name, fn, setup) in pipeline order. setup() builds the stage's input
+    outside the timed region; fn(input) is what gets measured.
+    """
+    raw = lambda: parse_uploaded_csv(csv_path)
+    std = lambda: ensure_quarter_order(standardize(raw()))
+    totals = lambda: add_totals(std())
+    processed = lambda: add_growth(totals())
+    cube = lambda: build_growth_cube(processed())
+
+    def saved():
+        save_processed(processed(), "bench.parquet", partition_cols=PARTITION_COLS)
+
+    return [
+        ("parse_uploaded_csv", lambda _: parse_uploaded_csv(csv_path), lambda: None),
+        ("parse_csv_chunked", lambda _: parse_csv_chunked(csv_path, chunksize=250_000), lambda: None),
+        ("validate_csvs", lambda _: validate_csvs(csv_path, chunksize=250_000, workers=1), lambda: None),
+        ("standardize", standardize, raw),
+        ("ensure_quarter_order", ensure_quarter_order, lambda: standardize(raw())),
+        ("add_totals", add_totals, std),
+        ("add_growth (qoq+yoy)", add_growth, totals),
+        ("build_growth_cube", build_growth_cube, processed),
+        ("save_processed", lambda df: save_processed(df, "bench.parquet", partition_cols=PARTITION_COLS),
+         processed),
+        ("load_processed", lambda _: load_processed("bench.parquet"), saved),
+        ("load_processed (filtered)",
+         lambda _: load_processed("bench.parquet", filters=processed_filters(manufacturers=["TOTAL"])), saved),
+        ("page compute", _page_compute, cube),
+        ("04_process_csv.main", lambda _: _process_csv_main(csv_path), lambda: None),
+    ]
+
+
+def measure(fn, setup, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        arg = setup()
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+        del arg
+
+    # memory in its own run: tracemalloc slows Python-level code down
+    arg = setup()
+    gc.collect()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 1024 ** 2, 1)}
+
+
+def run(sizes, repeat: int, only=None) -> dict:
+    results = {}
+    for n in sizes:
+        csv_path = Path(_TMP) / f"input_{n}.csv"
+        raw_frame(n).to_csv(csv_path, index=False)
+        for name, fn, setup in stages(csv_path):
+            if only and not any(o in name for o in only):
+                continue
+            res = measure(fn, setup, repeat)
+            results[f"{name}@{n}"] = res
+            log.info(f"{name:<28} {n:>10,} rows {res['seconds']:>9.3f} s {res['peak_mb']:>9.1f} MB")
+    return results
+
+
+def meta() -> dict:
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+        "machine": f"{platform.machine()} x{os.cpu_count()}",
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list:
+    """Keys whose time or memory grew past the threshold (ignores sub-10ms / sub-1MB noise)."""
+    log.info(f"{'stage@rows':<40} {'s':>9} {'base s':>9} {'MB':>8} {'base MB':>8}")
+    regressions = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slow = res["seconds"] > base["seconds"] * (1 + threshold) and res["seconds"] - base["seconds"] > 0.01
+        big = res["peak_mb"] > base["peak_mb"] * (1 + threshold) and res["peak_mb"] - base["peak_mb"] > 1
+        flag = " REGRESSION" + (" (time)" if slow else "") + (" (memory)" if big else "") if slow or big else ""
+        log.info(f"{key:<40} {res['seconds']:>9.3f} {base['seconds']:>9.3f} "
+                 f"{res['peak_mb']:>8.1f} {base['peak_mb']:>8.1f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(sizes, repeat=3, only=None, save_baseline=None, compare_to=None, threshold=THRESHOLD) -> int:
+    try:
+        results = run(sizes, repeat, only)
+    finally:
+        shutil.rmtree(_TMP, ignore_errors=True)
+
+    if save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        out = BASELINE_DIR / f"{save_baseline}.json"
+        out.write_text(json.dumps({"meta": meta(), "results": results}, indent=2))
+        log.info(f"Baseline saved: {out}")
+
+    if compare_to:
+        path = Path(compare_to)
+        if not path.exists():
+            path = BASELINE_DIR / f"{compare_to}.json"
+        base = json.loads(path.read_text())
+        log.info(f"Comparing with {path} ({base['meta']['date']}, {base['meta']['machine']})")
+        regressions = compare(results, base["results"], threshold)
+        if regressions:
+            log.warning(f"{len(regressions)} regression(s) over {threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        log.info("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", nargs="+", default=None, help="run stages whose name contains any of these")
+    ap.add_argument("--save-baseline", default=None, help="name (benchmarks/baselines/<name>.json)")
+    ap.add_argument("--compare", default=None, help="baseline name or path to compare against")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = ap.parse_args()
+    sys.exit(main(args.rows, args.repeat, args.only, args.save_baseline, args.compare, args.threshold))
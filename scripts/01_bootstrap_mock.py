@@ -1,26 +1,37 @@
-from src.data.fetch import generate_mock_quarterly, save_raw_snapshot
+from src.data.fetch import generate_mock_quarterly, split_mock_monthly, save_raw_snapshot
 from src.data.clean import standardize, ensure_quarter_order
-from src.data.storage import save_processed
-from src.features.growth import add_qoq, add_yoy, add_totals
+from src.data.storage import save_processed, PARTITION_COLS
+from src.features.growth import add_growth, add_totals, build_growth_cube
+from src.features.rollup import RollupStore
+from src.features.forecast import forecast_cube, save_forecasts
+from src.features.share import build_share_index, save_share_index
 
 def main():
     # 1) generate mock
-    df = generate_mock_quarterly(start_year=2023, end_year=2025)
+    raw = generate_mock_quarterly(start_year=2023, end_year=2025)
 
     # 2) save raw snapshot (csv)
-    save_raw_snapshot(df, name="mock_quarterly")
+    save_raw_snapshot(raw, name="mock_quarterly")
 
     # 3) clean + order
-    df = standardize(df)
+    df = standardize(raw)
     df = ensure_quarter_order(df)
 
     # 4) add TOTAL rows & growth metrics
     df = add_totals(df)
-    df = add_qoq(df)
-    df = add_yoy(df)
+    df = add_growth(df)  # QoQ + YoY in one pass
 
     # 5) save processed parquet
-    save_processed(df, "registrations.parquet")
+    save_processed(df, "registrations.parquet", partition_cols=PARTITION_COLS)
+    cube = build_growth_cube(df)
+    save_processed(cube, "growth_cube.parquet", index=True, partition_cols=PARTITION_COLS)
+
+    # 6) next-quarter projections + market-share/rank index (read by the pages)
+    save_forecasts(forecast_cube(cube))
+    save_share_index(build_share_index(cube))
+
+    # 7) the same counts split by month x RTO + rollups (month/quarter/year x RTO/state/national)
+    RollupStore.build(split_mock_monthly(raw)).save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
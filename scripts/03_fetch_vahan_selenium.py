@@ -1,72 +1,69 @@
-import time
+import argparse
+from contextlib import nullcontext
 from datetime import datetime
-from pathlib import Path
 
-import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-from src.config import RAW_DIR, VAHAN_BASE_URL
 from src.utils import get_logger
 
 log = get_logger("fetch_vahan")
 
-def setup_driver(headless: bool = True):
-    opts = webdriver.ChromeOptions()
-    if headless:
-        opts.add_argument("--headless=new")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--window-size=1600,1000")
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=opts)
-
-def extract_biggest_table(html: str) -> pd.DataFrame:
-    # Try pandas.read_html first
-    tables = pd.read_html(html, flavor="bs4")
-    if not tables:
-        raise RuntimeError("No tables found on page.")
-    # pick the widest/most rows table
-    tables.sort(key=lambda d: (d.shape[0], d.shape[1]), reverse=True)
-    df = tables[0]
-    # Drop multiindex columns if any
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [" ".join([str(c) for c in col if str(c) != "nan"]).strip() for col in df.columns]
-    return df
-
-def main():
-    RAW_DIR.mkdir(parents=True, exist_ok=True)
-    url = VAHAN_BASE_URL or "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
+DEFAULT_URL = "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
 
-    log.info(f"Opening {url}")
-    driver = setup_driver(headless=True)
-    driver.get(url)
 
-    # TODO: If page needs navigation/clicks, add them here
-    # Example (uncomment and adjust):
-    # WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.XPATH, "//a[contains(., 'Some Tab')]"))).click()
+def main(states, categories, start: str, end: str, mode: str = "browser", concurrency: int = 4,
+         rate: float = 2.0, retries: int = 3, mock: bool = False, url_template: str = None):
+    # pandas + the fetch stack load here, so --help doesn't pay for them
+    from src.config import RAW_DIR, VAHAN_BASE_URL
+    from src.data.fetch import DEFAULT_URL_TEMPLATE, FETCH_DIR, fetch_from_vahan, make_jobs
 
-    # Wait for any table to appear
-    WebDriverWait(driver, 30).until(
-        EC.presence_of_element_located((By.XPATH, "//table"))
-    )
-    time.sleep(2)  # small stability wait
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = make_jobs(states, categories, start, end)
 
-    html = driver.page_source
-    driver.quit()
+    if mock:
+        # offline run against the local stand-in (src/data/mock_vahan.py)
+        from src.data.mock_vahan import serve_mock_vahan
+        server = serve_mock_vahan(latency=0.2)
+    elif url_template or VAHAN_BASE_URL:
+        server = nullcontext(VAHAN_BASE_URL or url_template)
+    else:
+        # The public dashboard (DEFAULT_URL) is a JSF page: state/category/month are picked with
+        # dropdowns and AJAX postbacks, and query params are ignored, so every job would get the
+        # same default report. Driving those widgets isn't implemented; point the fetcher at an
+        # endpoint that takes the selection in the URL instead.
+        raise SystemExit(f"{DEFAULT_URL} ignores query params, so it can't be fetched per state/category/month. "
+                         f"Pass --url-template (or set VAHAN_BASE_URL) to a report URL that accepts them, "
+                         f"or use --mock.")
 
-    df = extract_biggest_table(html)
+    with server as base:
+        template = url_template or DEFAULT_URL_TEMPLATE.replace("{base}", base)
+        log.info(f"Fetching {len(jobs)} report(s) from {base}")
+        df = fetch_from_vahan(jobs, url_template=template, mode=mode, concurrency=concurrency,
+                              rate=rate, retries=retries,
+                              out_dir=FETCH_DIR / "mock" if mock else FETCH_DIR)
 
-    # Save raw CSV
+    # Save raw CSV (feed it to scripts/04_process_csv.py)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out = RAW_DIR / f"vahan_raw_{ts}.csv"
     df.to_csv(out, index=False)
-    log.info(f"Saved raw CSV: {out.resolve()}")
+    log.info(f"Saved raw CSV: {out.resolve()} ({len(df):,} rows)")
+
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Fetch Vahan maker-wise reports (state x category x month).")
+    ap.add_argument("--states", nargs="+", default=["All"], help="state names as the report expects them")
+    ap.add_argument("--categories", nargs="+", default=["2W", "3W", "4W"])
+    ap.add_argument("--start", default="2024-01", help="first month, YYYY-MM")
+    ap.add_argument("--end", default="2024-12", help="last month, YYYY-MM (inclusive)")
+    ap.add_argument("--mode", choices=["http", "browser"], default="browser",
+                    help="plain GET with a pooled session, or one headless Chrome per worker (for reports "
+                         "rendered by JS; it loads the URL and waits for the table, it doesn't click filters)")
+    ap.add_argument("--concurrency", type=int, default=4, help="parallel sessions (default: 4)")
+    ap.add_argument("--rate", type=float, default=2.0, help="max requests/second across all sessions")
+    ap.add_argument("--retries", type=int, default=3)
+    ap.add_argument("--url-template", default=None,
+                    help="report URL with {state} {category} {year} {month} placeholders "
+                         "(required for live runs unless VAHAN_BASE_URL is set)")
+    ap.add_argument("--mock", action="store_true", help="fetch from the local mock server (offline)")
+    args = ap.parse_args()
+    main(args.states, args.categories, args.start, args.end, mode="http" if args.mock else args.mode,
+         concurrency=args.concurrency, rate=args.rate, retries=args.retries, mock=args.mock,
+         url_template=args.url_template)
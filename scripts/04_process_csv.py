@@ -1,38 +1,123 @@
-import sys
+import argparse
 from pathlib import Path
-import pandas as pd
 
-from src.data.ingest_upload import parse_uploaded_csv
-from src.data.clean import standardize, ensure_quarter_order
-from src.data.storage import save_processed
-from src.features.growth import add_qoq, add_yoy, add_totals
-from src.config import PROCESSED_DIR
 from src.utils import get_logger
 
 log = get_logger("process_csv")
 
-def main(csv_path: str):
+def main(csv_path: str, chunked: bool = False, chunksize: int = 500_000, append: bool = False,
+         to_db: bool = False, workers: int = None, rollups: bool = False, validate: bool = True,
+         strict: bool = False):
+    # data stack imported here, not at module level: --help / bad args return instantly
+    import pandas as pd
+    from src.data.ingest_upload import (parse_uploaded_csv, parse_csv_chunked, parse_many, expand_csv_paths,
+                                        parse_granular_csv)
+    from src.data.clean import standardize, ensure_quarter_order
+    from src.data.storage import save_processed, PARTITION_COLS
+    from src.features.growth import add_growth, add_totals, build_growth_cube
+    from src.features.forecast import forecast_cube, save_forecasts
+    from src.features.share import build_share_index, save_share_index
+    from src.config import ensure_data_dirs
+
     p = Path(csv_path)
-    if not p.exists():
+    paths = expand_csv_paths(csv_path)
+    if not paths or not paths[0].exists():
         raise FileNotFoundError(p)
 
-    log.info(f"Parsing uploaded CSV: {p}")
-    df = parse_uploaded_csv(p)
+    checked = None
+    if validate:
+        # all issues in one pass, before anything is written: bad rows quarantined
+        # (data/processed/quarantine.parquet), the rest kept
+        from src.data.validate import validate_csvs, save_validation, known_manufacturers, CHECKS
+        log.info(f"Validating {len(paths)} file(s) in chunks of {chunksize:,} rows "
+                 f"({workers or 'all'} worker(s) across files): {csv_path}")
+        checked = validate_csvs(paths, chunksize=chunksize, workers=workers,
+                                known_manufacturers=known_manufacturers())
+        if strict and checked.n_quarantined:
+            for check, n in checked.report["issues"].items():
+                if CHECKS[check] == "error":
+                    log.error(f"  {check:<22} {n:>10,}")
+            raise ValueError(f"{checked.n_quarantined:,} row(s) failed validation (--strict); nothing was written.")
+        ensure_data_dirs()
+        save_validation(checked)
+
+    if rollups:
+        # Month x RTO grain kept as-is, then month/quarter/year x RTO/state/national aggregates
+        from src.features.rollup import RollupStore
+        skip = checked.quarantined_rows if checked is not None else (lambda x: None)
+        base = pd.concat([parse_granular_csv(x, chunksize=chunksize, skiprows=skip(x)) for x in paths],
+                         ignore_index=True)
+        RollupStore.build(base).save()
+
+    if checked is not None:
+        # the validation scan is the parse: streamed in --chunksize chunks, files spread over --workers,
+        # same result as parse_many(chunked=True) minus the quarantined rows
+        df = checked.data
+    elif len(paths) > 1 or p.is_dir():
+        log.info(f"Batch ingest: {len(paths)} file(s) from {csv_path}")
+        df = parse_many(paths, workers=workers, chunked=chunked, chunksize=chunksize)
+    elif chunked:
+        # paths[0], not p: a glob with one match is still a pattern
+        log.info(f"Streaming CSV in chunks of {chunksize:,} rows: {paths[0]}")
+        df = parse_csv_chunked(paths[0], chunksize=chunksize)
+    else:
+        log.info(f"Parsing uploaded CSV: {paths[0]}")
+        df = parse_uploaded_csv(paths[0])
+
+    if to_db:
+        # Base rows only; the DB computes TOTAL rollups and lags at query time
+        from src.data.db import save_to_db
+        save_to_db(standardize(df), replace_all=not append)
+
+    if append:
+        # Merge as a delta: only the touched quarters are recomputed/rewritten
+        from src.pipeline import append_delta
+        append_delta(df, "registrations.parquet", "growth_cube.parquet")
+        # forecasts and share/rank index depend on whole quarters/histories: rebuild from the updated cube
+        from src.data.storage import load_processed
+        cube = load_processed("growth_cube.parquet")
+        save_forecasts(forecast_cube(cube, workers=workers))
+        save_share_index(build_share_index(cube))
+        log.info("Processed parquet updated (delta).")
+        return
 
     # Clean + order + totals + growth
     df = standardize(df)
     df = ensure_quarter_order(df)
     df = add_totals(df)
-    df = add_qoq(df)
-    df = add_yoy(df)
+    df = add_growth(df)  # QoQ + YoY in one pass
 
     # Save processed parquet
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    save_processed(df, "registrations.parquet")
+    ensure_data_dirs()
+    save_processed(df, "registrations.parquet", partition_cols=PARTITION_COLS)
+    cube = build_growth_cube(df)
+    save_processed(cube, "growth_cube.parquet", index=True, partition_cols=PARTITION_COLS)
+    save_forecasts(forecast_cube(cube, workers=workers))
+    save_share_index(build_share_index(cube))
     log.info("Processed parquet updated.")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/04_process_csv.py <path_to_csv>")
-        sys.exit(1)
-    main(sys.argv[1])
+    ap = argparse.ArgumentParser(description="Persist a CSV as the processed dataset.")
+    ap.add_argument("csv_path", help="raw CSV export, a directory of CSVs, or a glob (quote it)")
+    ap.add_argument("--chunked", action="store_true",
+                    help="with --no-validate: stream the file in chunks (bounded memory, for multi-GB "
+                         "exports); the validation pass always streams")
+    ap.add_argument("--chunksize", type=int, default=500_000,
+                    help="rows per chunk for the validation pass and --chunked (default: 500000)")
+    ap.add_argument("--append", action="store_true",
+                    help="treat the CSV as a delta (new/revised quarters) instead of a full rebuild")
+    ap.add_argument("--db", action="store_true",
+                    help="also bulk-load into DB_URL (serve with DATA_BACKEND=db)")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="processes for directory/glob ingest (validated or not) and forecasting "
+                         "(default: all cores)")
+    ap.add_argument("--rollups", action="store_true",
+                    help="also keep monthly/state/RTO detail as rollups (data/processed/rollups/)")
+    ap.add_argument("--no-validate", action="store_true",
+                    help="skip the validation pass (fail on the first bad date, blank counts become 0)")
+    ap.add_argument("--strict", action="store_true",
+                    help="abort without writing anything if any row is quarantined")
+    args = ap.parse_args()
+    main(args.csv_path, chunked=args.chunked, chunksize=args.chunksize, append=args.append,
+         to_db=args.db, workers=args.workers, rollups=args.rollups, validate=not args.no_validate,
+         strict=args.strict)
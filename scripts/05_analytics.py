@@ -0,0 +1,45 @@
+import argparse
+import json
+
+from src.analytics import QUERIES, query
+from src.utils import get_logger
+
+log = get_logger("analytics")
+
+
+def main(name: str, **params):
+    if name == "serve":
+        from src.api import serve
+        serve(params["host"], params["port"])
+        return
+    params = {k: v for k, v in params.items() if k not in ("host", "port") and v is not None}
+    print(json.dumps(query(name, **params), indent=2))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Dashboard numbers as JSON, without the UI.")
+    ap.add_argument("query", choices=list(QUERIES) + ["serve"],
+                    help="query to run, or 'serve' for the HTTP/JSON API")
+    ap.add_argument("--categories", nargs="+", default=None)
+    ap.add_argument("--manufacturers", nargs="+", default=None)
+    ap.add_argument("--start", default=None, help="YYYY-MM-DD")
+    ap.add_argument("--end", default=None, help="YYYY-MM-DD")
+    ap.add_argument("--date", default=None, help="quarter-end date (fastest_category/top_manufacturers)")
+    ap.add_argument("--category", default=None, help="leaderboard category (default: ALL)")
+    ap.add_argument("--by", choices=["category", "manufacturer", "share", "yoy", "gain"], default=None,
+                    help="snapshot rows (category/manufacturer) or leaderboard order (share/yoy/gain)")
+    ap.add_argument("--n", type=int, default=None, help="top_manufacturers per category / leaderboard size")
+    ap.add_argument("--horizon", type=int, default=None, help="projection: quarters ahead (1-4)")
+    ap.add_argument("--time", choices=["month", "quarter", "year"], default=None, help="rollup period")
+    ap.add_argument("--geo", choices=["rto", "state", "national"], default=None, help="rollup geography")
+    ap.add_argument("--states", nargs="+", default=None, help="rollup: only these states")
+    ap.add_argument("--rtos", nargs="+", default=None, help="rollup: only these RTOs")
+    ap.add_argument("--growth", action="store_true", default=None,
+                    help="rollup: add previous-period / same-period-last-year growth")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    args = vars(ap.parse_args())
+    try:
+        main(args.pop("query"), **args)
+    except TypeError as e:  # option the query doesn't take
+        ap.error(str(e))
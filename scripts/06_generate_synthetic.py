@@ -0,0 +1,26 @@
+import argparse
+
+
+def main(out=None, fmt="parquet", **spec):
+    from src.data.synth import SynthSpec, write_synthetic  # numpy/pandas/pyarrow; not needed for --help
+    return write_synthetic(SynthSpec(**spec), out=out, fmt=fmt)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Write a seeded synthetic month x RTO dataset for load tests.")
+    ap.add_argument("--manufacturers", type=int, default=1_000)
+    ap.add_argument("--states", type=int, default=30)
+    ap.add_argument("--rtos-per-state", type=int, default=20)
+    ap.add_argument("--start", default="2019-01", help="first month, YYYY-MM")
+    ap.add_argument("--end", default="2025-06", help="last month, YYYY-MM")
+    ap.add_argument("--presence", type=float, default=0.5, help="share of RTOs each manufacturer sells in")
+    ap.add_argument("--gap-rate", type=float, default=0.02, help="share of missing months")
+    ap.add_argument("--outlier-rate", type=float, default=0.001)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--format", choices=["parquet", "csv"], default="parquet",
+                    help="partitioned parquet dataset, or one CSV (input for 04_process_csv)")
+    ap.add_argument("--out", default=None, help="default: data/raw/synthetic.<format>")
+    args = ap.parse_args()
+    main(args.out, args.format, n_manufacturers=args.manufacturers, n_states=args.states,
+         rtos_per_state=args.rtos_per_state, start=args.start, end=args.end, presence=args.presence,
+         gap_rate=args.gap_rate, outlier_rate=args.outlier_rate, seed=args.seed)
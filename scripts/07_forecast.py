@@ -0,0 +1,16 @@
+import argparse
+
+
+def main(horizon: int = 4, workers: int = None):
+    # refit from the processed cube without re-ingesting anything
+    from src.analytics import growth_cube
+    from src.features.forecast import forecast_cube, save_forecasts
+    return save_forecasts(forecast_cube(growth_cube(), horizon=horizon, workers=workers))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Refit next-quarter projections for every series of the growth cube.")
+    ap.add_argument("--horizon", type=int, default=4, help="quarters ahead (default: 4)")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    args = ap.parse_args()
+    main(args.horizon, args.workers)
@@ -0,0 +1,276 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.cache import LRUCache, _freeze
+from src.config import DATA_BACKEND
+from src.data.storage import load_processed_cached, dataset_version
+from src.features.forecast import FORECAST_NAME, forecast_cube
+from src.features.growth import build_growth_cube, cube_slice, ALL_CATEGORIES
+from src.features.rollup import ROLLUP_DIR, RollupStore
+from src.features.share import SHARE_NAME, ShareIndex, build_share_index
+from src.perf import timed
+
+# The investor-facing numbers (KPIs, fastest-growing category, top manufacturer
+# per category, latest-quarter snapshots, trends) as pure functions over the
+# growth cube, plus month/state/RTO detail from the rollups. The Streamlit
+# pages, the JSON API (src/api.py) and the CLI (scripts/05_analytics.py) all
+# call these; query() adds a result cache keyed on the dataset version so
+# repeated requests don't touch pandas at all.
+
+CUBE_NAME = "growth_cube.parquet"
+
+_RESULTS = LRUCache(max_items=4096, sizeof=lambda v: 0)
+# ShareIndex per share-index version (its orderings are built once, then every lookup is a slice)
+_INDEXES = LRUCache(max_items=4, sizeof=lambda v: 0)
+
+
+# ---- Data ----
+@timed
+def growth_cube(filters=None) -> pd.DataFrame:
+    """Processed growth cube from the configured backend (DATA_BACKEND)."""
+    if DATA_BACKEND == "db":
+        from src.data.db import load_growth_cube_db
+        return load_growth_cube_db(filters)
+    try:
+        return load_processed_cached(CUBE_NAME, filters=filters)
+    except FileNotFoundError:
+        # older processed dirs: build on the fly (re-run the pipeline to persist)
+        return build_growth_cube(load_processed_cached("registrations.parquet"))
+
+
+@timed
+def load_forecasts() -> pd.DataFrame:
+    """Persisted forecasts (src/features/forecast.py); fitted on the fly for processed dirs without them."""
+    try:
+        return load_processed_cached(FORECAST_NAME)
+    except FileNotFoundError:
+        return forecast_cube(growth_cube())
+
+
+def load_share_index() -> ShareIndex:
+    """Persisted market-share/rank index (src/features/share.py); built from the cube if missing."""
+    def build():
+        try:
+            return ShareIndex(load_processed_cached(SHARE_NAME))
+        except FileNotFoundError:
+            return ShareIndex(build_share_index(growth_cube()))
+    return _INDEXES.get_or_build(share_version(), build)
+
+
+def load_rollups():
+    """Month/quarter/year x RTO/state/national aggregates (scripts 01 / 04 --rollups)."""
+    return RollupStore.load()
+
+
+def rollup_version():
+    return dataset_version(ROLLUP_DIR)
+
+
+def cube_version():
+    """Token that changes whenever the processed data does."""
+    if DATA_BACKEND == "db":
+        from src.data.db import db_version
+        return ("db", db_version())
+    try:
+        return dataset_version(CUBE_NAME)
+    except FileNotFoundError:
+        return dataset_version("registrations.parquet")
+
+
+def forecast_version():
+    """Forecasts are refit from the cube, so their version follows both files."""
+    try:
+        return cube_version(), dataset_version(FORECAST_NAME)
+    except FileNotFoundError:
+        return cube_version(), None
+
+
+def share_version():
+    try:
+        return cube_version(), dataset_version(SHARE_NAME)
+    except FileNotFoundError:
+        return cube_version(), None
+
+
+# ---- Queries (pure: cube in, frame/dict out) ----
+@timed
+def latest_rows(f: pd.DataFrame) -> pd.DataFrame:
+    """Rows of a flat cube slice at its latest date."""
+    return f[f["date"] == f["date"].max()]
+
+
+def summarize(latest: pd.DataFrame) -> dict:
+    """Headline numbers for one quarter's rows (summed; prev_q/prev_y are aligned per series)."""
+    curr = int(latest["registrations"].sum())
+    prev_q = latest["prev_q"].sum(min_count=len(latest))
+    prev_y = latest["prev_y"].sum(min_count=len(latest))
+    return {
+        "date": latest["date"].iloc[0] if len(latest) else None,
+        "quarter": str(latest["quarter"].iloc[0]) if len(latest) else None,
+        "registrations": curr,
+        "qoq_pct": _pct(curr, prev_q),
+        "yoy_pct": _pct(curr, prev_y),
+    }
+
+
+@timed
+def kpis(cube: pd.DataFrame, categories=None, start=None, end=None) -> dict:
+    """Latest-quarter total and QoQ/YoY: across all categories, or summed over `categories`."""
+    f = cube_slice(cube, categories=categories or ALL_CATEGORIES, manufacturers="TOTAL",
+                   start=start, end=end)
+    if f.empty:
+        return {}
+    return summarize(latest_rows(f))
+
+
+@timed
+def fastest_category(cube: pd.DataFrame, date=None) -> dict:
+    """Category with the highest TOTAL YoY % at `date` (default: latest quarter)."""
+    f = cube_slice(cube, categories=_categories(cube), manufacturers="TOTAL", start=date, end=date)
+    f = latest_rows(f).dropna(subset=["yoy_pct"])
+    if f.empty:
+        return {}
+    top = f.loc[f["yoy_pct"].idxmax()]
+    return {"date": top["date"], "category": top["category"], "yoy_pct": top["yoy_pct"]}
+
+
+@timed
+def top_manufacturers(cube: pd.DataFrame, date=None, n: int = 1) -> pd.DataFrame:
+    """Top-n manufacturers by YoY % within each category at `date` (default: latest quarter)."""
+    f = cube_slice(cube, categories=_categories(cube), start=date, end=date)
+    f = latest_rows(f[f["manufacturer"] != "TOTAL"])
+    return (f.sort_values("yoy_pct", ascending=False)[["category", "manufacturer", "yoy_pct"]]
+            .groupby("category", as_index=False, observed=True).head(n))
+
+
+@timed
+def snapshot(latest: pd.DataFrame, by: str = "category") -> pd.DataFrame:
+    """Latest-quarter table: registrations, QoQ %, YoY % per `by`, largest first."""
+    snap = latest[[by, "registrations", "qoq_pct", "yoy_pct"]].sort_values("registrations", ascending=False)
+    snap["qoq_pct"] = snap["qoq_pct"].round(2)
+    snap["yoy_pct"] = snap["yoy_pct"].round(2)
+    return snap
+
+
+def latest_snapshot(cube: pd.DataFrame, by: str = "category", categories=None, manufacturers=None,
+                    start=None, end=None) -> pd.DataFrame:
+    """snapshot() of the latest quarter in a slice: category TOTALs, or manufacturers."""
+    if by == "category":
+        manufacturers = "TOTAL"
+    f = cube_slice(cube, categories=categories or _categories(cube), manufacturers=manufacturers,
+                   start=start, end=end)
+    if by == "manufacturer":
+        f = f[f["manufacturer"] != "TOTAL"]
+    return snapshot(latest_rows(f), by=by)
+
+
+def trend(cube: pd.DataFrame, categories=None, manufacturers="TOTAL", start=None, end=None) -> pd.DataFrame:
+    """Time series rows (date, category, manufacturer, registrations, qoq_pct, yoy_pct)."""
+    f = cube_slice(cube, categories=categories or _categories(cube), manufacturers=manufacturers,
+                   start=start, end=end)
+    return f[["date", "category", "manufacturer", "registrations", "qoq_pct", "yoy_pct"]]
+
+
+@timed
+def projection(fc: pd.DataFrame, categories=None, manufacturers="TOTAL", horizon: int = 1) -> pd.DataFrame:
+    """Forecast rows `horizon` quarters ahead for the selection (TOTAL per category by default)."""
+    if fc.empty:
+        return fc
+    mask = fc["horizon"].to_numpy() == horizon
+    if categories is not None:
+        mask &= fc["category"].isin([categories] if isinstance(categories, str) else categories).to_numpy()
+    else:
+        mask &= (fc["category"] != ALL_CATEGORIES).to_numpy()
+    if manufacturers is not None:
+        mask &= fc["manufacturer"].isin([manufacturers] if isinstance(manufacturers, str) else manufacturers).to_numpy()
+    cols = ["date", "quarter", "category", "manufacturer", "forecast", "lower", "upper",
+            "qoq_pct", "yoy_pct", "model", "backtest_mape_pct"]
+    out = fc.loc[mask, cols].sort_values("forecast", ascending=False).reset_index(drop=True)
+    out[["qoq_pct", "yoy_pct", "backtest_mape_pct"]] = out[["qoq_pct", "yoy_pct", "backtest_mape_pct"]].round(2)
+    return out
+
+
+LEADERBOARD_COLS = ["date", "quarter", "category", "rank", "rank_change", "manufacturer", "registrations",
+                    "share_pct", "share_chg_qoq_pp", "share_chg_yoy_pp", "qoq_pct", "yoy_pct"]
+
+
+def leaderboard(index: ShareIndex, category: str = ALL_CATEGORIES, date=None, n: int = 10,
+                by: str = "share") -> pd.DataFrame:
+    """Top-n manufacturers of one (quarter, category) by share rank, YoY % or share gain."""
+    return index.leaderboard(category, date=date, n=n, by=by)[LEADERBOARD_COLS]
+
+
+# leaders() across categories: ranks aren't comparable, so share sorts by share_pct
+_LEADER_SORT = {"share": "share_pct", "yoy": "yoy_pct", "gain": "share_chg_qoq_pp"}
+
+
+def leaders(index: ShareIndex, date=None, n: int = 1, by: str = "yoy") -> pd.DataFrame:
+    """Top-n per category (excluding ALL) from the index, best first across categories."""
+    date = index.latest if date is None else date
+    parts = [index.leaderboard(c, date=date, n=n, by=by) for c in index.categories(date) if c != ALL_CATEGORIES]
+    if not parts:
+        return index.df.iloc[0:0]
+    return pd.concat(parts).sort_values(_LEADER_SORT[by], ascending=False)
+
+
+def rollup(store, time: str = "quarter", geo: str = "national", categories=None, manufacturers=None,
+           states=None, rtos=None, start=None, end=None, growth: bool = False) -> pd.DataFrame:
+    """Registrations at any (time, geo) level from the materialized rollups (RollupStore.query)."""
+    return store.query(time, geo, categories=categories, manufacturers=manufacturers, states=states, rtos=rtos,
+                       start=start, end=end, growth=growth)
+
+
+QUERIES = {
+    "kpis": kpis,
+    "fastest_category": fastest_category,
+    "top_manufacturers": top_manufacturers,
+    "snapshot": latest_snapshot,
+    "trend": trend,
+    "projection": projection,
+    "leaderboard": leaderboard,
+    "rollup": rollup,
+}
+# what each query runs on and the version its results are cached under (default: the growth cube)
+_INPUTS = {"projection": (load_forecasts, forecast_version),
+           "leaderboard": (load_share_index, share_version),
+           "rollup": (load_rollups, rollup_version)}
+
+
+# ---- Cached, JSON-ready entry point (API/CLI) ----
+def query(name: str, **params):
+    """
+    Run QUERIES[name] on the full cube and return JSON-ready data (dicts/lists,
+    ISO dates, NaN -> None). Cached per (query, params, dataset version).
+    """
+    if name not in QUERIES:
+        raise KeyError(f"Unknown query: {name} (one of {', '.join(QUERIES)})")
+    load, version = _INPUTS.get(name, (growth_cube, cube_version))
+    key = (name, tuple(sorted((k, _freeze(v)) for k, v in params.items() if v is not None)), version())
+    return _RESULTS.get_or_build(key, lambda: to_jsonable(QUERIES[name](load(), **params)))
+
+
+def to_jsonable(obj):
+    if isinstance(obj, pd.DataFrame):
+        return [to_jsonable(r) for r in obj.to_dict("records")]
+    if isinstance(obj, dict):
+        return {k: to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, pd.Timestamp):
+        return obj.date().isoformat()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float):
+        # % columns are float32 in the cube; don't ship their noise digits
+        return None if math.isnan(obj) else round(obj, 4)
+    return obj
+
+
+def _categories(cube):
+    return [c for c in cube.index.levels[0] if c != ALL_CATEGORIES]
+
+
+def _pct(new, old):
+    if old is None or pd.isna(old) or old == 0:
+        return None
+    return float((new - old) / old * 100)
@@ -0,0 +1,86 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.analytics import QUERIES, cube_version, query
+from src.utils import get_logger
+
+log = get_logger("api")
+
+# Read-only JSON API over src.analytics, for jobs that want the dashboard's
+# numbers without a Streamlit session:
+#   GET /kpis?categories=2W,4W&end=2025-06-30
+#   GET /fastest_category   GET /top_manufacturers?n=3
+#   GET /snapshot?by=manufacturer&categories=2W   GET /trend?categories=4W&start=2024-01-01
+#   GET /projection?categories=2W&manufacturers=Honda,TVS&horizon=1
+#   GET /leaderboard?category=2W&by=gain&n=5
+#   GET /rollup?time=month&geo=state&states=KA,MH&categories=2W&growth=1
+#   GET /version
+# Results are cached per dataset version (see analytics.query).
+
+LIST_PARAMS = {"categories", "manufacturers", "states", "rtos"}
+INT_PARAMS = {"n", "horizon"}
+BOOL_PARAMS = {"growth"}
+
+
+def parse_params(qs: str) -> dict:
+    params = {}
+    for k, v in parse_qs(qs).items():
+        v = v[-1]
+        if k in LIST_PARAMS:
+            params[k] = [x for x in v.split(",") if x]
+        elif k in INT_PARAMS:
+            params[k] = int(v)
+        elif k in BOOL_PARAMS:
+            params[k] = v.lower() in ("1", "true", "yes")
+        else:
+            params[k] = v
+    return params
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path.strip("/")
+        try:
+            if name == "version":
+                body = {"version": list(cube_version())}
+            elif name in QUERIES:
+                body = query(name, **parse_params(url.query))
+            else:
+                return self._send(404, {"error": f"unknown endpoint /{name}", "endpoints": list(QUERIES)})
+        except (TypeError, ValueError, KeyError) as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            # anything else (no processed data yet, a bug) is still a JSON reply, not a dropped connection
+            log.exception(f"GET {self.path} failed")
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(200, body)
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        log.debug(fmt % args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8600) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = 8600):
+    server = make_server(host, port)
+    log.info(f"Analytics API on http://{host}:{server.server_address[1]}/ ({', '.join(QUERIES)}, version)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
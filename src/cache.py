@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_nbytes(obj) -> int:
+    """Approximate in-memory size of a DataFrame/Series (or a tuple of them)."""
+    if isinstance(obj, (tuple, list)):
+        return sum(frame_nbytes(o) for o in obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    return 0
+
+
+def _freeze(x):
+    """Lists/tuples (nested) -> tuples, so filters/columns/params can be part of a cache key."""
+    if isinstance(x, (list, tuple)):
+        return tuple(_freeze(v) for v in x)
+    return x
+
+
+class LRUCache:
+    """
+    Thread-safe LRU bounded by entry count and total bytes. Meant to live at
+    module level, so every Streamlit session in the process shares it.
+
+    max_bytes is a soft cap: least-recently-used entries are evicted until the
+    total fits, but the entry just inserted is always kept (even if it alone
+    is larger than the cap).
+    """
+
+    def __init__(self, max_items: int = 64, max_bytes: int = None, sizeof=frame_nbytes):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[object, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return hit[0]
+
+    def put(self, key, value, size: int = None):
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._data[key] = (value, size)
+            self.nbytes += size
+            while len(self._data) > 1 and (
+                    len(self._data) > self.max_items
+                    or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, build())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        return {"items": len(self._data), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
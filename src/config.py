@@ -1,16 +1,46 @@
+from functools import lru_cache
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Settings are resolved on first access (module __getattr__), not at import:
+# that is when .env is loaded, and nothing is created on disk until a writer
+# needs it (ensure_data_dirs / the save_* helpers create their own parents).
 
-DATA_DIR = Path(os.getenv("DATA_DIR", "./data")).resolve()
-RAW_DIR = DATA_DIR / "raw"
-PROCESSED_DIR = DATA_DIR / "processed"
 
-VAHAN_BASE_URL = os.getenv("VAHAN_BASE_URL")
-DB_URL = os.getenv("DB_URL", "sqlite:///data/registrations.db")
+@lru_cache(maxsize=None)
+def _settings() -> dict:
+    from dotenv import load_dotenv
+    load_dotenv()
 
-# Ensure dirs exist
-RAW_DIR.mkdir(parents=True, exist_ok=True)
-PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+    data_dir = Path(os.getenv("DATA_DIR", "./data")).resolve()
+    return {
+        "DATA_DIR": data_dir,
+        "RAW_DIR": data_dir / "raw",
+        "PROCESSED_DIR": data_dir / "processed",
+        "VAHAN_BASE_URL": os.getenv("VAHAN_BASE_URL"),
+        "DB_URL": os.getenv("DB_URL", "sqlite:///data/registrations.db"),
+        # Where the app reads processed data from: "parquet" (data/processed), "shared" (data/processed
+        # via memory-mapped Arrow snapshots in SHARED_DIR, one copy for all workers) or "db" (DB_URL)
+        "DATA_BACKEND": os.getenv("DATA_BACKEND", "parquet"),
+        "SHARED_DIR": Path(os.getenv("SHARED_DIR") or (
+            "/dev/shm/vahan" if Path("/dev/shm").is_dir() else data_dir / "processed" / "_shared")).resolve(),
+        # Memory budget for parsed uploads shared across sessions (app/components/data_source.py)
+        "UPLOAD_CACHE_MB": int(os.getenv("UPLOAD_CACHE_MB", "512")),
+        # Memory budget for memoized per-filter views (derived frames + figures)
+        "VIEW_CACHE_MB": int(os.getenv("VIEW_CACHE_MB", "256")),
+        # Log hot-path timings (src/perf.py) for every run in the process, not just when the sidebar panel asks
+        "PERF_LOG": os.getenv("PERF_LOG", "").lower() in ("1", "true", "yes"),
+    }
+
+
+def __getattr__(name):
+    try:
+        return _settings()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def ensure_data_dirs():
+    """Create data/raw and data/processed (used to happen on import)."""
+    for d in (_settings()["RAW_DIR"], _settings()["PROCESSED_DIR"]):
+        d.mkdir(parents=True, exist_ok=True)
@@ -1,7 +1,37 @@
+import numpy as np
 import pandas as pd
 
+from src.perf import timed
+from src.utils import get_logger
+
+log = get_logger("clean")
+
 REQUIRED_COLS = ["date", "year", "quarter", "category", "manufacturer", "registrations"]
 
+# Compact schema: labels are dictionary-encoded (pandas categorical <-> parquet
+# dictionary), counts int32, year int16. `date` stays the real quarter key;
+# `quarter` is kept as a (categorical) label for display and partitioning.
+COMPACT_DTYPES = {
+    "category": "category",
+    "manufacturer": "category",
+    "quarter": "category",
+    "state": "category",
+    "rto": "category",
+    "year": "int16",
+    "registrations": "int32",
+}
+
+def to_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known columns to COMPACT_DTYPES (in place). Counts that overflow int32 stay int64."""
+    for col, dtype in COMPACT_DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == "int32" and df[col].abs().max() > np.iinfo(np.int32).max:
+            continue
+        df[col] = df[col].astype(dtype)
+    return df
+
+@timed
 def standardize(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     # enforce columns
@@ -14,11 +44,17 @@ def standardize(df: pd.DataFrame) -> pd.DataFrame:
     # Ensure quarter is consistent string like '2025Q2'
     if "quarter" not in df or df["quarter"].isna().any():
         df["quarter"] = df["date"].dt.to_period("Q").astype(str).str.replace("Q", "Q", regex=False)
-    df["category"] = df["category"].astype(str)
-    df["manufacturer"] = df["manufacturer"].astype(str)
-    df["registrations"] = pd.to_numeric(df["registrations"], errors="coerce").fillna(0).astype(int)
-    return df
+    for col in ("category", "manufacturer"):
+        if df[col].dtype != "category":
+            df[col] = df[col].astype(str)
+    regs = pd.to_numeric(df["registrations"], errors="coerce")
+    if regs.isna().any():
+        # validate_csvs quarantines these instead; here they'd silently become 0
+        log.warning(f"standardize: {int(regs.isna().sum()):,} missing/non-numeric registrations set to 0")
+    df["registrations"] = regs.fillna(0).astype(int)
+    return to_compact(df)
 
+@timed
 def ensure_quarter_order(df: pd.DataFrame) -> pd.DataFrame:
     df = df.sort_values(["category", "manufacturer", "date"]).reset_index(drop=True)
     return df
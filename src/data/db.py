@@ -0,0 +1,255 @@
+import threading
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import (Column, Date, Index, Integer, MetaData, String, Table, and_, bindparam, create_engine,
+                        delete, event, func, insert, literal, select, union_all, update)
+
+from src.cache import LRUCache, _freeze
+from src.config import DB_URL
+from src.data.clean import to_compact
+from src.features.growth import CUBE_INDEX, ALL_CATEGORIES, quarter_key
+from src.utils import get_logger
+
+log = get_logger("db")
+
+# SQL backend for the processed dataset. Only base (manufacturer-level) rows are
+# stored; TOTAL/ALL rollups and QoQ/YoY lags are computed by the database at
+# query time, so sessions pull just the rows they display.
+
+metadata = MetaData()
+
+registrations = Table(
+    "registrations", metadata,
+    Column("date", Date, nullable=False),
+    Column("year", Integer, nullable=False),
+    Column("quarter", String(8), nullable=False),
+    Column("qkey", Integer, nullable=False),   # quarters since 1970Q1 (see growth.quarter_key)
+    Column("category", String(32), nullable=False),
+    Column("manufacturer", String(128), nullable=False),
+    Column("registrations", Integer, nullable=False),
+    # lookups/lag joins are by series then quarter; deletes/rollups by quarter
+    Index("ix_reg_series_q", "category", "manufacturer", "qkey", unique=True),
+    Index("ix_reg_q", "qkey"),
+)
+
+# single-row table bumped on every write; query caches key on it
+dataset_meta = Table(
+    "dataset_meta", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+INSERT_CHUNK = 50_000
+
+_ENGINES: dict = {}
+_ENGINE_LOCK = threading.Lock()
+# query results per (url, query, filters, DB version); a write bumps the version
+_QUERY_CACHE = LRUCache(max_items=32)
+
+
+def get_engine(url: str = None):
+    """One pooled engine per URL per process. SQLite gets WAL for concurrent readers."""
+    url = url or DB_URL
+    with _ENGINE_LOCK:
+        eng = _ENGINES.get(url)
+        if eng is None:
+            eng = create_engine(url, pool_pre_ping=True)
+            if eng.dialect.name == "sqlite":
+                if eng.url.database and eng.url.database != ":memory:":
+                    Path(eng.url.database).parent.mkdir(parents=True, exist_ok=True)
+                event.listen(eng, "connect", _sqlite_pragmas)
+            metadata.create_all(eng)
+            _ENGINES[url] = eng
+    return eng
+
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
+def save_to_db(df: pd.DataFrame, url: str = None, replace_all: bool = False) -> int:
+    """
+    Bulk-load base rows (TOTAL rows are skipped; the DB rolls them up).
+    Rows in df replace stored rows with the same (category, manufacturer,
+    quarter), like pipeline.append_delta; other series in those quarters are
+    kept. replace_all clears the table first. Returns rows inserted.
+    """
+    eng = get_engine(url)
+    base = df.loc[df["manufacturer"] != "TOTAL",
+                  ["date", "year", "quarter", "category", "manufacturer", "registrations"]]
+    rows = pd.DataFrame({
+        "date": pd.to_datetime(base["date"]).dt.date,
+        "year": base["year"].astype(int),
+        "quarter": base["quarter"].astype(str),
+        "qkey": quarter_key(base["date"]).astype(int),
+        "category": base["category"].astype(str),
+        "manufacturer": base["manufacturer"].astype(str),
+        "registrations": base["registrations"].astype(int),
+    })
+
+    with eng.begin() as conn:
+        if replace_all:
+            conn.execute(delete(registrations))
+        elif len(rows):
+            # executemany over the ix_reg_series_q key, one round trip per chunk
+            keys = rows[["category", "manufacturer", "qkey"]].drop_duplicates()
+            stmt = delete(registrations).where(and_(registrations.c.category == bindparam("k_cat"),
+                                                    registrations.c.manufacturer == bindparam("k_mfr"),
+                                                    registrations.c.qkey == bindparam("k_q")))
+            for start in range(0, len(keys), INSERT_CHUNK):
+                chunk = keys.iloc[start:start + INSERT_CHUNK]
+                conn.execute(stmt, [{"k_cat": c, "k_mfr": m, "k_q": int(q)} for c, m, q in chunk.itertuples(index=False)])
+        stmt = insert(registrations)
+        for start in range(0, len(rows), INSERT_CHUNK):
+            # executemany, one round trip per chunk
+            chunk = rows.iloc[start:start + INSERT_CHUNK]
+            conn.execute(stmt, chunk.to_dict("records"))
+        _bump_version(conn)
+    log.info(f"DB loaded: {len(rows):,} rows -> {eng.url.render_as_string(hide_password=True)}")
+    return len(rows)
+
+
+def _bump_version(conn):
+    res = conn.execute(update(dataset_meta).where(dataset_meta.c.id == 1)
+                       .values(version=dataset_meta.c.version + 1))
+    if res.rowcount == 0:
+        conn.execute(insert(dataset_meta).values(id=1, version=1))
+
+
+def db_version(url: str = None) -> int:
+    with get_engine(url).connect() as conn:
+        v = conn.execute(select(dataset_meta.c.version).where(dataset_meta.c.id == 1)).scalar()
+    return v or 0
+
+
+def query_growth(filters=None, include_all: bool = False, url: str = None) -> pd.DataFrame:
+    """
+    Processed-shaped rows (base + per-category TOTAL [+ ALL/TOTAL]) with
+    prev_q/qoq_pct/prev_y/yoy_pct computed server-side. Lags are joins on the
+    calendar quarter key, so gaps give NULL rather than the wrong period.
+    filters: the DNF list from storage.processed_filters.
+    """
+    start, end, cats, mfrs = _parse_filters(filters)
+    r = registrations
+    lo = quarter_key([start])[0] - 4 if start is not None else None
+
+    def scoped(q):
+        if cats is not None:
+            q = q.where(r.c.category.in_(cats))
+        if lo is not None:
+            q = q.where(r.c.qkey >= int(lo))
+        return q
+
+    def rollup_cols(category, manufacturer):
+        return (category, manufacturer, r.c.qkey, func.min(r.c.date).label("date"),
+                func.min(r.c.quarter).label("quarter"), func.min(r.c.year).label("year"),
+                func.sum(r.c.registrations).label("registrations"))
+
+    parts = []
+    base_mfrs = None if mfrs is None else [m for m in mfrs if m != "TOTAL"]
+    if base_mfrs is None or base_mfrs:
+        q = select(r.c.category, r.c.manufacturer, r.c.qkey, r.c.date, r.c.quarter, r.c.year,
+                   r.c.registrations)
+        if base_mfrs is not None:
+            q = q.where(r.c.manufacturer.in_(base_mfrs))
+        parts.append(scoped(q))
+    if mfrs is None or "TOTAL" in mfrs:
+        q = select(*rollup_cols(r.c.category, literal("TOTAL").label("manufacturer")))
+        parts.append(scoped(q).group_by(r.c.category, r.c.qkey))
+        if include_all and (cats is None or ALL_CATEGORIES in cats):
+            q = select(*rollup_cols(literal(ALL_CATEGORIES).label("category"),
+                                    literal("TOTAL").label("manufacturer")))
+            if lo is not None:
+                q = q.where(r.c.qkey >= int(lo))
+            parts.append(q.group_by(r.c.qkey))
+    if not parts:
+        return _empty_growth()
+
+    u = union_all(*parts).cte("u")
+    p, y = u.alias("p"), u.alias("y")
+
+    def lag_join(a, n):
+        return and_(a.c.category == u.c.category, a.c.manufacturer == u.c.manufacturer,
+                    a.c.qkey == u.c.qkey - n)
+
+    q = (select(u.c.date, u.c.year, u.c.quarter, u.c.category, u.c.manufacturer, u.c.registrations,
+                p.c.registrations.label("prev_q"),
+                ((u.c.registrations - p.c.registrations) * 100.0 / p.c.registrations).label("qoq_pct"),
+                y.c.registrations.label("prev_y"),
+                ((u.c.registrations - y.c.registrations) * 100.0 / y.c.registrations).label("yoy_pct"))
+         .select_from(u.outerjoin(p, lag_join(p, 1)).outerjoin(y, lag_join(y, 4)))
+         .order_by(u.c.category, u.c.manufacturer, u.c.qkey))
+    if start is not None:
+        q = q.where(u.c.qkey >= int(quarter_key([start])[0]))
+    if end is not None:
+        q = q.where(u.c.qkey <= int(quarter_key([end])[0]))
+
+    with get_engine(url).connect() as conn:
+        df = pd.read_sql(q, conn, parse_dates=["date"])
+    return to_compact(df)
+
+
+def query_series_keys(url: str = None) -> pd.DataFrame:
+    """
+    One row per stored series: category, manufacturer, first_date, last_date.
+    A GROUP BY over the series index (no lags, no TOTAL rollups), for filter widgets.
+    """
+    r = registrations
+    q = (select(r.c.category, r.c.manufacturer, func.min(r.c.date).label("first_date"),
+                func.max(r.c.date).label("last_date"))
+         .group_by(r.c.category, r.c.manufacturer)
+         .order_by(r.c.category, r.c.manufacturer))
+    with get_engine(url).connect() as conn:
+        return pd.read_sql(q, conn, parse_dates=["first_date", "last_date"])
+
+
+def load_series_keys_db(url: str = None) -> pd.DataFrame:
+    """query_series_keys, cached per DB version."""
+    return _cached((url or DB_URL, "series_keys"), lambda: query_series_keys(url), url)
+
+
+def load_processed_db(filters=None, columns=None, url: str = None) -> pd.DataFrame:
+    """DB-backed equivalent of storage.load_processed_cached (cached per DB version)."""
+    df = _cached((url or DB_URL, "processed", _freeze(filters)),
+                 lambda: query_growth(filters, url=url), url)
+    return df[columns] if columns else df
+
+
+def load_growth_cube_db(filters=None, url: str = None) -> pd.DataFrame:
+    """DB-backed equivalent of the growth_cube.parquet read (cached per DB version)."""
+    return _cached((url or DB_URL, "cube", _freeze(filters)),
+                   lambda: query_growth(filters, include_all=True, url=url).set_index(CUBE_INDEX).sort_index(),
+                   url)
+
+
+def _cached(key, build, url):
+    return _QUERY_CACHE.get_or_build(key + (db_version(url),), build)
+
+
+def _parse_filters(filters):
+    start = end = cats = mfrs = None
+    for col, op, val in filters or []:
+        if col == "quarter":
+            continue  # implied by the date bounds
+        if col == "date" and op == ">=":
+            start = pd.Timestamp(val)
+        elif col == "date" and op == "<=":
+            end = pd.Timestamp(val)
+        elif col in ("category", "manufacturer") and op in ("in", "=="):
+            vals = [val] if op == "==" else list(val)
+            if col == "category":
+                cats = vals
+            else:
+                mfrs = vals
+        else:
+            raise ValueError(f"Unsupported filter for the DB backend: {(col, op, val)}")
+    return start, end, cats, mfrs
+
+
+def _empty_growth() -> pd.DataFrame:
+    return pd.DataFrame(columns=["date", "year", "quarter", "category", "manufacturer", "registrations",
+                                 "prev_q", "qoq_pct", "prev_y", "yoy_pct"])
@@ -1,9 +1,15 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from dataclasses import dataclass, asdict
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
-from src.config import RAW_DIR
-from src.utils import get_logger
+from src.config import RAW_DIR, VAHAN_BASE_URL
+from src.utils import ensure_dir, get_logger
 
 log = get_logger("fetch")
 
@@ -41,18 +47,322 @@ def generate_mock_quarterly(start_year=2023, end_year=2025) -> pd.DataFrame:
     df = pd.DataFrame(rows)
     return df
 
+MOCK_STATES = {"KA": ["KA01", "KA02", "KA03"], "MH": ["MH01", "MH02", "MH12"], "DL": ["DL01", "DL03"]}
+
+
+def split_mock_monthly(quarterly: pd.DataFrame, states=None, seed=42) -> pd.DataFrame:
+    """
+    Month x RTO rows (date = month start, plus state and rto) that add up
+    exactly to the quarterly rows (generate_mock_quarterly), so rollups built
+    from them agree with the processed data. Feeds src/features/rollup.py.
+    """
+    states = states or MOCK_STATES
+    rtos = np.array([(s, r) for s, rs in states.items() for r in rs])
+    q = quarterly.reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+
+    # each quarterly count is spread over its 3 months x every RTO: a fixed RTO mix per maker and a
+    # per-quarter month mix, drawn multinomially so the parts are integers summing to the count
+    maker = q.groupby(["category", "manufacturer"], sort=False).ngroup().to_numpy()
+    mix = rng.dirichlet(np.full(len(rtos), 4.0), maker.max() + 1)[maker]
+    months = rng.dirichlet(np.full(3, 20.0), len(q))
+    p = (months[:, :, None] * mix[:, None, :]).reshape(len(q), -1)
+    counts = rng.multinomial(q["registrations"].to_numpy(dtype=np.int64), p / p.sum(axis=1, keepdims=True))
+
+    row = np.repeat(np.arange(len(q)), p.shape[1])
+    month = np.tile(np.repeat(np.arange(3), len(rtos)), len(q))
+    rto = np.tile(np.arange(len(rtos)), 3 * len(q))
+    first = pd.PeriodIndex(q["quarter"], freq="Q").asfreq("M", how="start").asi8
+    return pd.DataFrame({
+        "date": pd.PeriodIndex.from_ordinals(first[row] + month, freq="M").to_timestamp(),
+        "state": rtos[rto, 0],
+        "rto": rtos[rto, 1],
+        "category": q["category"].to_numpy()[row],
+        "manufacturer": q["manufacturer"].to_numpy()[row],
+        "registrations": counts.ravel(),
+    })
+
 def save_raw_snapshot(df: pd.DataFrame, name: str = None) -> Path:
     name = name or datetime.now().strftime("mock_%Y%m%d_%H%M%S")
     out = RAW_DIR / f"{name}.csv"
+    ensure_dir(out.parent)
     df.to_csv(out, index=False)
     log.info(f"Raw snapshot saved: {out}")
     return out
 
-# ---- Placeholder for REAL scraping/ingest (wire later) ----
-def fetch_from_vahan_placeholder():
+# ---- REAL fetch: concurrent, rate-limited, resumable ----
+# Every (state, category, month) report is one FetchJob. A pool of workers, each
+# owning one reusable session (plain HTTP, or a headless Chrome when the page
+# needs JS), pulls jobs from a queue. Requests share one rate limiter, network
+# failures are retried with backoff (a page that doesn't parse fails at once),
+# and each finished job is checkpointed as its own CSV, in a folder per source
+# URL, so an interrupted run resumes where it stopped.
+
+FETCH_DIR = RAW_DIR / "vahan_fetch"
+DEFAULT_URL_TEMPLATE = (
+    "{base}?state={state}&category={category}&year={year}&month={month}"
+)
+_driver_path = None
+
+
+@dataclass(frozen=True)
+class FetchJob:
+    state: str
+    category: str
+    year: int
+    month: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.state}_{self.category}_{self.year}{self.month:02d}".replace(" ", "-")
+
+    @property
+    def date(self) -> str:
+        return f"{self.year}-{self.month:02d}-01"
+
+
+def make_jobs(states, categories, start: str, end: str) -> list:
+    """Cartesian product of states x categories x months ('YYYY-MM' bounds, inclusive)."""
+    months = pd.period_range(start, end, freq="M")
+    return [FetchJob(s, c, m.year, m.month) for s in states for c in categories for m in months]
+
+
+class RateLimiter:
+    """Shared async limiter: at most `rate` request starts per second across all workers."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HttpFetcher:
+    """Plain HTTP with a keep-alive session (for report pages reachable by GET)."""
+
+    def __init__(self, url_template: str, timeout: float = 30):
+        import requests
+        self.url_template = url_template
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.retry_on = (requests.RequestException, OSError)  # errors worth another attempt
+
+    def get(self, job: FetchJob) -> str:
+        r = self.session.get(self.url_template.format(**asdict(job)), timeout=self.timeout)
+        r.raise_for_status()
+        return r.text
+
+    def close(self):
+        self.session.close()
+
+
+class BrowserFetcher:
+    """A reusable headless Chrome; waits for the table instead of sleeping."""
+
+    def __init__(self, url_template: str, headless: bool = True, timeout: float = 30):
+        from selenium.common.exceptions import WebDriverException  # TimeoutException included
+        self.url_template = url_template
+        self.timeout = timeout
+        self.driver = setup_driver(headless=headless)
+        self.retry_on = (WebDriverException, OSError)
+
+    def get(self, job: FetchJob) -> str:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        self.driver.get(self.url_template.format(**asdict(job)))
+        WebDriverWait(self.driver, self.timeout).until(
+            EC.presence_of_element_located((By.XPATH, "//table//tr[2]"))
+        )
+        return self.driver.page_source
+
+    def close(self):
+        self.driver.quit()
+
+
+def setup_driver(headless: bool = True):
+    global _driver_path
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    opts = webdriver.ChromeOptions()
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--window-size=1600,1000")
+    if _driver_path is None:
+        # resolve/download chromedriver once per process, not once per browser
+        from webdriver_manager.chrome import ChromeDriverManager
+        _driver_path = ChromeDriverManager().install()
+    return webdriver.Chrome(service=Service(_driver_path), options=opts)
+
+
+def extract_biggest_table(html: str, table_id: str = None) -> pd.DataFrame:
+    """
+    The report table on a page: the one with id=table_id, else the one with the
+    most rows. Only that table is parsed (lxml, not bs4 over every table), and
+    numeric-looking columns ("12,345") come back as int64/float64.
+    """
+    from lxml import html as lxml_html
+    doc = lxml_html.fromstring(html)
+    if table_id:
+        tables = doc.xpath("//table[@id=$id]", id=table_id)
+    else:
+        tables = doc.xpath("//table")
+        # rows of the table itself, not of tables nested inside it
+        tables.sort(key=lambda t: len(t.xpath("./tr|./*/tr")), reverse=True)
+    if not tables:
+        raise RuntimeError("No tables found on page.")
+    return _parse_table(tables[0])
+
+
+def _parse_table(table) -> pd.DataFrame:
+    rows = table.xpath("./tr|./*/tr")
+    # header rows: everything in <thead>, else the leading all-<th> rows
+    n_head = sum(1 for r in rows if r.getparent().tag == "thead")
+    if not n_head:
+        while n_head < len(rows) and rows[n_head].xpath("./td") == [] and rows[n_head].xpath("./th"):
+            n_head += 1
+
+    header = None
+    for r in rows[:n_head]:
+        cells = []
+        for c in r.xpath("./th|./td"):
+            cells += [_cell_text(c)] * int(c.get("colspan", 1) or 1)
+        # stacked header rows are joined per column ("Registrations 2024")
+        header = cells if header is None else [
+            " ".join(x for x in (a, b) if x) for a, b in zip(header, cells + [""] * (len(header) - len(cells)))
+        ]
+
+    body = [[_cell_text(c) for c in r.xpath("./th|./td")] for r in rows[n_head:]]
+    width = max([len(header or [])] + [len(r) for r in body])
+    if header is None:
+        header = list(range(width))
+    header = header + [f"col_{i}" for i in range(len(header), width)]
+    cols = list(zip(*[r + [""] * (width - len(r)) for r in body])) if body else [()] * width
+
+    data = {}
+    for name, values in zip(header, cols):
+        col = pd.Series(values, dtype=object)
+        nums = pd.to_numeric(col.str.replace(",", "", regex=False).replace("", None), errors="coerce")
+        # numeric if every non-blank cell parsed
+        data[name] = nums if nums.notna().sum() == (col != "").sum() and nums.notna().any() else col
+    return pd.DataFrame(data)
+
+
+def _cell_text(cell) -> str:
+    return " ".join(cell.text_content().split())
+
+
+def table_to_rows(table: pd.DataFrame, job: FetchJob) -> pd.DataFrame:
+    """Maker-wise report table -> upload-shaped rows (date, state, category, manufacturer, registrations)."""
+    from src.data.ingest_upload import _column_mapping
+    mapping = _column_mapping([str(c) for c in table.columns])
+    table = table.rename(columns=lambda c: mapping[str(c)])
+    if "registrations" not in table.columns:
+        numeric = [c for c in table.columns if pd.api.types.is_numeric_dtype(table[c])]
+        if not numeric:
+            raise ValueError(f"{job.key}: no registrations column in {list(table.columns)}")
+        table = table.rename(columns={numeric[-1]: "registrations"})
+    if "manufacturer" not in table.columns:
+        raise ValueError(f"{job.key}: no maker column in {list(table.columns)}")
+    out = table[["manufacturer", "registrations"]].copy()
+    if not pd.api.types.is_numeric_dtype(out["registrations"]):
+        out["registrations"] = pd.to_numeric(out["registrations"].astype(str).str.replace(",", ""),
+                                             errors="coerce")
+    out = out.dropna(subset=["registrations"])
+    out = out[out["manufacturer"].astype(str).str.upper() != "TOTAL"]
+    out.insert(0, "date", job.date)
+    out.insert(1, "state", job.state)
+    out.insert(2, "category", job.category)
+    return out
+
+
+async def _fetch_all(jobs, make_fetcher, out_dir: Path, concurrency: int, rate: float,
+                     retries: int, backoff: float, table_id: str = None) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    limiter = RateLimiter(rate)
+    stats = {"done": 0, "failed": []}
+
+    async def worker():
+        fetcher = await asyncio.to_thread(make_fetcher)
+        try:
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                for attempt in range(retries + 1):
+                    await limiter.wait()
+                    try:
+                        html = await asyncio.to_thread(fetcher.get, job)
+                        rows = table_to_rows(extract_biggest_table(html, table_id), job)
+                    except Exception as e:
+                        if isinstance(e, fetcher.retry_on) and attempt < retries:
+                            await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+                            continue
+                        # out of attempts, or not a network error (a page that doesn't parse won't next time)
+                        log.warning(f"{job.key}: giving up after {attempt + 1} attempt(s) ({e})")
+                        stats["failed"].append(job.key)
+                        break
+                    _checkpoint(rows, out_dir / f"{job.key}.csv")
+                    stats["done"] += 1
+                    break
+        finally:
+            await asyncio.to_thread(fetcher.close)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(jobs)))))
+    return stats
+
+
+def _checkpoint(rows: pd.DataFrame, out: Path):
+    tmp = out.with_name(out.name + ".tmp")
+    rows.to_csv(tmp, index=False)
+    os.replace(tmp, out)
+
+
+def fetch_from_vahan(jobs, url_template: str = None, mode: str = "http", concurrency: int = 4,
+                     rate: float = 2.0, retries: int = 3, backoff: float = 1.0,
+                     out_dir: Path = None, headless: bool = True, table_id: str = None) -> pd.DataFrame:
     """
-    TODO: Implement Selenium/requests-based ingestion.
-    Return a DataFrame with columns:
-    ['date','year','quarter','category','manufacturer','registrations']
+    Fetch every job's report concurrently and return the combined rows
+    (date, state, category, manufacturer, registrations) — the shape
+    parse_uploaded_csv / scripts.04_process_csv accept.
+
+    Jobs already checkpointed are skipped, so re-running after a crash or
+    rate-limit ban only fetches what is missing. Checkpoints live in
+    out_dir/<hash of url_template>: another source never reuses them.
     """
-    raise NotImplementedError("Implement real Vahan fetch later.")
+    if url_template is None:
+        url_template = DEFAULT_URL_TEMPLATE.replace("{base}", VAHAN_BASE_URL or "")
+    out_dir = Path(out_dir or FETCH_DIR) / hashlib.sha1(url_template.encode()).hexdigest()[:12]
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    todo = [j for j in jobs if not (out_dir / f"{j.key}.csv").exists()]
+    log.info(f"Fetch: {len(jobs) - len(todo)} of {len(jobs)} job(s) already checkpointed; "
+             f"{len(todo)} to go ({mode}, concurrency={concurrency}, {rate}/s)")
+
+    if todo:
+        if mode == "http":
+            make_fetcher = lambda: HttpFetcher(url_template)
+        elif mode == "browser":
+            make_fetcher = lambda: BrowserFetcher(url_template, headless=headless)
+        else:
+            raise ValueError(f"Unknown fetch mode: {mode}")
+        stats = asyncio.run(_fetch_all(todo, make_fetcher, out_dir, concurrency, rate, retries,
+                                       backoff, table_id))
+        log.info(f"Fetch: {stats['done']} fetched, {len(stats['failed'])} failed")
+
+    parts = [pd.read_csv(out_dir / f"{j.key}.csv") for j in jobs if (out_dir / f"{j.key}.csv").exists()]
+    if not parts:
+        return pd.DataFrame(columns=["date", "state", "category", "manufacturer", "registrations"])
+    return pd.concat(parts, ignore_index=True)
@@ -1,39 +1,75 @@
-from typing import Union, IO
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Union, IO, Iterable
 import pandas as pd
 
+from src.data.clean import to_compact
+from src.perf import timed
 
 REQUIRED_CORE = ["category", "manufacturer", "registrations"]
+DATE_SPEC_COLS = ["date", "year", "month", "quarter"]
+OUTPUT_COLS = ["date", "year", "quarter", "category", "manufacturer", "registrations"]
+# Month x RTO grain kept by parse_granular_csv (see src/features/rollup.py)
+GEO_COLS = ["state", "rto"]
+GRANULAR_COLS = ["date", "state", "rto", "category", "manufacturer", "registrations"]
+UNSPECIFIED = "NA"
+
+ALIASES = {
+    "vehicle_category": "category",
+    "vehicle_type": "category",
+    "brand": "manufacturer",
+    "maker": "manufacturer",
+    "oem": "manufacturer",
+    "regns": "registrations",
+    "count": "registrations",
+    "qty": "registrations",
+    "units": "registrations",
+    "state_name": "state",
+    "rto_code": "rto",
+    "rto_name": "rto",
+    "district": "rto",
+}
+
+
+def _column_mapping(columns) -> dict:
+    """Raw header -> normalized name (lower/strip + aliases)."""
+    mapping = {c: c.strip().lower() for c in columns}
+    for old, new in ALIASES.items():
+        if new in mapping.values():
+            continue
+        for raw, norm in mapping.items():
+            if norm == old:
+                mapping[raw] = new
+                break
+    return mapping
 
 
 def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Lower/strip col names and map common aliases to expected names."""
-    df = df.copy()
-    df.columns = [c.strip().lower() for c in df.columns]
-
-    aliases = {
-        "vehicle_category": "category",
-        "vehicle_type": "category",
-        "brand": "manufacturer",
-        "maker": "manufacturer",
-        "oem": "manufacturer",
-        "regns": "registrations",
-        "count": "registrations",
-        "qty": "registrations",
-        "units": "registrations",
-    }
-    for old, new in aliases.items():
-        if old in df.columns and new not in df.columns:
-            df = df.rename(columns={old: new})
+    # header-only rename; the frame is owned by the caller, no data copy
+    mapping = _column_mapping(df.columns)
+    df.columns = [mapping[c] for c in df.columns]
     return df
 
 
-def _ensure_quarter_cols(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+def _parse_dates(s: pd.Series) -> pd.Series:
+    """Date strings -> datetimes (NaT if unparseable). The format is inferred from the first value;
+    only the misses are retried one by one, so mixed spellings (2024-01-15 / 2024/01/15) still parse."""
+    dt = pd.to_datetime(s, errors="coerce")
+    miss = dt.isna() & s.notna()
+    if miss.any():
+        dt[miss] = pd.to_datetime(s[miss], errors="coerce", format="mixed")
+    return dt
 
+
+def _ensure_quarter_cols(df: pd.DataFrame, errors: str = "raise") -> pd.DataFrame:
+    """Date spec -> quarter-end `date`, `year`, `quarter`. errors="coerce" leaves NaT instead of raising."""
     # Path 1: explicit date column
     if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        if df["date"].isna().any():
+        df["date"] = _parse_dates(df["date"])
+        if errors == "raise" and df["date"].isna().any():
             bad = df[df["date"].isna()].index[:3].tolist()
             raise ValueError(f"Unparseable 'date' values at rows: {bad}...")
         q = df["date"].dt.to_period("Q")
@@ -48,7 +84,7 @@ def _ensure_quarter_cols(df: pd.DataFrame) -> pd.DataFrame:
         df["year"] = pd.to_numeric(df["year"], errors="coerce")
         df["month"] = pd.to_numeric(df["month"], errors="coerce")
         dt = pd.to_datetime(dict(year=df["year"], month=df["month"], day=1), errors="coerce")
-        if dt.isna().any():
+        if errors == "raise" and dt.isna().any():
             raise ValueError("Failed to build dates from year/month.")
         q = dt.dt.to_period("Q")
         df["date"] = q.dt.to_timestamp(how="end").dt.normalize()
@@ -62,20 +98,22 @@ def _ensure_quarter_cols(df: pd.DataFrame) -> pd.DataFrame:
         q_raw = df["quarter"].astype(str).str.strip().str.upper()
         q_norm = q_raw.where(q_raw.str.match(r"^Q[1-4]$"),
                              "Q" + q_raw.str.extract(r"([1-4])", expand=False).fillna(""))
-        if (q_norm.str.match(r"^Q[1-4]$").sum() != len(q_norm)):
-            raise ValueError("Invalid 'quarter' values. Use 1-4 or Q1-Q4.")
+        valid = q_norm.str.match(r"^Q[1-4]$") & df["year"].notna()
+        if errors == "raise" and not valid.all():
+            raise ValueError("Invalid 'year'/'quarter' values. Use a year plus 1-4 or Q1-Q4.")
 
-        qlabels = df["year"].astype(int).astype(str) + q_norm
+        qlabels = df["year"].where(valid, 1970).astype(int).astype(str) + q_norm.where(valid, "Q1")
         p = pd.PeriodIndex(qlabels, freq="Q")
         df["quarter"] = p.astype(str)
-        # DatetimeIndex -> normalize to midnight
-        df["date"] = p.to_timestamp(how="end").normalize()
-        df["year"] = df["date"].year
+        # DatetimeIndex -> normalize to midnight (NaT where the spec was invalid)
+        df["date"] = p.to_timestamp(how="end").normalize().where(valid.to_numpy())
+        df["year"] = df["date"].dt.year
         return df
 
     raise ValueError("Provide either 'date' OR ('year','month') OR ('year','quarter').")
 
 
+@timed
 def parse_uploaded_csv(file_like: Union[str, IO]) -> pd.DataFrame:
     """
     Read an uploaded CSV and return a standardized quarterly DataFrame.
@@ -96,7 +134,170 @@ def parse_uploaded_csv(file_like: Union[str, IO]) -> pd.DataFrame:
     df["registrations"] = pd.to_numeric(df["registrations"], errors="coerce").fillna(0).astype(int)
 
     # Final schema + sort
-    out = (df[["date", "year", "quarter", "category", "manufacturer", "registrations"]]
+    out = (df[OUTPUT_COLS]
            .sort_values(["category", "manufacturer", "date"])
            .reset_index(drop=True))
-    return out
\ No newline at end of file
+    return out
+
+
+@timed
+def parse_csv_chunked(path: Union[str, Path], chunksize: int = 500_000) -> pd.DataFrame:
+    """
+    Streaming version of parse_uploaded_csv for multi-GB exports.
+
+    Reads only the needed columns in chunks (all as strings, converted per
+    chunk), normalizes aliases/dates per chunk and folds each one into a
+    running (date, category, manufacturer) sum. Peak memory is bounded by
+    chunksize plus the size of the quarterly aggregate, not the input file.
+    Rows sharing a quarter (monthly, state/RTO-level) are summed.
+    """
+    mapping = _column_mapping(pd.read_csv(path, nrows=0).columns)
+    wanted = set(REQUIRED_CORE + DATE_SPEC_COLS)
+    usecols = [raw for raw, norm in mapping.items() if norm in wanted]
+
+    missing = [c for c in REQUIRED_CORE if c not in mapping.values()]
+    if missing:
+        raise ValueError(f"Missing core columns: {missing}. "
+                         f"Need {REQUIRED_CORE} plus a date spec.")
+
+    keys = ["date", "category", "manufacturer"]
+    acc = None
+    pending = []
+    pending_rows = 0
+    reader = pd.read_csv(path, usecols=usecols, dtype={c: str for c in usecols}, chunksize=chunksize)
+    for chunk in reader:
+        chunk.columns = [mapping[c] for c in chunk.columns]
+        chunk = _ensure_quarter_cols(chunk)
+        chunk["registrations"] = pd.to_numeric(chunk["registrations"], errors="coerce").fillna(0)
+        part = chunk.groupby(keys, sort=False)["registrations"].sum()
+        pending.append(part)
+        pending_rows += len(part)
+        # fold partials into the accumulator once they outgrow one chunk
+        if pending_rows >= chunksize:
+            acc = _fold(acc, pending)
+            pending, pending_rows = [], 0
+
+    acc = _fold(acc, pending)
+    if acc is None:
+        return pd.DataFrame(columns=OUTPUT_COLS)
+
+    out = acc.reset_index()
+    q = out["date"].dt.to_period("Q")
+    out["year"] = out["date"].dt.year
+    out["quarter"] = q.astype(str)
+    out["registrations"] = out["registrations"].astype(int)
+    return (out[OUTPUT_COLS]
+            .sort_values(["category", "manufacturer", "date"])
+            .reset_index(drop=True))
+
+
+def _ensure_month_cols(df: pd.DataFrame) -> pd.DataFrame:
+    """date (or year + month) -> month-start `date`; quarter-only inputs can't be split."""
+    if "date" in df.columns:
+        dt = _parse_dates(df["date"])
+    elif {"year", "month"}.issubset(df.columns):
+        dt = pd.to_datetime(dict(year=pd.to_numeric(df["year"], errors="coerce"),
+                                 month=pd.to_numeric(df["month"], errors="coerce"), day=1), errors="coerce")
+    else:
+        raise ValueError("Monthly granularity needs 'date' OR ('year','month').")
+    if dt.isna().any():
+        bad = df.index[dt.isna()][:3].tolist()
+        raise ValueError(f"Unparseable dates at rows: {bad}...")
+    df["date"] = dt.dt.to_period("M").dt.to_timestamp()
+    return df
+
+
+def parse_granular_csv(path: Union[str, Path], chunksize: int = 500_000, skiprows=None) -> pd.DataFrame:
+    """
+    Like parse_csv_chunked, but keeps the month and the state/RTO instead of
+    collapsing to quarters: returns GRANULAR_COLS, one row per
+    (month, state, rto, category, manufacturer). Missing geo columns are
+    filled with UNSPECIFIED ("NA"). skiprows (0-based file rows, e.g.
+    Validated.quarantined_rows) are left out.
+    """
+    mapping = _column_mapping(pd.read_csv(path, nrows=0).columns)
+    wanted = set(REQUIRED_CORE + DATE_SPEC_COLS + GEO_COLS)
+    usecols = [raw for raw, norm in mapping.items() if norm in wanted]
+
+    missing = [c for c in REQUIRED_CORE if c not in mapping.values()]
+    if missing:
+        raise ValueError(f"Missing core columns: {missing}. "
+                         f"Need {REQUIRED_CORE} plus a date spec.")
+
+    keys = GRANULAR_COLS[:-1]
+    parts = []
+    reader = pd.read_csv(path, usecols=usecols, dtype={c: str for c in usecols}, chunksize=chunksize,
+                         skiprows=skiprows or None)
+    for chunk in reader:
+        chunk.columns = [mapping[c] for c in chunk.columns]
+        chunk = _ensure_month_cols(chunk)
+        for col in GEO_COLS:
+            chunk[col] = chunk[col].fillna(UNSPECIFIED) if col in chunk.columns else UNSPECIFIED
+        chunk["registrations"] = pd.to_numeric(chunk["registrations"], errors="coerce").fillna(0)
+        parts.append(chunk.groupby(keys, sort=False, observed=True)["registrations"].sum())
+    if not parts:
+        return pd.DataFrame(columns=GRANULAR_COLS)
+
+    out = pd.concat(parts).groupby(level=list(range(len(keys))), sort=False).sum().reset_index()
+    out["registrations"] = out["registrations"].astype(int)
+    for col in keys[1:]:
+        out[col] = out[col].astype("category")
+    return (to_compact(out[GRANULAR_COLS])
+            .sort_values(["category", "manufacturer", "state", "rto", "date"])
+            .reset_index(drop=True))
+
+
+def _fold(acc, parts):
+    if acc is not None:
+        parts = [acc] + parts
+    if not parts:
+        return acc
+    return pd.concat(parts).groupby(level=[0, 1, 2], sort=False).sum()
+
+
+def expand_csv_paths(spec: Union[str, Path, Iterable]) -> list:
+    """A directory (its *.csv), a glob pattern, a single file, or a list of those -> sorted paths."""
+    if isinstance(spec, (list, tuple)):
+        return sorted({p for s in spec for p in expand_csv_paths(s)})
+    p = Path(spec)
+    if p.is_dir():
+        return sorted(p.glob("*.csv"))
+    if glob.has_magic(str(spec)):
+        return sorted(Path(x) for x in glob.glob(str(spec), recursive=True))
+    return [p]
+
+
+def _parse_one(path: Path, chunked: bool, chunksize: int) -> pd.DataFrame:
+    """One file -> quarterly (date, category, manufacturer) grain; rows within a file are summed."""
+    if chunked:
+        return parse_csv_chunked(path, chunksize=chunksize)
+    df = parse_uploaded_csv(path)
+    return (df.groupby(["date", "year", "quarter", "category", "manufacturer"], as_index=False, sort=False)
+            ["registrations"].sum())
+
+
+def parse_many(spec, workers: int = None, chunked: bool = False, chunksize: int = 500_000) -> pd.DataFrame:
+    """
+    Parse many raw CSVs in a process pool and merge them into one frame.
+
+    Files are ordered by path (so timestamped names like vahan_raw_<ts>.csv
+    sort oldest -> newest); for a (quarter, category, manufacturer) present in
+    several files the last file wins. Within a single file rows are summed.
+    """
+    paths = expand_csv_paths(spec)
+    if not paths:
+        raise FileNotFoundError(f"No CSV files match {spec}")
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    if workers == 1:
+        parts = [_parse_one(p, chunked, chunksize) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map preserves input order, which the last-writer rule relies on
+            parts = list(pool.map(_parse_one, paths, [chunked] * len(paths), [chunksize] * len(paths)))
+
+    merged = (pd.concat(parts, ignore_index=True)
+              .drop_duplicates(["date", "category", "manufacturer"], keep="last"))
+    return (merged[OUTPUT_COLS]
+            .sort_values(["category", "manufacturer", "date"])
+            .reset_index(drop=True))
@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the Vahan maker-wise report, so src.data.fetch can be
+# exercised and benchmarked offline. GET /report?state=&category=&year=&month=
+# returns an HTML page with a small filter table and the (bigger) report table
+# (&rows=N pads it to N makers).
+# Counts are deterministic per query; latency and fail_rate simulate a slow,
+# flaky upstream.
+
+MAKERS = {
+    "2W": ["HERO MOTOCORP LTD", "HONDA MOTORCYCLE AND SCOOTER INDIA", "TVS MOTOR COMPANY LTD", "BAJAJ AUTO LTD"],
+    "3W": ["PIAGGIO VEHICLES PVT LTD", "BAJAJ AUTO LTD", "MAHINDRA LAST MILE MOBILITY LTD"],
+    "4W": ["MARUTI SUZUKI INDIA LTD", "HYUNDAI MOTOR INDIA LTD", "TATA MOTORS LTD", "MAHINDRA & MAHINDRA LIMITED"],
+}
+
+
+def report_counts(state: str, category: str, year: int, month: int, n_makers: int = None) -> dict:
+    """
+    Maker -> registrations the mock serves for one query (stable across runs).
+    n_makers pads the real maker list with synthetic ones (report-sized pages).
+    """
+    rs = random.Random(zlib.crc32(f"{state}|{category}|{year}|{month}".encode()))
+    makers = MAKERS.get(category, MAKERS["4W"])
+    if n_makers is not None:
+        makers = (makers + [f"MAKER {i:05d} PVT LTD" for i in range(n_makers)])[:n_makers]
+    return {m: rs.randint(500, 50_000) for m in makers}
+
+
+def render_report(state: str, category: str, year: int, month: int, n_makers: int = None) -> str:
+    counts = report_counts(state, category, year, month, n_makers)
+    body = "".join(f"<tr><td>{i}</td><td>{m}</td><td>{n:,}</td></tr>"
+                   for i, (m, n) in enumerate(counts.items(), 1))
+    total = sum(counts.values())
+    return (
+        "<html><body>"
+        f"<table><tr><th>State</th><th>Month</th></tr><tr><td>{state}</td><td>{year}-{month:02d}</td></tr></table>"
+        "<table><thead><tr><th>S No</th><th>Maker</th><th>Registrations</th></tr></thead>"
+        f"<tbody>{body}<tr><td></td><td>TOTAL</td><td>{total:,}</td></tr></tbody></table>"
+        "</body></html>"
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fail_rate = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/report":
+            self.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.send_error(503, "Service busy")
+            return
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            html = render_report(q["state"], q["category"], int(q["year"]), int(q["month"]),
+                                 int(q["rows"]) if "rows" in q else None)
+        except (KeyError, ValueError):
+            self.send_error(400, "state, category, year and month are required")
+            return
+        data = html.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def serve_mock_vahan(port: int = 0, latency: float = 0.0, fail_rate: float = 0.0):
+    """Run the mock server in a background thread; yields its /report URL."""
+    handler = type("MockVahanHandler", (_Handler,), {"latency": latency, "fail_rate": fail_rate})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/report"
+    finally:
+        server.shutdown()
+        server.server_close()
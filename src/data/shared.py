@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src import config
+from src.perf import timed
+from src.utils import ensure_dir, get_logger
+
+log = get_logger("shared")
+
+# ---- Shared-memory datasets (DATA_BACKEND=shared) ----
+# Each processed dataset is converted once per on-disk version to an
+# uncompressed Arrow IPC file in SHARED_DIR (/dev/shm by default: RAM-backed
+# and visible to every process on the host), under a subdirectory per
+# deployment (keyed by the processed dir) so apps sharing a host never see or
+# clean up each other's snapshots. Workers memory-map that file
+# instead of decoding parquet, so the column buffers exist once in the page
+# cache however many Streamlit replicas / sessions read them: numeric and
+# datetime columns and categorical codes come back from to_pandas as read-only
+# views of the mapping (floats are stored with NaN rather than a null bitmap,
+# which would force a copy). The first process to need a version writes it
+# under a file lock; the rest just map it.
+
+_TABLES = {}  # name -> (version, pa.Table over the mapping)
+_LOCK = threading.Lock()
+
+
+def snapshot_dir():
+    """SHARED_DIR/<hash of the resolved PROCESSED_DIR>: this deployment's snapshots only."""
+    return config.SHARED_DIR / hashlib.sha1(str(config.PROCESSED_DIR).encode()).hexdigest()[:12]
+
+
+def snapshot_path(name: str, version: tuple):
+    stem = name.split(".", 1)[0]
+    tag = hashlib.sha1(repr(version).encode()).hexdigest()[:12]
+    return snapshot_dir() / f"{stem}-{tag}.arrow"
+
+
+@timed
+def publish(name: str, version: tuple):
+    """Write the Arrow IPC snapshot of a processed dataset for this version (no-op if present)."""
+    from src.data.storage import load_processed
+    path = snapshot_path(name, version)
+    if path.exists():
+        return path
+    ensure_dir(path.parent)
+    with _file_lock(path.parent / f"{path.name.split('-', 1)[0]}.lock"):
+        if path.exists():  # another worker published it while we waited
+            return path
+        table = _arrow_table(load_processed(name))
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        # older versions of this deployment: unlinking is safe, processes still mapping them keep their pages
+        for old in path.parent.glob(f"{path.name.split('-', 1)[0]}-*.arrow"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    log.info(f"Shared snapshot published: {path} ({path.stat().st_size / 1024 ** 2:.1f} MB)")
+    return path
+
+
+def shared_table(name: str, version: tuple) -> pa.Table:
+    """Memory-mapped Arrow table for name@version (mapped once per process)."""
+    with _LOCK:
+        hit = _TABLES.get(name)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+    path = publish(name, version)
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    with _LOCK:
+        _TABLES[name] = (version, table)
+    return table
+
+
+@timed
+def load_shared(name: str, version: tuple, filters=None, columns=None) -> pd.DataFrame:
+    """
+    load_processed equivalent over the shared snapshot. filters (pyarrow DNF)
+    are applied with Arrow compute, so only a filtered result is materialized;
+    unfiltered reads are zero-copy (the MultiIndex, if any, is rebuilt). Read-only.
+    """
+    from src.data.storage import _typed_filters
+    table = shared_table(name, version)
+    if filters:
+        table = table.filter(pq.filters_to_expression(_typed_filters(filters)))
+    if columns is not None:
+        table = table.select([c for c in table.column_names if c in columns or c in _index_columns(table)])
+    df = table.to_pandas(split_blocks=True, self_destruct=False)
+    if isinstance(df.index, pd.MultiIndex):
+        df.index = df.index.remove_unused_levels()
+    return df
+
+
+def clear_shared():
+    with _LOCK:
+        _TABLES.clear()
+
+
+def _arrow_table(df: pd.DataFrame) -> pa.Table:
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    for col in df.columns:
+        if df[col].dtype.kind == "f" and table.column(col).null_count:
+            i = table.column_names.index(col)
+            table = table.set_column(i, table.field(i), pa.array(df[col].to_numpy(), from_pandas=False))
+    return table
+
+
+def _index_columns(table: pa.Table) -> list:
+    meta = table.schema.pandas_metadata or {}
+    return [c for c in meta.get("index_columns", []) if isinstance(c, str)]
+
+
+@contextmanager
+def _file_lock(path):
+    try:
+        import fcntl
+    except ImportError:  # Windows: racing writers each write a tmp file and replace; last one wins
+        yield
+        return
+    with open(path, "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
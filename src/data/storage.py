@@ -1,17 +1,201 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import pandas as pd
-from src.config import PROCESSED_DIR
+from src.cache import _freeze
+from src.config import DATA_BACKEND, PROCESSED_DIR
+from src.perf import timed
 from src.utils import ensure_dir, get_logger
 
 log = get_logger("storage")
 
-def save_processed(df: pd.DataFrame, name: str = "registrations.parquet") -> Path:
-    ensure_dir(PROCESSED_DIR)
+# Process-wide cache of decoded datasets: (name, filters, columns) -> (fingerprint, DataFrame).
+# Every Streamlit session/page in this process shares the same copy, so callers
+# must treat the returned frame as read-only (filter/copy before mutating).
+_DATASET_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX_ENTRIES = 16
+
+# Processed datasets are hive-partitioned by quarter, then category
+# (registrations.parquet/quarter=2025Q2/category=2W/...): a new/revised quarter
+# can be rewritten without touching the rest of history, and quarter/category
+# filters prune whole directories. Inside each file rows are ordered by
+# manufacturer, date and split into small row groups, so manufacturer/date
+# predicates skip row groups via parquet statistics.
+PARTITION_COLS = ["quarter", "category"]
+SORT_COLS = ["manufacturer", "date"]
+ROW_GROUP_ROWS = 64_000
+
+
+@timed
+def save_processed(df: pd.DataFrame, name: str = "registrations.parquet", index: bool = False,
+                   partition_cols=None) -> Path:
     out = PROCESSED_DIR / name
-    df.to_parquet(out, index=False)
+    ensure_dir(out.parent)
+    # write then swap, so readers never see a half-written file and the
+    # new mtime/size invalidates the cache below
+    tmp = out.with_name(out.name + ".tmp")
+    _remove(tmp)
+    if partition_cols:
+        df = _sorted_for_pruning(df, index)
+    df.to_parquet(tmp, index=index, partition_cols=partition_cols, row_group_size=ROW_GROUP_ROWS)
+    if out.is_dir() or (tmp.is_dir() and out.exists()):
+        old = out.with_name(out.name + ".old")
+        _remove(old)
+        os.replace(out, old)
+        os.replace(tmp, out)
+        _remove(old)
+    else:
+        os.replace(tmp, out)
     log.info(f"Processed saved: {out}")
     return out
 
-def load_processed(name: str = "registrations.parquet") -> pd.DataFrame:
+
+def append_processed(df: pd.DataFrame, name: str = "registrations.parquet", index: bool = False) -> Path:
+    """
+    Write df as partitions of an existing dataset, replacing only the
+    partitions (quarter/category) present in df. Everything else is left untouched.
+    The new partitions are written to a staging dir first and then swapped in
+    one by one with renames, so a reader sees either the old or the new files
+    of a partition, never a half-written one (as with save_processed).
+    """
+    out = PROCESSED_DIR / name
+    if out.is_file():
+        # one-time migration of a single-file dataset to the partitioned layout
+        save_processed(pd.read_parquet(out), name, index=index, partition_cols=PARTITION_COLS)
+    df = _sorted_for_pruning(df, index)
+    stage, old = out.with_name(out.name + ".stage"), out.with_name(out.name + ".old")
+    _remove(stage)
+    _remove(old)
+    df.to_parquet(stage, index=index, partition_cols=PARTITION_COLS, row_group_size=ROW_GROUP_ROWS)
+    for part in stage.glob("/".join(f"{c}=*" for c in PARTITION_COLS)):
+        rel = part.relative_to(stage)
+        ensure_dir((out / rel).parent)
+        if (out / rel).exists():
+            ensure_dir((old / rel).parent)
+            os.replace(out / rel, old / rel)
+        os.replace(part, out / rel)
+    _remove(stage)
+    _remove(old)
+    log.info(f"Processed partitions updated: {out} ({df[PARTITION_COLS[0]].nunique()} partition(s))")
+    return out
+
+
+def processed_partitions(name: str = "registrations.parquet") -> list:
+    """Partition values (quarter labels) present on disk, without reading any data."""
+    path = PROCESSED_DIR / name
+    col = PARTITION_COLS[0]
+    if not path.is_dir():
+        if not path.exists():
+            return []
+        return sorted(pd.read_parquet(path, columns=[col])[col].astype(str).unique())
+    return sorted(p.name.split("=", 1)[1] for p in path.glob(f"{col}=*") if p.is_dir())
+
+
+@timed
+def load_processed(name: str = "registrations.parquet", filters=None, columns=None) -> pd.DataFrame:
+    """
+    Read a processed dataset. filters (pyarrow DNF, e.g. from processed_filters)
+    and columns are pushed down to the parquet reader: non-matching partitions
+    and row groups are never read or decoded.
+    """
+    path = PROCESSED_DIR / name
+    df = pd.read_parquet(path, filters=_typed_filters(filters), columns=columns)
+    if isinstance(df.index, pd.MultiIndex):
+        # partitions come back in directory order; restore a sorted index (growth cube)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        df.index = df.index.remove_unused_levels()
+    return df
+
+
+def processed_filters(start=None, end=None, categories=None, manufacturers=None) -> list:
+    """Page selections -> pyarrow filters for load_processed (None = no constraint)."""
+    filters = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters += [("quarter", ">=", str(start.to_period("Q"))), ("date", ">=", start)]
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters += [("quarter", "<=", str(end.to_period("Q"))), ("date", "<=", end)]
+    if categories is not None:
+        filters.append(("category", "in", list(categories)))
+    if manufacturers is not None:
+        filters.append(("manufacturer", "in", list(manufacturers)))
+    return filters or None
+
+
+def dataset_version(name: str = "registrations.parquet") -> tuple:
+    """Fingerprint of a processed file or partitioned dir: (path, mtime_ns, size[, n_files])."""
     path = PROCESSED_DIR / name
-    return pd.read_parquet(path)
+    if path.is_dir():
+        stats = [f.stat() for f in path.rglob("*.parquet")]
+        return (str(path), max((s.st_mtime_ns for s in stats), default=0),
+                sum(s.st_size for s in stats), len(stats))
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+@timed
+def load_processed_cached(name: str = "registrations.parquet", filters=None, columns=None) -> pd.DataFrame:
+    """
+    Like load_processed, but decoded once per process and reused until the
+    file on disk changes (mtime/size). Distinct filters/columns are cached
+    separately (LRU-bounded). Returned frame is shared — don't mutate.
+    With DATA_BACKEND=shared the frame is a view of a memory-mapped Arrow
+    snapshot shared by every process on the host (see src.data.shared).
+    """
+    key = (name, _freeze(filters), _freeze(columns))
+    version = dataset_version(name)
+    with _CACHE_LOCK:
+        hit = _DATASET_CACHE.get(key)
+        if hit is not None and hit[0] == version:
+            _DATASET_CACHE.move_to_end(key)
+            return hit[1]
+
+    if DATA_BACKEND == "shared":
+        from src.data.shared import load_shared
+        df = load_shared(name, version, filters=filters, columns=columns)
+    else:
+        df = load_processed(name, filters=filters, columns=columns)
+    with _CACHE_LOCK:
+        _DATASET_CACHE[key] = (version, df)
+        _DATASET_CACHE.move_to_end(key)
+        while len(_DATASET_CACHE) > _CACHE_MAX_ENTRIES:
+            _DATASET_CACHE.popitem(last=False)
+    log.info(f"Dataset cache refreshed: {name}" + (f" {filters}" if filters else ""))
+    return df
+
+
+def clear_cache():
+    with _CACHE_LOCK:
+        _DATASET_CACHE.clear()
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def _sorted_for_pruning(df: pd.DataFrame, index: bool) -> pd.DataFrame:
+    if index:
+        return df.sort_index()
+    by = [c for c in PARTITION_COLS + SORT_COLS if c in df.columns]
+    return df.sort_values(by, kind="stable") if by else df
+
+
+def _typed_filters(filters):
+    """String 'in' lists -> typed arrays (an empty list would otherwise be null-typed and fail)."""
+    if not filters:
+        return filters
+    import pyarrow as pa
+    out = []
+    for col, op, val in filters:
+        if op in ("in", "not in") and all(isinstance(v, str) for v in val):
+            val = pa.array(list(val), pa.string())
+        out.append((col, op, val))
+    return out
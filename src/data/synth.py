@@ -0,0 +1,164 @@
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import RAW_DIR
+from src.data.storage import PARTITION_COLS
+from src.utils import get_logger
+
+log = get_logger("synth")
+
+# Load-test fixtures: month x RTO x manufacturer registrations at any size.
+# A "series" is one (RTO, manufacturer) pair. Series are generated in fixed
+# blocks, each with its own seeded RNG, so the output only depends on the spec
+# (not on memory/chunk settings) and a block is written as soon as it exists:
+# 10^8 rows never sit in memory at once. Labels are emitted as Arrow dictionary
+# arrays straight from integer codes (no per-row strings).
+
+
+@dataclass
+class SynthSpec:
+    n_manufacturers: int = 1_000
+    n_states: int = 30
+    rtos_per_state: int = 20
+    start: str = "2019-01"
+    end: str = "2025-06"
+    categories: tuple = ("2W", "3W", "4W")
+    category_weights: tuple = (0.6, 0.1, 0.3)
+    presence: float = 0.5        # share of RTOs each manufacturer sells in
+    gap_rate: float = 0.02       # missing (series, month) rows
+    outlier_rate: float = 0.001  # rows scaled by x0.05 or x10
+    seed: int = 0
+    series_per_block: int = 20_000
+    _months: pd.PeriodIndex = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._months = pd.period_range(self.start, self.end, freq="M")
+
+    @property
+    def n_rtos(self) -> int:
+        return self.n_states * self.rtos_per_state
+
+    @property
+    def n_series(self) -> int:
+        return self.n_rtos * self.n_manufacturers
+
+    def expected_rows(self) -> int:
+        return int(self.n_series * len(self._months) * self.presence * (1 - self.gap_rate))
+
+
+def _dictionary(codes: np.ndarray, labels: list) -> pa.DictionaryArray:
+    return pa.DictionaryArray.from_arrays(pa.array(codes.astype(np.int32)), pa.array(labels, pa.string()))
+
+
+def iter_synthetic(spec: SynthSpec):
+    """Yield pyarrow Tables (one per block of series) with GRANULAR_COLS + year/quarter."""
+    months = spec._months
+    n_t = len(months)
+    t = np.arange(n_t)
+    month_days = months.to_timestamp().values.astype("datetime64[us]")
+    years = months.year.to_numpy().astype(np.int16)
+    q_codes, q_labels = pd.factorize(months.asfreq("Q").astype(str))
+    season = 1 + 0.12 * np.sin(2 * np.pi * (months.month.to_numpy() - 10) / 12)
+
+    # per-manufacturer / per-RTO traits, shared by every block
+    rng = np.random.default_rng([spec.seed, 0])
+    mfr_cat = rng.choice(len(spec.categories), spec.n_manufacturers,
+                         p=np.asarray(spec.category_weights) / sum(spec.category_weights))
+    mfr_scale = rng.pareto(1.5, spec.n_manufacturers) + 0.2        # a few giants, a long tail
+    mfr_growth = rng.normal(0.005, 0.004, spec.n_manufacturers)     # monthly trend
+    rto_scale = rng.lognormal(0, 0.6, spec.n_rtos)
+    mfr_labels = [f"MFR {i:05d}" for i in range(spec.n_manufacturers)]
+    state_labels = [f"ST{i:02d}" for i in range(spec.n_states)]
+    rto_labels = [f"ST{i // spec.rtos_per_state:02d}-{i % spec.rtos_per_state:03d}" for i in range(spec.n_rtos)]
+
+    for b, lo in enumerate(range(0, spec.n_series, spec.series_per_block)):
+        s = np.arange(lo, min(lo + spec.series_per_block, spec.n_series))
+        rng = np.random.default_rng([spec.seed, 1, b])
+        rto, mfr = s // spec.n_manufacturers, s % spec.n_manufacturers
+
+        level = 200 * mfr_scale[mfr] * rto_scale[rto] * rng.lognormal(0, 0.3, len(s))
+        trend = (1 + mfr_growth[mfr] + rng.normal(0, 0.002, len(s)))[:, None] ** t
+        vals = level[:, None] * trend * season * rng.normal(1, 0.08, (len(s), n_t))
+
+        outlier = rng.random(vals.shape) < spec.outlier_rate
+        vals = np.where(outlier, vals * rng.choice([0.05, 10.0], vals.shape), vals)
+        keep = (rng.random(vals.shape) >= spec.gap_rate) & (rng.random(len(s)) < spec.presence)[:, None]
+
+        si, ti = np.nonzero(keep)
+        if not len(si):
+            continue
+        rto_i, mfr_i = rto[si], mfr[si]
+        yield pa.table({
+            "date": pa.array(month_days[ti]),
+            "year": pa.array(years[ti]),
+            "quarter": _dictionary(q_codes[ti], list(q_labels)),
+            "state": _dictionary(rto_i // spec.rtos_per_state, state_labels),
+            "rto": _dictionary(rto_i, rto_labels),
+            "category": _dictionary(mfr_cat[mfr_i], list(spec.categories)),
+            "manufacturer": _dictionary(mfr_i, mfr_labels),
+            "registrations": pa.array(np.maximum(vals[si, ti], 0).round().astype(np.int32)),
+        })
+
+
+def write_synthetic(spec: SynthSpec, out: Path = None, fmt: str = "parquet") -> Path:
+    """
+    Stream the fixture to disk block by block: a hive-partitioned parquet
+    dataset (quarter/category, like the processed data; one file per partition,
+    one row group per block) or one CSV file.
+    """
+    out = Path(out or RAW_DIR / f"synthetic.{fmt}")
+    if out.is_dir():
+        shutil.rmtree(out)
+    elif out.exists():
+        out.unlink()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    log.info(f"Synthetic data: ~{spec.expected_rows():,} rows ({spec.n_manufacturers:,} manufacturers x "
+             f"{spec.n_rtos:,} RTOs x {len(spec._months)} months) -> {out}")
+
+    rows = 0
+    writers = {}
+    try:
+        for table in iter_synthetic(spec):
+            if fmt == "parquet":
+                _write_partitions(table, out, writers)
+            elif fmt == "csv":
+                import pyarrow.csv as pacsv
+                table = table.set_column(0, "date", table["date"].cast(pa.date32()).cast(pa.string()))
+                if not writers:
+                    writers[None] = pacsv.CSVWriter(str(out), table.schema)
+                writers[None].write_table(table)
+            else:
+                raise ValueError(f"Unknown format: {fmt}")
+            rows += table.num_rows
+    finally:
+        for w in writers.values():
+            w.close()
+    log.info(f"Synthetic data written: {rows:,} rows")
+    return out
+
+
+def _write_partitions(table: pa.Table, out: Path, writers: dict):
+    """Split one block by PARTITION_COLS (via dictionary codes) and append to each partition's file."""
+    codes = [table[c].combine_chunks() for c in PARTITION_COLS]
+    key = np.zeros(table.num_rows, dtype=np.int64)
+    for arr in codes:
+        key = key * len(arr.dictionary) + arr.indices.to_numpy()
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    data = table.drop_columns(PARTITION_COLS).take(order)
+    cuts = np.flatnonzero(np.diff(key)) + 1
+    for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, len(key)]):
+        i = order[lo]
+        part = tuple(arr.dictionary[arr.indices[i].as_py()].as_py() for arr in codes)
+        w = writers.get(part)
+        if w is None:
+            d = out.joinpath(*(f"{c}={v}" for c, v in zip(PARTITION_COLS, part)))
+            d.mkdir(parents=True, exist_ok=True)
+            w = writers[part] = pq.ParquetWriter(d / "part-0.parquet", data.schema)
+        w.write_table(data.slice(lo, hi - lo))
@@ -0,0 +1,432 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.config import PROCESSED_DIR
+from src.data.ingest_upload import (REQUIRED_CORE, DATE_SPEC_COLS, GEO_COLS, OUTPUT_COLS, _column_mapping,
+                                    _ensure_quarter_cols, _fold, _parse_dates, expand_csv_paths)
+from src.data.storage import save_processed, load_processed
+from src.perf import timed
+from src.utils import ensure_dir, get_logger
+
+log = get_logger("validate")
+
+# ---- Data-quality validation ----
+# One pass over the raw CSV(s), read in chunks as strings, that collects every
+# problem instead of stopping at the first. Rows that can't be used (bad date
+# spec, missing / non-numeric / negative counts, blank category or
+# manufacturer) are quarantined. Everything else is kept and, where odd,
+# reported: categories outside CATEGORIES, repeats of the same key (summed, as
+# parse_csv_chunked does), quarters missing inside a series, jumps vs the
+# trailing quarters, manufacturer spellings folded into one label. Every check
+# is factorize/hash work or a dense (series x quarter) grid, so cost is linear
+# in rows, and memory is bounded by the chunk size plus the quarterly
+# aggregate (and an 8-byte key hash per row for duplicate detection). The clean rows come
+# out in the same quarterly shape as parse_csv_chunked.
+
+QUARANTINE_NAME = "quarantine.parquet"
+REPORT_NAME = "validation_report.json"
+
+# known categories; spellings in CATEGORY_ALIASES are mapped onto them (compared upper-cased without
+# spaces/dashes/underscores), anything else is kept as given and reported as unknown_category
+CATEGORIES = ("2W", "3W", "4W")
+CATEGORY_ALIASES = {
+    "TW": "2W", "2WHEELER": "2W", "TWOWHEELER": "2W", "2WHEELERS": "2W", "TWOWHEELERS": "2W",
+    "3WHEELER": "3W", "THREEWHEELER": "3W", "3WHEELERS": "3W", "THREEWHEELERS": "3W",
+    "4WHEELER": "4W", "FOURWHEELER": "4W", "4WHEELERS": "4W", "FOURWHEELERS": "4W",
+}
+
+# outlier_jump: a quarter x JUMP above / below the mean of the TRAILING quarters
+# before it (at least MIN_TRAILING present), unless both sides are under MIN_VOLUME
+JUMP = 5.0
+TRAILING = 4
+MIN_TRAILING = 2
+MIN_VOLUME = 100
+
+# check -> severity; "error" rows are quarantined, "warning" findings are kept
+CHECKS = {
+    "bad_date": "error",
+    "non_numeric_count": "error",
+    "negative_count": "error",
+    "missing_category": "error",
+    "missing_manufacturer": "error",
+    "unknown_category": "warning",
+    "duplicate": "warning",
+    "manufacturer_alias": "warning",
+    "missing_quarter": "warning",
+    "outlier_jump": "warning",
+}
+ROW_CHECKS = ["bad_date", "non_numeric_count", "negative_count", "missing_category", "missing_manufacturer",
+              "unknown_category", "duplicate"]
+MAX_ROW_WARNINGS = 10_000  # duplicate lines listed per file (all are counted in the report)
+ISSUE_COLS = ["file", "line", "check", "severity", "category", "manufacturer", "quarter", "value", "detail"]
+
+
+@dataclass
+class Validated:
+    data: pd.DataFrame     # clean quarterly rows (OUTPUT_COLS)
+    issues: pd.DataFrame   # one row per finding (ISSUE_COLS); line is the CSV line, NA for series-level checks
+    report: dict
+
+    @property
+    def n_quarantined(self) -> int:
+        return self.report["rows_quarantined"]
+
+    def quarantined_rows(self, path) -> list:
+        """0-based file rows quarantined in path (header = 0), e.g. read_csv(skiprows=...)."""
+        bad = self.issues[(self.issues["severity"] == "error") & (self.issues["file"] == str(path))]
+        return sorted(set((bad["line"].to_numpy(dtype=np.int64) - 1).tolist()))
+
+
+@timed
+def validate_csvs(spec, chunksize: int = 500_000, workers: int = None, known_manufacturers=None) -> Validated:
+    """
+    Validate and parse raw CSVs (a file, directory, glob or list, as parse_many).
+    Each file is read chunksize rows at a time and files are scanned over
+    workers processes, so this replaces parse_many(chunked=True) rather than
+    adding a pass before it. For a (quarter, category, manufacturer)
+    present in several files the last file wins. known_manufacturers (e.g. the
+    labels already processed) win when folding spelling variants.
+    """
+    paths = expand_csv_paths(spec)
+    if not paths:
+        raise FileNotFoundError(f"No CSV files match {spec}")
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers == 1:
+        scans = [_scan_file(p, chunksize) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scans = list(pool.map(_scan_file, paths, [chunksize] * len(paths)))
+
+    data = pd.concat([s[0].assign(part=i) for i, s in enumerate(scans)], ignore_index=True)
+    data, aliases = _fold_aliases(data, known_manufacturers)
+    data = (data.groupby(["part", "category", "manufacturer", "qk"], sort=False, as_index=False)["registrations"].sum()
+            .drop_duplicates(["category", "manufacturer", "qk"], keep="last")
+            .drop(columns="part"))
+    issues = pd.concat([s[1] for s in scans] + [aliases, _series_checks(data)], ignore_index=True)
+    issues = _compact(issues)
+
+    p = pd.PeriodIndex.from_ordinals(data["qk"].to_numpy(), freq="Q")
+    data = data.assign(date=p.to_timestamp(how="end").normalize(), year=p.year, quarter=p.astype(str),
+                       registrations=data["registrations"].round().astype(np.int64))
+    out = data[OUTPUT_COLS].sort_values(["category", "manufacturer", "date"]).reset_index(drop=True)
+    report = _report(out, issues, [s[2] for s in scans])
+    return Validated(out, issues, report)
+
+
+def save_validation(result: Validated):
+    """Quarantine parquet + JSON report in the processed dir; logs a one-line-per-check summary."""
+    save_processed(result.issues, QUARANTINE_NAME)
+    ensure_dir(PROCESSED_DIR)
+    path = PROCESSED_DIR / REPORT_NAME
+    path.write_text(json.dumps(result.report, indent=2))
+    r = result.report
+    log.info(f"Validation: {r['rows_in']:,} rows in, {r['rows_quarantined']:,} quarantined, "
+             f"{r['rows_out']:,} quarterly rows out")
+    for check, n in r["issues"].items():
+        log.info(f"  {check:<22} {CHECKS[check]:<8} {n:>10,}")
+    log.info(f"Quarantine: {PROCESSED_DIR / QUARANTINE_NAME}  Report: {path}")
+    return path
+
+
+def known_manufacturers(name: str = "registrations.parquet") -> list:
+    """Manufacturer labels already in the processed dataset ([] if there is none yet)."""
+    try:
+        col = load_processed(name, columns=["manufacturer"])["manufacturer"]
+    except FileNotFoundError:
+        return []
+    return [m for m in col.astype("category").cat.categories if m != "TOTAL"]
+
+
+def _scan_file(path, chunksize: int):
+    """
+    Row-level checks for one file -> (quarterly sums, issues, stats). Memory is
+    bounded like parse_csv_chunked: each chunk is folded into a running
+    (category, manufacturer, quarter) sum; only an 8-byte key hash per row is
+    kept for duplicate detection, counted with one factorize (linear).
+    """
+    mapping = _column_mapping(pd.read_csv(path, nrows=0).columns)
+    missing = [c for c in REQUIRED_CORE if c not in mapping.values()]
+    if missing:
+        raise ValueError(f"{path}: missing core columns: {missing}. Need {REQUIRED_CORE} plus a date spec.")
+    wanted = set(REQUIRED_CORE + DATE_SPEC_COLS + GEO_COLS)
+    usecols = [raw for raw, norm in mapping.items() if norm in wanted]
+    # the key a row repeats if it's a duplicate, normalized: its own grain (parsed day, month or quarter;
+    # geo) + category + manufacturer
+    if "date" in mapping.values():
+        grain = ["day"]
+    else:
+        grain = ["date", "month"] if "month" in mapping.values() else ["date"]
+    key_cols = grain + [c for c in GEO_COLS if c in mapping.values()] + ["category", "manufacturer"]
+
+    labels = {}
+    acc, pending, pending_rows = None, [], 0
+    hashes, issues, unknown = [], [], []
+    counts = dict.fromkeys(ROW_CHECKS, 0)
+    start = 0
+    reader = pd.read_csv(path, usecols=usecols, dtype={c: str for c in usecols}, chunksize=chunksize)
+    for chunk in reader:
+        chunk.columns = [mapping[c] for c in chunk.columns]
+        line = np.arange(start, start + len(chunk)) + 2  # 1-based, after the header
+        start += len(chunk)
+        # per-chunk work in its own frame: nothing row-level outlives the chunk
+        part, key, found, odd = _scan_chunk(chunk, line, key_cols, str(path), labels, counts)
+        del chunk
+        hashes.append(key)
+        issues += found
+        if odd is not None:
+            unknown.append(odd)
+        pending.append(part)
+        pending_rows += len(part)
+        # fold partials into the accumulator once they outgrow one chunk
+        if pending_rows >= chunksize:
+            acc = _fold(acc, pending)
+            pending, pending_rows = [], 0
+    acc = _fold(acc, pending)
+
+    # duplicates (same key at the file's grain) are summed like any other rows; reported, capped per file.
+    # factorize numbers keys in order of first appearance, so a row is a key's first iff its code is
+    # above every code before it, and first_rows[code] is that row.
+    h = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+    del hashes
+    bad = h == 0
+    n_bad = int(bad.sum())
+    codes = pd.factorize(h)[0]
+    del h
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = codes[1:] > np.maximum.accumulate(codes)[:-1]
+    dup_rows = np.flatnonzero(~first & ~bad)
+    counts["duplicate"] = len(dup_rows)
+    if len(dup_rows):
+        shown = dup_rows[:MAX_ROW_WARNINGS]
+        first_rows = np.flatnonzero(first)[codes[shown]]
+        issues.append(_issues("duplicate", file=str(path), line=shown + 2,
+                              detail=[f"same key as line {n}; summed" for n in first_rows + 2]))
+    del codes, first, bad, dup_rows
+    if unknown:
+        u = pd.concat(unknown).groupby(level=0).agg(rows=("rows", "sum"), line=("line", "min"))
+        counts["unknown_category"] = int(u["rows"].sum())
+        issues.append(_issues("unknown_category", file=str(path), line=u["line"].to_numpy(), category=u.index,
+                              value=u.index, detail=[f"{n:,} rows kept (first at line {ln})"
+                                                     for n, ln in zip(u["rows"], u["line"])]))
+
+    names = np.array(list(labels), dtype=object)
+    if acc is None:
+        sums = pd.DataFrame({"category": [], "manufacturer": [], "qk": np.zeros(0, np.int64), "registrations": []})
+    else:
+        sums = acc.reset_index()
+        sums["category"] = names[sums["category"].to_numpy(dtype=np.int64)]
+        sums["manufacturer"] = names[sums["manufacturer"].to_numpy(dtype=np.int64)]
+    ignored = [raw for raw, norm in mapping.items() if norm not in wanted]
+    stats = {"file": str(path), "rows": start, "quarantined": n_bad, "ignored_columns": ignored,
+             "checks": {c: n for c, n in counts.items() if n}}
+    return sums, pd.concat(issues, ignore_index=True) if issues else _issues("duplicate", line=[]), stats
+
+
+def _scan_chunk(chunk, line, key_cols, file, labels, counts):
+    """One chunk -> (quarterly sums by label id, key hashes with 0 for quarantined rows, issues, unknown labels)."""
+    raw_cat, raw_mfr, raw_regs = chunk["category"], chunk["manufacturer"], chunk["registrations"]
+    raw_date = chunk[[c for c in DATE_SPEC_COLS if c in chunk.columns]]  # before normalization
+
+    chunk["category"] = _map_uniques(raw_cat, _canonical_category)
+    chunk["manufacturer"] = _map_uniques(raw_mfr, _clean_label)
+    for c in GEO_COLS:
+        if c in chunk.columns:
+            chunk[c] = _map_uniques(chunk[c], _clean_label)
+    if "date" in chunk.columns:
+        chunk["date"] = chunk["day"] = _parse_dates(chunk["date"])  # day kept: date becomes the quarter end
+    chunk = _ensure_quarter_cols(chunk, errors="coerce")
+    key = pd.util.hash_pandas_object(chunk[key_cols], index=False).to_numpy(copy=True)
+    regs_str = raw_regs.str.replace(",", "", regex=False) if raw_regs.str.contains(",", regex=False).any() \
+        else raw_regs
+    regs = pd.to_numeric(regs_str, errors="coerce").to_numpy(dtype=float)
+
+    checks = {
+        "bad_date": chunk["date"].isna().to_numpy(),
+        "non_numeric_count": np.isnan(regs),
+        "negative_count": regs < 0,
+        "missing_category": chunk["category"].isna().to_numpy(),
+        "missing_manufacturer": chunk["manufacturer"].isna().to_numpy(),
+    }
+    values = {"non_numeric_count": raw_regs, "negative_count": raw_regs,
+              "missing_category": raw_cat, "missing_manufacturer": raw_mfr}
+    issues = []
+    bad = np.zeros(len(chunk), dtype=bool)
+    for check, mask in checks.items():
+        if mask.any():
+            bad |= mask
+            counts[check] += int(mask.sum())
+            issues.append(_issues(check, file=file, line=line[mask], category=raw_cat[mask],
+                                  manufacturer=raw_mfr[mask], quarter=chunk["quarter"][mask].where(
+                                      ~checks["bad_date"][mask]),
+                                  value=values[check][mask] if check in values else _spec(raw_date[mask])))
+    ok = ~bad
+    odd = ok & ~chunk["category"].isin(CATEGORIES).to_numpy()
+    unknown = None
+    if odd.any():
+        unknown = (pd.DataFrame({"label": chunk["category"][odd].astype(str).to_numpy(), "line": line[odd]})
+                   .groupby("label").agg(rows=("line", "size"), line=("line", "min")))
+    key[bad] = 0  # quarantined rows can't duplicate anything
+    part = (pd.DataFrame({"category": _codes(chunk["category"][ok], labels),
+                          "manufacturer": _codes(chunk["manufacturer"][ok], labels),
+                          "qk": chunk["date"][ok].dt.to_period("Q").array.asi8,
+                          "registrations": regs[ok]})
+            .groupby(["category", "manufacturer", "qk"], sort=False)["registrations"].sum())
+    return part, key, issues, unknown
+
+
+def _fold_aliases(data: pd.DataFrame, known) -> tuple:
+    """
+    Manufacturer labels equal up to case/punctuation/spacing ('HONDA', 'Honda ', 'honda.') are
+    relabeled to one: a known label if there is one, else the spelling with the most registrations.
+    """
+    if data.empty:
+        return data, _issues("manufacturer_alias", line=[])
+    by_label = data.groupby("manufacturer", sort=False)["registrations"].agg(["sum", "size"])
+    labels = by_label.index
+    key = _label_key(labels)
+    best = (pd.DataFrame({"label": labels, "key": key, "vol": by_label["sum"].to_numpy()})
+            .sort_values("vol", ascending=False, kind="stable").drop_duplicates("key").set_index("key")["label"])
+    canon = best.reindex(key).to_numpy()
+    if known:
+        known = pd.Index(known)
+        known_by_key = pd.Series(known, index=_label_key(known))
+        known_by_key = known_by_key[~known_by_key.index.duplicated()]
+        hit = known_by_key.reindex(key)
+        canon = np.where(hit.notna().to_numpy(), hit.to_numpy(), canon)
+    moved = canon != labels.to_numpy()
+    if not moved.any():
+        return data, _issues("manufacturer_alias", line=[])
+
+    issues = _issues("manufacturer_alias", manufacturer=canon[moved], value=labels[moved],
+                     detail=[f"folded into '{c}' ({n:,} quarterly rows)"
+                             for c, n in zip(canon[moved], by_label["size"].to_numpy()[moved])])
+    return data.assign(manufacturer=data["manufacturer"].map(dict(zip(labels, canon)))), issues
+
+
+def _series_checks(data: pd.DataFrame) -> pd.DataFrame:
+    """missing_quarter + outlier_jump on a dense (category x manufacturer) x quarter grid."""
+    if data.empty:
+        return _issues("missing_quarter", line=[])
+    codes = data.groupby(["category", "manufacturer"], sort=False).ngroup().to_numpy()
+    series = data.drop_duplicates(["category", "manufacturer"])[["category", "manufacturer"]].to_numpy()
+    qk = data["qk"].to_numpy()
+    q0, n_q = qk.min(), int(qk.max() - qk.min()) + 1
+    grid = np.full((codes.max() + 1, n_q), np.nan)
+    grid[codes, qk - q0] = data["registrations"].to_numpy(dtype=float)
+    present = ~np.isnan(grid)
+    cols = np.arange(n_q)
+
+    # quarters missing between a series' first and last reported quarter
+    first = present.argmax(axis=1)
+    last = n_q - 1 - present[:, ::-1].argmax(axis=1)
+    si, ti = np.nonzero(~present & (cols >= first[:, None]) & (cols <= last[:, None]))
+    gaps = _issues("missing_quarter", category=series[si, 0], manufacturer=series[si, 1],
+                   quarter=pd.PeriodIndex.from_ordinals(q0 + ti, freq="Q").astype(str))
+
+    # each quarter vs the mean of the TRAILING quarters before it (running sums, so O(cells))
+    zero = np.zeros((len(grid), 1))
+    csum = np.hstack([zero, np.nan_to_num(grid).cumsum(axis=1)])
+    ccnt = np.hstack([zero, present.cumsum(axis=1)])
+    lo = np.maximum(cols - TRAILING, 0)
+    tcnt = ccnt[:, cols] - ccnt[:, lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = (csum[:, cols] - csum[:, lo]) / tcnt
+        ratio = grid / base
+    jump = (present & (tcnt >= MIN_TRAILING) & (np.fmax(grid, base) >= MIN_VOLUME)
+            & ((ratio >= JUMP) | (ratio <= 1 / JUMP)))
+    si, ti = np.nonzero(jump)
+    jumps = _issues("outlier_jump", category=series[si, 0], manufacturer=series[si, 1],
+                    quarter=pd.PeriodIndex.from_ordinals(q0 + ti, freq="Q").astype(str),
+                    value=grid[si, ti].astype(np.int64),
+                    detail=[f"x{r:.2f} vs trailing mean {b:,.0f}" for r, b in zip(ratio[si, ti], base[si, ti])])
+    return pd.concat([gaps, jumps], ignore_index=True)
+
+
+def _report(data: pd.DataFrame, issues: pd.DataFrame, files: list) -> dict:
+    # row-level checks are counted while scanning (listed duplicates are capped); the rest per issue
+    counts = issues.loc[~issues["check"].isin(ROW_CHECKS), "check"].value_counts().to_dict()
+    for f in files:
+        for c, n in f["checks"].items():
+            counts[c] = counts.get(c, 0) + n
+    series = issues[issues["manufacturer"].notna()].groupby(["category", "manufacturer"], observed=True).size()
+    worst = series.sort_values(ascending=False).head(10)
+    return {
+        "files": files,
+        "rows_in": sum(f["rows"] for f in files),
+        "rows_quarantined": sum(f["quarantined"] for f in files),
+        "rows_out": len(data),
+        "issues": {c: int(counts.get(c, 0)) for c in CHECKS if counts.get(c, 0)},
+        "severity": {s: sum(n for c, n in counts.items() if CHECKS[c] == s) for s in ("error", "warning")},
+        "worst_series": [{"category": c, "manufacturer": m, "issues": int(n)} for (c, m), n in worst.items()],
+        "thresholds": {"jump": JUMP, "trailing": TRAILING, "min_trailing": MIN_TRAILING, "min_volume": MIN_VOLUME},
+    }
+
+
+def _issues(check: str, **cols) -> pd.DataFrame:
+    n = len(next((v for v in cols.values() if not np.isscalar(v)), []))
+    out = pd.DataFrame({c: _col(cols.get(c), n) for c in ISSUE_COLS if c not in ("check", "severity")})
+    out.insert(2, "check", check)
+    out.insert(3, "severity", CHECKS[check])
+    return out
+
+
+def _col(v, n):
+    if v is None:
+        return [None] * n
+    return v.to_numpy() if isinstance(v, (pd.Series, pd.Index)) else v
+
+
+def _compact(issues: pd.DataFrame) -> pd.DataFrame:
+    issues["line"] = issues["line"].astype("Int64")
+    issues["value"] = issues["value"].astype("string")
+    issues["detail"] = issues["detail"].astype("string")
+    for col in ("file", "check", "severity", "category", "manufacturer", "quarter"):
+        issues[col] = issues[col].astype("category")
+    return issues
+
+
+def _spec(date_cols: pd.DataFrame) -> pd.Series:
+    """Raw date spec of the given rows as one string ('2024-13-01', or 'year=2024 quarter=Q5')."""
+    if "date" in date_cols.columns:
+        return date_cols["date"]
+    out = pd.Series("", index=date_cols.index)
+    for c in date_cols.columns:
+        out = out + f"{c}=" + date_cols[c].fillna("") + " "
+    return out.str.rstrip()
+
+
+def _map_uniques(s: pd.Series, fn) -> pd.Series:
+    """fn over the distinct values only (labels repeat a lot), broadcast back to rows."""
+    codes, uniques = pd.factorize(s)
+    new_codes, cats = pd.factorize(pd.Series([fn(u) for u in uniques], dtype=object))
+    new_codes = np.append(new_codes, -1)  # NaN rows (code -1) stay NaN
+    return pd.Series(pd.Categorical.from_codes(new_codes[codes], categories=cats), index=s.index)
+
+
+def _canonical_category(v):
+    label = " ".join(str(v).split())
+    c = label.upper()
+    if c in CATEGORIES:
+        return c
+    return CATEGORY_ALIASES.get(c.replace(" ", "").replace("-", "").replace("_", ""), label or None)
+
+
+def _clean_label(v):
+    v = " ".join(str(v).split())
+    return v or None
+
+
+def _label_key(labels) -> pd.Index:
+    return pd.Index(labels).str.upper().str.replace(r"[^0-9A-Z]+", "", regex=True)
+
+
+def _codes(s: pd.Series, labels: dict) -> np.ndarray:
+    """Labels -> ids in a per-file dict (grows as new labels appear)."""
+    codes, uniques = pd.factorize(s)
+    ids = np.array([labels.setdefault(u, len(labels)) for u in uniques], dtype=np.int64)
+    return ids[codes] if len(ids) else np.zeros(len(s), dtype=np.int64)
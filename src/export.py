@@ -0,0 +1,64 @@
+import io
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.perf import timed
+
+# Download/export serializers. Each takes a frame and returns the file bytes;
+# the app wraps them in callables so nothing is serialized until a user clicks.
+# The payload is still built whole in memory (download_button takes bytes, not
+# a stream): deferral keeps reruns cheap, it doesn't bound a download's size.
+# Parquet and Arrow IPC keep the compact dtypes (dictionary-encoded labels,
+# int32 counts, float32 %), so they are a fraction of the CSV size and much
+# faster to write.
+
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    # written straight into the byte buffer in chunks; no intermediate str
+    df.to_csv(buf, index=False, encoding="utf-8", chunksize=100_000)
+    return buf.getvalue()
+
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buf, compression="zstd")
+    return buf.getvalue()
+
+
+def to_arrow_bytes(df: pd.DataFrame) -> bytes:
+    """Arrow IPC file (a.k.a. Feather v2), readable with pyarrow.ipc / pd.read_feather."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=100_000)
+    return sink.getvalue().to_pybytes()
+
+
+# format -> (extension, mime, serializer)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv", to_csv_bytes),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", to_parquet_bytes),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file", to_arrow_bytes),
+}
+
+
+@timed
+def export_bytes(df: pd.DataFrame, fmt: str = "CSV") -> bytes:
+    return EXPORT_FORMATS[fmt][2](df)
+
+
+@timed
+def zip_bundle(views: dict, fmt: str = "CSV") -> bytes:
+    """Several named frames as one zip: {name: df} -> name.<ext> entries."""
+    ext, _, serialize = EXPORT_FORMATS[fmt]
+    buf = io.BytesIO()
+    # parquet/arrow are already compressed; only deflate text
+    method = zipfile.ZIP_DEFLATED if fmt == "CSV" else zipfile.ZIP_STORED
+    with zipfile.ZipFile(buf, "w", compression=method) as zf:
+        for name, df in views.items():
+            zf.writestr(f"{name}.{ext}", serialize(df))
+    return buf.getvalue()
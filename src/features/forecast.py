@@ -0,0 +1,255 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data.clean import to_compact
+from src.data.storage import save_processed
+from src.features.growth import quarter_key, quarter_labels
+from src.perf import timed
+from src.utils import get_logger
+
+log = get_logger("forecast")
+
+# ---- Batch forecasting: every series of the growth cube in one pass ----
+# Series (category x manufacturer, incl. TOTAL and ALL/TOTAL) are scattered onto
+# a dense (series x quarter) grid like add_growth, so each model below is a
+# handful of array ops over all series at once; the only Python loop is over
+# quarters (Holt-Winters recursion). Per series, the model with the lowest
+# one-step-ahead MAPE over the last BACKTEST quarters is kept. Forecasts are
+# written next to the processed parquet (FORECAST_NAME) by the pipeline, so the
+# app only reads them.
+
+FORECAST_NAME = "forecasts.parquet"
+SEASON = 4           # quarters per year
+HORIZON = 4          # quarters ahead written by the pipeline (pages show h=1)
+BACKTEST = 4         # trailing quarters scored for model selection
+MODELS = ["naive", "seasonal_naive", "seasonal_drift", "holt_winters"]
+# Holt-Winters (additive on log1p, i.e. multiplicative seasonality) parameter grid,
+# chosen per series by in-sample one-step SSE; trend is damped
+HW_ALPHAS = (0.2, 0.5, 0.8)
+HW_BETAS = (0.0, 0.1, 0.3)
+HW_GAMMAS = (0.1, 0.3)
+HW_PHI = 0.9
+Z80 = 1.2816         # 80% interval
+MIN_BLOCK_SERIES = 500  # fewer series per worker task than this aren't worth a process
+
+
+def series_grid(df: pd.DataFrame, value_col: str = "registrations"):
+    """Flat (category, manufacturer, date, value) rows -> (keys frame, grid[series, quarter], first quarter key)."""
+    g = df.groupby(["category", "manufacturer"], sort=False, observed=True)
+    codes = g.ngroup().to_numpy()
+    keys = g.size().reset_index()[["category", "manufacturer"]]
+    qk = quarter_key(df["date"])
+    q0 = int(qk.min())
+    n_q = int(qk.max()) - q0 + 1
+    grid = np.full((len(keys), n_q), np.nan)
+    grid[codes, qk - q0] = df[value_col].to_numpy(dtype=float)
+    return keys, grid, q0
+
+
+# ---- Models: (Y[series, quarter], horizon) -> (one-step fitted, forecasts[series, horizon]) ----
+def _ffill(Y: np.ndarray) -> np.ndarray:
+    idx = np.where(np.isnan(Y), 0, np.arange(Y.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return Y[np.arange(len(Y))[:, None], idx]
+
+
+def _nanmean(a: np.ndarray) -> np.ndarray:
+    """Row mean ignoring NaN; NaN (no warning) for all-NaN rows."""
+    n = (~np.isnan(a)).sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        return np.where(n > 0, np.nansum(a, axis=1) / np.maximum(n, 1), np.nan)
+
+
+def _shift(Y: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(Y, np.nan)
+    if n < Y.shape[1]:
+        out[:, n:] = Y[:, :-n]
+    return out
+
+
+def naive(Y, horizon):
+    """Last observed value."""
+    filled = _ffill(Y)
+    return _shift(filled, 1), np.repeat(filled[:, -1:], horizon, axis=1)
+
+
+def _seasonal_index(n_q: int, h: np.ndarray) -> np.ndarray:
+    """Column of the same quarter in the last observed year, for steps h = 1..H past the end."""
+    return n_q - 1 + h - SEASON * np.ceil(h / SEASON).astype(int)
+
+
+def seasonal_naive(Y, horizon):
+    """Same quarter last year."""
+    if Y.shape[1] < SEASON:
+        return np.full_like(Y, np.nan), np.full((len(Y), horizon), np.nan)
+    h = np.arange(1, horizon + 1)
+    return _shift(Y, SEASON), Y[:, _seasonal_index(Y.shape[1], h)]
+
+
+def seasonal_drift(Y, horizon):
+    """Same quarter last year x the latest YoY ratio (per year ahead)."""
+    if Y.shape[1] <= SEASON:
+        return np.full_like(Y, np.nan), np.full((len(Y), horizon), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = Y / _shift(Y, SEASON)
+    ratio = np.where(np.isfinite(ratio), ratio, np.nan)
+    fitted = _shift(Y, SEASON) * _shift(ratio, 1)
+    h = np.arange(1, horizon + 1)
+    years = np.ceil(h / SEASON)
+    fc = Y[:, _seasonal_index(Y.shape[1], h)] * ratio[:, -1:] ** years
+    return fitted, fc
+
+
+def holt_winters(Y, horizon):
+    """Damped additive Holt-Winters on log1p(y), parameters picked per series from the HW grid."""
+    n_s, n_q = Y.shape
+    L = np.log1p(np.where(Y < 0, np.nan, Y))
+    best_sse = np.full(n_s, np.inf)
+    fitted = np.full_like(L, np.nan)
+    fc = np.full((n_s, horizon), np.nan)
+    damp = np.cumsum(HW_PHI ** np.arange(1, horizon + 1))
+
+    first = _nanmean(L[:, :SEASON]) if n_q >= SEASON else np.full(n_s, np.nan)
+    for a in HW_ALPHAS:
+        for b in HW_BETAS:
+            for g in HW_GAMMAS:
+                level = first.copy()
+                trend = np.zeros(n_s)
+                season = np.nan_to_num(L[:, :SEASON] - first[:, None]) if n_q >= SEASON else np.zeros((n_s, SEASON))
+                fit = np.full_like(L, np.nan)
+                for t in range(min(SEASON, n_q), n_q):
+                    y, s = L[:, t], season[:, t % SEASON]
+                    pred = level + HW_PHI * trend + s
+                    fit[:, t] = pred
+                    ok = ~np.isnan(y)
+                    start = ok & np.isnan(level)           # series starting late: seed the level
+                    upd = ok & ~start
+                    new_level = np.where(upd, a * (y - s) + (1 - a) * (level + HW_PHI * trend), level)
+                    trend = np.where(upd, b * (new_level - level) + (1 - b) * HW_PHI * trend, HW_PHI * trend)
+                    season[:, t % SEASON] = np.where(upd, g * (y - new_level) + (1 - g) * s, s)
+                    level = np.where(start, y, new_level)
+                sse = np.nansum((L - fit) ** 2, axis=1)
+                better = sse < best_sse
+                if not better.any():
+                    continue
+                best_sse[better] = sse[better]
+                fitted[better] = fit[better]
+                h_idx = (n_q - 1 + np.arange(1, horizon + 1)) % SEASON
+                path = level[:, None] + damp * trend[:, None] + season[:, h_idx]
+                fc[better] = path[better]
+    return np.expm1(fitted), np.expm1(fc)
+
+
+_MODEL_FNS = {"naive": naive, "seasonal_naive": seasonal_naive,
+              "seasonal_drift": seasonal_drift, "holt_winters": holt_winters}
+
+
+def forecast_grid(Y: np.ndarray, horizon: int = HORIZON) -> dict:
+    """
+    Fit every model on every row of Y, keep the best per row (last-BACKTEST
+    one-step MAPE; naive when nothing can be scored). Returns arrays:
+    forecast/lower/upper [series, horizon], model (index into MODELS), mape [series].
+    """
+    n_s, n_q = Y.shape
+    fits, fcs, mapes = [], [], []
+    tail = slice(max(n_q - BACKTEST, 0), n_q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name in MODELS:
+            fitted, fc = _MODEL_FNS[name](Y, horizon)
+            ape = np.abs(fitted[:, tail] - Y[:, tail]) / Y[:, tail]
+            ape = np.where(np.isfinite(ape), ape, np.nan)
+            mape = _nanmean(ape)
+            fits.append(fitted)
+            fcs.append(fc)
+            mapes.append(np.where(np.isnan(fc).any(axis=1), np.nan, mape))
+
+        mapes = np.stack(mapes, axis=1)
+        choice = np.where(np.isnan(mapes).all(axis=1), 0, np.argmin(np.nan_to_num(mapes, nan=np.inf), axis=1))
+        rows = np.arange(n_s)
+        fc = np.stack(fcs, axis=1)[rows, choice]
+        fitted = np.stack(fits, axis=1)[rows, choice]
+
+        # interval from the chosen model's relative one-step errors, widening with sqrt(h)
+        rel = (Y - fitted) / fitted
+        rel = np.where(np.isfinite(rel), rel, np.nan)
+        sd = np.nan_to_num(np.sqrt(_nanmean((rel - _nanmean(rel)[:, None]) ** 2)))
+    spread = Z80 * sd[:, None] * np.sqrt(np.arange(1, horizon + 1))
+    fc = np.maximum(fc, 0)
+    return {
+        "forecast": fc,
+        "lower": np.maximum(fc * (1 - spread), 0),
+        "upper": fc * (1 + spread),
+        "model": choice,
+        "mape": mapes[rows, choice] * 100,
+    }
+
+
+def _forecast_blocks(Y: np.ndarray, horizon: int, workers: int) -> dict:
+    # one block per worker (each block is vectorized already), but none under MIN_BLOCK_SERIES
+    size = max(-(-len(Y) // workers), MIN_BLOCK_SERIES)
+    blocks = [Y[i:i + size] for i in range(0, len(Y), size)]
+    workers = min(workers, len(blocks))
+    if workers <= 1:
+        parts = [forecast_grid(b, horizon) for b in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(forecast_grid, blocks, [horizon] * len(blocks)))
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+@timed
+def forecast_cube(cube: pd.DataFrame, horizon: int = HORIZON, workers: int = None) -> pd.DataFrame:
+    """
+    Next `horizon` quarters for every series in the growth cube (or a flat
+    frame with category/manufacturer/date/registrations). Series without an
+    observation in the last year are skipped. Series are split into one block
+    per worker (at least MIN_BLOCK_SERIES each) over `workers` processes
+    (default: all cores).
+
+    Columns: category, manufacturer, date (quarter end), quarter, horizon,
+    forecast, lower/upper (80%), model, backtest_mape_pct, and the implied
+    qoq_pct/yoy_pct (vs actuals, or vs earlier forecast quarters).
+    """
+    df = cube.reset_index() if isinstance(cube.index, pd.MultiIndex) else cube
+    keys, Y, q0 = series_grid(df)
+    active = (~np.isnan(Y[:, -SEASON:])).any(axis=1)
+    keys, Y = keys[active].reset_index(drop=True), Y[active]
+    n_s, n_q = Y.shape
+    if n_s == 0:
+        return pd.DataFrame()
+
+    workers = workers or os.cpu_count() or 1
+    res = _forecast_blocks(Y, horizon, workers)
+
+    # implied growth along actuals + forecast path
+    path = np.concatenate([Y, res["forecast"]], axis=1)
+    cols = n_q + np.arange(horizon)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qoq = (path[:, cols] / path[:, cols - 1] - 1) * 100
+        yoy = (path[:, cols] / path[:, cols - SEASON] - 1) * 100 if n_q >= SEASON else np.full_like(qoq, np.nan)
+
+    qkeys = q0 + cols
+    out = pd.DataFrame({
+        "category": np.repeat(keys["category"].to_numpy(), horizon),
+        "manufacturer": np.repeat(keys["manufacturer"].to_numpy(), horizon),
+        "date": np.tile(pd.PeriodIndex.from_ordinals(qkeys, freq="Q").to_timestamp(how="end").normalize(), n_s),
+        "quarter": np.tile(quarter_labels(qkeys), n_s),
+        "horizon": np.tile(np.arange(1, horizon + 1, dtype=np.int8), n_s),
+        "forecast": res["forecast"].ravel().round().astype(np.int64),
+        "lower": res["lower"].ravel().round().astype(np.int64),
+        "upper": res["upper"].ravel().round().astype(np.int64),
+        "model": pd.Categorical.from_codes(np.repeat(res["model"], horizon), MODELS),
+        "backtest_mape_pct": np.repeat(res["mape"], horizon).astype(np.float32),
+        "qoq_pct": np.where(np.isfinite(qoq), qoq, np.nan).ravel().astype(np.float32),
+        "yoy_pct": np.where(np.isfinite(yoy), yoy, np.nan).ravel().astype(np.float32),
+    })
+    log.info(f"Forecast {n_s:,} series x {horizon} quarter(s) "
+             f"({', '.join(f'{m}: {n}' for m, n in out.loc[out['horizon'] == 1, 'model'].value_counts().items())})")
+    return to_compact(out)
+
+
+def save_forecasts(fc: pd.DataFrame, name: str = FORECAST_NAME):
+    return save_processed(fc, name)
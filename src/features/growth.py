@@ -1,21 +1,152 @@
+import numpy as np
 import pandas as pd
 
-def add_qoq(df: pd.DataFrame, group_cols=("category","manufacturer")) -> pd.DataFrame:
-    df = df.sort_values(["date"]).copy()
-    df["prev_q"] = df.groupby(list(group_cols))["registrations"].shift(1)
-    df["qoq_pct"] = (df["registrations"] - df["prev_q"]) / df["prev_q"] * 100
+from src.data.clean import to_compact
+from src.perf import timed
+
+# lag (in quarters) -> (previous-value column, growth % column)
+LAG_COLUMNS = {1: ("prev_q", "qoq_pct"), 4: ("prev_y", "yoy_pct")}
+DEFAULT_LAGS = (1, 4)
+
+def quarter_key(dates) -> np.ndarray:
+    """Calendar quarter as a running int (quarters since 1970Q1), so gaps stay gaps."""
+    months = np.asarray(pd.DatetimeIndex(dates).values.astype("datetime64[M]"), dtype=np.int64)
+    return months // 3
+
+def quarter_labels(keys) -> list:
+    """Inverse of quarter_key: running ints -> '2025Q2' labels."""
+    return pd.PeriodIndex.from_ordinals(sorted(keys), freq="Q").astype(str).tolist()
+
+@timed
+def add_growth(df: pd.DataFrame, group_cols=("category","manufacturer"),
+               lags=DEFAULT_LAGS, trailing=(), cagr_years=(), value_col="registrations") -> pd.DataFrame:
+    """
+    Single-pass growth engine. Scatters each group's series onto a dense
+    (group x quarter) grid, so every lag is a calendar offset rather than a
+    positional shift: a missing quarter yields NaN instead of comparing
+    against the wrong period. No sort — rows keep their input order
+    (e.g. the one from ensure_quarter_order).
+
+    lags        -> prev/growth columns (1 and 4 map to prev_q/qoq_pct, prev_y/yoy_pct);
+                   % columns are float32
+    trailing    -> t{n}q_<value_col>: sum of the last n quarters (NaN if any missing)
+    cagr_years  -> cagr_{n}y_pct: compound annual growth vs n years back
+    Rows are expected unique per (group, quarter); duplicates are summed.
+    Rows with a null group key or date belong to no series: their growth
+    columns are NaN and they are never anyone's lag.
+    """
+    df = df.copy()
+    if df.empty:
+        return df
+
+    # a null key has no group: ngroup gives -1 or NaN for it depending on the pandas version
+    codes = df.groupby(list(group_cols), sort=False, observed=True).ngroup()
+    codes = codes.fillna(-1).to_numpy(dtype=np.int64)
+    dates = pd.DatetimeIndex(df["date"])
+    ok = (codes >= 0) & ~dates.isna()
+    qk = np.zeros(len(df), dtype=np.int64)
+    qk[ok] = quarter_key(dates[ok])
+    q0 = qk[ok].min() if ok.any() else 0
+    n_q = int(qk[ok].max() - q0) + 1 if ok.any() else 0
+    n_g = int(codes.max()) + 1 if ok.any() else 0
+    # rows outside every series point at one extra NaN cell past the grid
+    cell = np.where(ok, codes * n_q + (qk - q0), n_g * n_q)
+
+    vals = pd.to_numeric(df[value_col], errors="coerce").to_numpy(dtype=float)
+    known = ~np.isnan(vals) & ok
+    grid = np.bincount(cell[known], weights=vals[known], minlength=n_g * n_q)
+    seen = np.bincount(cell[known], minlength=n_g * n_q) > 0
+    grid = np.where(seen, grid, np.nan).reshape(n_g, n_q)
+
+    def at_rows(g):
+        return np.append(g.ravel(), np.nan)[cell]
+
+    def lagged(n):
+        out = np.full_like(grid, np.nan)
+        if n < n_q:
+            out[:, n:] = grid[:, :-n]
+        return at_rows(out)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for n in lags:
+            prev_col, pct_col = LAG_COLUMNS.get(n, (f"prev_{n}q", f"growth_{n}q_pct"))
+            prev = lagged(n)
+            df[prev_col] = prev
+            df[pct_col] = ((vals - prev) / prev * 100).astype(np.float32)
+
+        if trailing:
+            filled = np.nan_to_num(grid)
+            csum = np.concatenate([np.zeros((n_g, 1)), filled.cumsum(axis=1)], axis=1)
+            ccnt = np.concatenate([np.zeros((n_g, 1)), (~np.isnan(grid)).cumsum(axis=1)], axis=1)
+            for n in trailing:
+                tot = np.full_like(grid, np.nan)
+                if n <= n_q:
+                    win = csum[:, n:] - csum[:, :-n]
+                    full = (ccnt[:, n:] - ccnt[:, :-n]) == n
+                    tot[:, n - 1:] = np.where(full, win, np.nan)
+                df[f"t{n}q_{value_col}"] = at_rows(tot)
+
+        for n in cagr_years:
+            base = lagged(4 * n)
+            df[f"cagr_{n}y_pct"] = ((np.power(vals / base, 1.0 / n) - 1) * 100).astype(np.float32)
     return df
 
+def add_qoq(df: pd.DataFrame, group_cols=("category","manufacturer")) -> pd.DataFrame:
+    return add_growth(df, group_cols, lags=(1,))
+
 def add_yoy(df: pd.DataFrame, group_cols=("category","manufacturer")) -> pd.DataFrame:
-    df = df.sort_values(["date"]).copy()
-    df["prev_y"] = df.groupby(list(group_cols))["registrations"].shift(4)
-    df["yoy_pct"] = (df["registrations"] - df["prev_y"]) / df["prev_y"] * 100
-    return df
+    return add_growth(df, group_cols, lags=(4,))
 
+@timed
 def add_totals(df: pd.DataFrame) -> pd.DataFrame:
     """Add a 'TOTAL' manufacturer row per category for investor view."""
     base = df.copy()
     tot = (base
-           .groupby(["date","year","quarter","category"], as_index=False)["registrations"].sum())
+           .groupby(["date","year","quarter","category"], as_index=False, observed=True)["registrations"].sum())
     tot["manufacturer"] = "TOTAL"
-    return pd.concat([base, tot], ignore_index=True)
+    # concat widens categoricals with new labels to object; re-encode
+    return to_compact(pd.concat([base, tot], ignore_index=True))
+
+# ---- Growth cube: precomputed once, pages only slice it ----
+CUBE_INDEX = ["category", "manufacturer", "date"]
+ALL_CATEGORIES = "ALL"
+
+@timed
+def build_growth_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Category x manufacturer x quarter cube with registrations, prev_q, prev_y,
+    qoq_pct, yoy_pct. Includes TOTAL per category plus an 'ALL' category
+    (TOTAL across categories). Indexed on (category, manufacturer, date).
+    """
+    base = df.loc[df["manufacturer"] != "TOTAL",
+                  ["date", "year", "quarter", "category", "manufacturer", "registrations"]]
+    base = add_totals(base)
+    grand = (base[base["manufacturer"] == "TOTAL"]
+             .groupby(["date", "year", "quarter"], as_index=False, observed=True)["registrations"].sum())
+    grand["category"] = ALL_CATEGORIES
+    grand["manufacturer"] = "TOTAL"
+
+    cube = to_compact(pd.concat([base, grand], ignore_index=True))
+    cube = add_growth(cube)
+    return cube.set_index(CUBE_INDEX).sort_index()
+
+@timed
+def cube_slice(cube: pd.DataFrame, categories=None, manufacturers=None,
+               start=None, end=None) -> pd.DataFrame:
+    """Indexed lookup on the cube; returns a flat frame (index reset)."""
+    idx = pd.IndexSlice
+    keys = []
+    for i, wanted in enumerate((categories, manufacturers)):
+        if wanted is None:
+            keys.append(slice(None))
+            continue
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        present = cube.index.levels[i]
+        wanted = [w for w in wanted if w in present]
+        if not wanted:
+            return cube.iloc[0:0].reset_index()
+        keys.append(wanted)
+    dates = slice(pd.Timestamp(start) if start is not None else None,
+                  pd.Timestamp(end) if end is not None else None)
+    return cube.loc[idx[keys[0], keys[1], dates], :].reset_index()
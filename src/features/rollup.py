@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+from src.data.clean import to_compact
+from src.data.storage import save_processed, load_processed_cached, PROCESSED_DIR
+from src.utils import get_logger
+
+log = get_logger("rollup")
+
+# ---- Multi-granularity model: month -> quarter -> year, RTO -> state -> national ----
+# Base rows are (month, state, rto, category, manufacturer) counts (see
+# ingest_upload.parse_granular_csv). Every (time, geo) level pair is an
+# aggregate keyed by an integer period ordinal (pandas Period ordinals: months /
+# quarters / years since 1970), so coarsening time is integer division and
+# coarsening geo is dropping a key column. Materialized levels are saved under
+# data/processed/rollups/; a query at any level is answered from the smallest
+# materialized aggregate that is at least as fine in both dimensions.
+
+TIME_LEVELS = ["month", "quarter", "year"]
+GEO_LEVELS = ["rto", "state", "national"]
+GEO_KEYS = {"rto": ["state", "rto"], "state": ["state"], "national": []}
+# months per period: an ordinal at level a maps to level b by // (_MONTHS_PER[b] // _MONTHS_PER[a])
+_MONTHS_PER = {"month": 1, "quarter": 3, "year": 12}
+# lags (in periods) for growth columns: previous period and same period last year
+GROWTH_LAGS = {"month": (1, 12), "quarter": (1, 4), "year": (1,)}
+ALL_LEVELS = [(t, g) for t in TIME_LEVELS for g in GEO_LEVELS]
+ROLLUP_DIR = "rollups"
+
+
+def month_key(dates) -> np.ndarray:
+    """Months since 1970-01 (the pandas monthly Period ordinal)."""
+    return np.asarray(pd.DatetimeIndex(dates).values.astype("datetime64[M]"), dtype=np.int64)
+
+
+def period_dates(keys, time: str) -> pd.DatetimeIndex:
+    """Period ordinals -> period-end dates (matching the quarter-end convention elsewhere)."""
+    freq = {"month": "M", "quarter": "Q", "year": "Y"}[time]
+    return pd.PeriodIndex.from_ordinals(np.asarray(keys), freq=freq).to_timestamp(how="end").normalize()
+
+
+def period_labels(keys, time: str) -> pd.Categorical:
+    freq = {"month": "M", "quarter": "Q", "year": "Y"}[time]
+    uniq, inv = np.unique(np.asarray(keys), return_inverse=True)
+    return pd.Categorical.from_codes(inv, pd.PeriodIndex.from_ordinals(uniq, freq=freq).astype(str))
+
+
+def _finer_or_equal(a: tuple, b: tuple) -> bool:
+    """Can level a be rolled up to level b?"""
+    return TIME_LEVELS.index(a[0]) <= TIME_LEVELS.index(b[0]) and GEO_LEVELS.index(a[1]) <= GEO_LEVELS.index(b[1])
+
+
+def _group_cols(geo: str) -> list:
+    return ["period"] + GEO_KEYS[geo] + ["category", "manufacturer"]
+
+
+def rollup(agg: pd.DataFrame, src: tuple, dst: tuple) -> pd.DataFrame:
+    """Aggregate at level src -> level dst (dst must be coarser or equal)."""
+    if not _finer_or_equal(src, dst):
+        raise ValueError(f"Can't roll {src} up to {dst}")
+    if src == dst:
+        return agg
+    cols = _group_cols(dst[1])
+    period = agg["period"].to_numpy() // (_MONTHS_PER[dst[0]] // _MONTHS_PER[src[0]])
+    out = (agg.assign(period=period)
+           .groupby(cols, observed=True, sort=False, as_index=False)["registrations"].sum())
+    return to_compact(out)
+
+
+class RollupStore:
+    """
+    Materialized aggregates by (time, geo) level plus the planner that answers
+    any level from the nearest one. Aggregates are loaded lazily from disk
+    (shared, process-wide cache) when the store comes from RollupStore.load.
+    """
+
+    def __init__(self, aggregates: dict = None, name: str = None, levels=None):
+        self._aggregates = dict(aggregates or {})
+        self.name = name
+        self.levels = sorted(set(levels or self._aggregates), key=ALL_LEVELS.index)
+
+    # ---- build / persist ----
+    @classmethod
+    def build(cls, base: pd.DataFrame, levels=ALL_LEVELS) -> "RollupStore":
+        """
+        Materialize `levels` from base rows (GRANULAR_COLS). The finest level is
+        built from the base rows; every other one from the nearest level built
+        before it, so the base rows are scanned once.
+        """
+        agg = base.assign(period=month_key(base["date"]))
+        agg = to_compact(agg.groupby(_group_cols("rto"), observed=True, sort=False, as_index=False)
+                         ["registrations"].sum())
+        store = cls({("month", "rto"): agg})
+        built = {}
+        for level in sorted(set(levels), key=ALL_LEVELS.index):
+            built[level] = store.aggregate(level)
+            store._aggregates[level] = built[level]
+            store.levels = sorted(store._aggregates, key=ALL_LEVELS.index)
+        return cls(built)
+
+    def save(self, name: str = ROLLUP_DIR) -> list:
+        paths = [save_processed(df, f"{name}/{t}_{g}.parquet") for (t, g), df in self._aggregates.items()]
+        log.info(f"Rollups saved: {len(paths)} level(s) -> {PROCESSED_DIR / name}")
+        return paths
+
+    @classmethod
+    def load(cls, name: str = ROLLUP_DIR) -> "RollupStore":
+        """Store over the levels materialized on disk (data read on first use)."""
+        levels = []
+        for p in (PROCESSED_DIR / name).glob("*_*.parquet"):
+            t, g = p.stem.split("_", 1)
+            if (t, g) in ALL_LEVELS:
+                levels.append((t, g))
+        if not levels:
+            raise FileNotFoundError(PROCESSED_DIR / name)
+        return cls(name=name, levels=levels)
+
+    def _get(self, level: tuple) -> pd.DataFrame:
+        df = self._aggregates.get(level)
+        if df is None:
+            df = load_processed_cached(f"{self.name}/{level[0]}_{level[1]}.parquet")
+        return df
+
+    # ---- planning / querying ----
+    def source_for(self, level: tuple) -> tuple:
+        """Smallest materialized level that can be rolled up to `level`."""
+        candidates = [l for l in self.levels if _finer_or_equal(l, level)]
+        if not candidates:
+            raise ValueError(f"No materialized level can answer {level} (have {self.levels})")
+        if level in candidates:
+            return level
+        return min(candidates, key=self.n_rows)
+
+    def n_rows(self, level: tuple) -> int:
+        df = self._aggregates.get(level)
+        if df is not None:
+            return len(df)
+        import pyarrow.parquet as pq  # footer only, no data read
+        return pq.ParquetFile(PROCESSED_DIR / self.name / f"{level[0]}_{level[1]}.parquet").metadata.num_rows
+
+    def aggregate(self, level: tuple) -> pd.DataFrame:
+        src = self.source_for(level)
+        return rollup(self._get(src), src, level)
+
+    def query(self, time: str = "quarter", geo: str = "national", categories=None, manufacturers=None,
+              states=None, rtos=None, start=None, end=None, growth: bool = False) -> pd.DataFrame:
+        """
+        Registrations at (time, geo) for the selection, with `date` (period end)
+        and `period` ("2025-03" / "2025Q1" / "2025") columns. Filters are applied
+        to the source aggregate before rolling up; growth=True adds
+        prev/pct columns for GROWTH_LAGS[time] (e.g. MoM + YoY for months).
+        """
+        level = (time, geo)
+        src = self.source_for(level)
+        agg = self._get(src)
+
+        mask = np.ones(len(agg), dtype=bool)
+        for col, wanted in (("category", categories), ("manufacturer", manufacturers),
+                            ("state", states), ("rto", rtos)):
+            if wanted is not None:
+                if col not in agg.columns:
+                    raise ValueError(f"{col} filter needs geo level '{col}' or finer")
+                mask &= agg[col].isin([wanted] if isinstance(wanted, str) else wanted).to_numpy()
+        # bounds are on the requested level's periods (a whole quarter/year in or out);
+        # with growth, widen by the largest lag so the first periods get their baseline
+        div = _MONTHS_PER[time] // _MONTHS_PER[src[0]]
+        lo = _to_key(start, time) if start is not None else None
+        hi = _to_key(end, time) if end is not None else None
+        lo_read = lo - max(GROWTH_LAGS[time]) if (growth and lo is not None) else lo
+        pk = agg["period"].to_numpy() // div
+        if lo_read is not None:
+            mask &= pk >= lo_read
+        if hi is not None:
+            mask &= pk <= hi
+
+        out = rollup(agg[mask], src, level)
+        if growth:
+            out = add_period_growth(out, time, geo)
+        if lo is not None:
+            out = out[out["period"].to_numpy() >= lo]
+        out = out.sort_values(_group_cols(geo)[1:] + ["period"], kind="stable").reset_index(drop=True)
+        out.insert(0, "date", period_dates(out["period"], time))
+        out["period"] = period_labels(out["period"], time)
+        return out
+
+
+def add_period_growth(agg: pd.DataFrame, time: str, geo: str) -> pd.DataFrame:
+    """
+    prev_<n> / growth_<n>_pct per series for each lag in GROWTH_LAGS[time],
+    matched on the period ordinal (a missing period gives NaN, not the wrong one).
+    """
+    keys = _group_cols(geo)[1:]
+    out = agg.copy()
+    vals = out["registrations"].to_numpy(dtype=float)
+    for n in GROWTH_LAGS[time]:
+        prev = agg[keys + ["period", "registrations"]].assign(period=agg["period"].to_numpy() + n)
+        prev = out[keys + ["period"]].merge(prev, on=keys + ["period"], how="left")["registrations"]
+        out[f"prev_{n}"] = prev.to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[f"growth_{n}_pct"] = ((vals - out[f"prev_{n}"]) / out[f"prev_{n}"] * 100).astype(np.float32)
+    return out
+
+
+def _to_key(date, time: str) -> int:
+    return int(month_key([pd.Timestamp(date)])[0] // _MONTHS_PER[time])
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from src.data.clean import to_compact
+from src.data.storage import save_processed
+from src.features.growth import ALL_CATEGORIES, quarter_key
+from src.perf import timed
+from src.utils import get_logger
+
+log = get_logger("share")
+
+# ---- Market-share / ranking index ----
+# One row per (quarter, category, manufacturer): share of the category TOTAL,
+# share change vs last quarter / last year (percentage points), rank by
+# registrations and rank movement. The ALL category ranks manufacturers across
+# categories (share of ALL/TOTAL). Built once by the pipeline from the growth
+# cube and saved as SHARE_NAME; ShareIndex serves any (quarter, category)
+# leaderboard as a slice of precomputed orderings, no sorting at request time.
+
+SHARE_NAME = "share_index.parquet"
+SHARE_LAGS = {1: "qoq", 4: "yoy"}
+# leaderboard orderings: name -> (column, ascending); NaN always last
+ORDERS = {"share": ("rank", True), "yoy": ("yoy_pct", False), "gain": ("share_chg_qoq_pp", False)}
+
+
+def _lagged(values: np.ndarray, codes: np.ndarray, qk: np.ndarray, n: int) -> np.ndarray:
+    """Value of the same series n quarters earlier (calendar lag on a dense grid; NaN if missing)."""
+    if not len(values):
+        return np.asarray(values, dtype=float)
+    q0, n_q = qk.min(), int(qk.max() - qk.min()) + 1
+    grid = np.full((int(codes.max()) + 1, n_q + n), np.nan)
+    grid[codes, qk - q0 + n] = values
+    return grid[codes, qk - q0]
+
+
+@timed
+def build_share_index(cube: pd.DataFrame) -> pd.DataFrame:
+    """Share/rank rows from the growth cube (or any flat frame with TOTAL rows per category)."""
+    df = cube.reset_index() if isinstance(cube.index, pd.MultiIndex) else cube
+    cols = ["date", "quarter", "category", "manufacturer", "registrations", "qoq_pct", "yoy_pct"]
+    mfr = df.loc[df["manufacturer"] != "TOTAL", cols]
+    # ALL: each manufacturer summed over categories (growth recomputed below)
+    every = (mfr.groupby(["date", "quarter", "manufacturer"], observed=True, as_index=False)["registrations"].sum()
+             .assign(category=ALL_CATEGORIES))
+    rows = pd.concat([mfr.astype({"category": str, "manufacturer": str, "quarter": str}),
+                      every.astype({"manufacturer": str, "quarter": str})], ignore_index=True)
+
+    totals = (rows.groupby(["date", "category"], observed=True)["registrations"].transform("sum")
+              .to_numpy(dtype=float))
+    regs = rows["registrations"].to_numpy(dtype=float)
+    codes = rows.groupby(["category", "manufacturer"], sort=False).ngroup().to_numpy()
+    qk = quarter_key(rows["date"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(totals > 0, regs / totals * 100, np.nan)
+    rows["share_pct"] = share.astype(np.float32)
+    rows["rank"] = (rows.groupby(["date", "category"])["registrations"]
+                    .rank(method="min", ascending=False).astype(np.int16))
+
+    all_rows = (rows["category"] == ALL_CATEGORIES).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for n, tag in SHARE_LAGS.items():
+            rows[f"share_chg_{tag}_pp"] = (share - _lagged(share, codes, qk, n)).astype(np.float32)
+            growth = ((regs / _lagged(regs, codes, qk, n) - 1) * 100).astype(np.float32)
+            rows[f"{tag}_pct"] = np.where(all_rows, growth, rows[f"{tag}_pct"].to_numpy(dtype=np.float32))
+        rows["rank_prev"] = _lagged(rows["rank"].to_numpy(dtype=float), codes, qk, 1).astype(np.float32)
+    rows["rank_change"] = (rows["rank_prev"] - rows["rank"]).astype(np.float32)  # > 0: moved up
+
+    out = rows.sort_values(["date", "category", "rank", "manufacturer"], kind="stable", ignore_index=True)
+    log.info(f"Share index: {len(out):,} rows, {out[['date', 'category']].drop_duplicates().shape[0]} "
+             f"(quarter, category) leaderboards")
+    return to_compact(out)
+
+
+def save_share_index(index: pd.DataFrame, name: str = SHARE_NAME):
+    return save_processed(index, name)
+
+
+class ShareIndex:
+    """
+    (quarter, category) -> leaderboard lookups over a share index frame. Each
+    ORDERS ordering is one argsort done at construction; a lookup is a dict hit
+    plus a slice of that ordering.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        gid = self.df.groupby(["date", "category"], observed=True, sort=False).ngroup().to_numpy()
+        keys = self.df.loc[~pd.Series(gid).duplicated().to_numpy(), ["date", "category"]]
+        self._groups = {(d, str(c)): i for i, (d, c) in enumerate(zip(keys["date"], keys["category"]))}
+        self._by_date = {}
+        for d, c in self._groups:
+            self._by_date.setdefault(d, []).append(c)
+        self._bounds = np.r_[0, np.cumsum(np.bincount(gid, minlength=len(keys)))]
+        self._orders = {}
+        for name, (col, asc) in ORDERS.items():
+            key = self.df[col].to_numpy(dtype=float)
+            key = key if asc else -key
+            self._orders[name] = np.lexsort((np.nan_to_num(key), np.isnan(key), gid))
+        self.dates = pd.DatetimeIndex(sorted(keys["date"].unique()))
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def latest(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def categories(self, date=None) -> list:
+        return list(self._by_date.get(self._date(date), []))
+
+    def leaderboard(self, category: str = ALL_CATEGORIES, date=None, n: int = None, by: str = "share") -> pd.DataFrame:
+        """Rows for (date, category) in ORDERS[by] order (default: latest quarter, by rank), top n."""
+        if by not in ORDERS:
+            raise ValueError(f"by must be one of {', '.join(ORDERS)}")
+        g = self._groups.get((self._date(date), category))
+        if g is None:
+            return self.df.iloc[0:0]
+        rows = self._orders[by][self._bounds[g]:self._bounds[g + 1]]
+        out = self.df.iloc[rows[:n] if n else rows]
+        col = ORDERS[by][0]
+        return out[out[col].notna()] if by != "share" else out
+
+    def _date(self, date):
+        return self.latest if date is None else pd.Timestamp(date)
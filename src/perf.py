@@ -0,0 +1,163 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+
+from src import config
+from src.utils import get_logger
+
+log = get_logger("perf")
+
+# ---- Hot-path timing ----
+# Pipeline functions are wrapped with @timed and page sections with
+# `with section(...)`. Both only record while a Recorder is active in the
+# current context (a Streamlit script run), or process-wide with PERF_LOG=1
+# (read on first use, like the rest of the config); otherwise @timed is one
+# ContextVar lookup and section() returns a shared no-op context manager.
+# Recorders are per context, so one session profiling its reruns doesn't slow
+# down anyone else's.
+
+_NULL = nullcontext()
+
+
+class Recorder:
+    """Spans (name, ms, depth) for one run; each is logged as a key=value line."""
+
+    def __init__(self, run: str = "", keep: bool = True):
+        self.run = run
+        self.keep = keep
+        self.spans = []
+        self.depth = 0
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str):
+        depth = self.depth
+        self.depth += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.depth = depth
+            if self.keep:
+                self.spans.append((name, ms, depth))
+            log.info(f"perf run={self.run or '-'} span={name} ms={ms:.2f} depth={depth}")
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    def summary(self):
+        """One row per span name: calls, total/max ms (outermost spans first on ties)."""
+        import pandas as pd
+        df = pd.DataFrame(self.spans, columns=["span", "ms", "depth"])
+        out = (df.groupby("span", sort=False)
+               .agg(calls=("ms", "size"), total_ms=("ms", "sum"), max_ms=("ms", "max"), depth=("depth", "min"))
+               .reset_index())
+        return out.sort_values(["total_ms", "depth"], ascending=[False, True], ignore_index=True).round(2)
+
+
+_recorder: ContextVar = ContextVar("perf_recorder", default=None)
+
+
+@lru_cache(maxsize=None)
+def _process_recorder():
+    """The PERF_LOG=1 fallback for contexts without their own Recorder (None when off)."""
+    return Recorder("process", keep=False) if config.PERF_LOG else None
+
+
+def _active():
+    rec = _recorder.get()
+    return _process_recorder() if rec is None else rec
+
+
+def timed(fn=None, *, name: str = None):
+    """Decorator: time calls to fn while a Recorder is active."""
+    if fn is None:
+        return lambda f: timed(f, name=name)
+    label = name or fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        rec = _active()
+        if rec is None:
+            return fn(*args, **kwargs)
+        with rec.span(label):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def section(name: str):
+    """Context manager timing a block (page section) while a Recorder is active."""
+    rec = _active()
+    return _NULL if rec is None else rec.span(name)
+
+
+def start_recording(run: str = "") -> Recorder:
+    """Activate a fresh Recorder for the rest of the current context (e.g. one script run)."""
+    rec = Recorder(run)
+    _recorder.set(rec)
+    return rec
+
+
+def stop_recording():
+    """Drop the current context's Recorder (back to the PERF_LOG process recorder, if on)."""
+    _recorder.set(None)
+
+
+# ---- Opt-in deep capture (cProfile / tracemalloc) ----
+class Capture:
+    """
+    cProfile (current thread only) and/or tracemalloc (process-wide, so it also
+    sees allocations by other sessions) between start() and stop().
+    """
+
+    def __init__(self, cpu: bool = False, memory: bool = False):
+        self.profiler = cProfile.Profile() if cpu else None
+        self.memory = memory
+        self.peak_mb = None
+        self.top_allocations = []
+        self._started_tracemalloc = False
+
+    def start(self) -> "Capture":
+        if self.memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._started_tracemalloc = True
+        if self.profiler:
+            self.profiler.enable()
+        return self
+
+    def stop(self) -> "Capture":
+        if self.profiler:
+            self.profiler.disable()
+        if self.memory and tracemalloc.is_tracing():
+            try:
+                self.peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                stats = tracemalloc.take_snapshot().statistics("lineno")[:10]
+                self.top_allocations = [(str(s.traceback), s.size / 1024 ** 2) for s in stats]
+            finally:
+                # never leave process-wide tracing on behind us
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+                    self._started_tracemalloc = False
+        return self
+
+    def __enter__(self) -> "Capture":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def profile_text(self, n: int = 25, sort: str = "cumulative") -> str:
+        if not self.profiler:
+            return ""
+        buf = io.StringIO()
+        pstats.Stats(self.profiler, stream=buf).strip_dirs().sort_stats(sort).print_stats(n)
+        return buf.getvalue()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.storage import append_processed, load_processed, processed_partitions
+from src.features.growth import (add_growth, add_totals, build_growth_cube,
+                                 quarter_key, quarter_labels, DEFAULT_LAGS)
+from src.utils import get_logger
+
+log = get_logger("pipeline")
+
+BASE_COLS = ["date", "year", "quarter", "category", "manufacturer", "registrations"]
+KEY_COLS = ["date", "category", "manufacturer"]
+
+
+def append_delta(delta: pd.DataFrame, name: str = "registrations.parquet",
+                 cube_name: str = "growth_cube.parquet") -> list:
+    """
+    Merge a delta (new or revised quarters) into the processed dataset.
+
+    Only quarters whose rows or lag windows touch the delta are recomputed
+    (the delta quarters, plus q+1 / q+4 where those already exist), reading
+    just the partitions needed as lag context. Delta rows win over stored
+    rows for the same (quarter, category, manufacturer). Returns the
+    rewritten quarter labels.
+    """
+    delta = standardize(delta)
+    delta = delta.loc[delta["manufacturer"] != "TOTAL", BASE_COLS]
+    if delta.empty:
+        log.info("Empty delta; nothing to do.")
+        return []
+
+    on_disk = set(processed_partitions(name))
+    delta_q = set(np.unique(quarter_key(delta["date"])).tolist())
+    affected = delta_q | {q + lag for q in delta_q for lag in DEFAULT_LAGS}
+    affected = {q for q in affected if q in delta_q or quarter_labels([q])[0] in on_disk}
+    context = affected | {q - lag for q in affected for lag in DEFAULT_LAGS}
+    context_labels = [q for q in quarter_labels(context) if q in on_disk]
+
+    if context_labels:
+        history = load_processed(name, filters=[("quarter", "in", context_labels)])
+        history = history.loc[history["manufacturer"] != "TOTAL", BASE_COLS]
+        history["quarter"] = history["quarter"].astype(str)
+    else:
+        history = delta.iloc[0:0]
+
+    merged = (pd.concat([history, delta], ignore_index=True)
+              .drop_duplicates(KEY_COLS, keep="last"))
+    merged = ensure_quarter_order(standardize(merged))
+
+    keep = quarter_labels(affected)
+    rebuilt = add_growth(add_totals(merged))
+    append_processed(rebuilt[rebuilt["quarter"].isin(keep)], name)
+
+    cube = build_growth_cube(merged)
+    append_processed(cube[cube["quarter"].isin(keep)], cube_name, index=True)
+
+    log.info(f"Delta applied: {len(delta):,} rows -> rewrote {keep} "
+             f"(read {len(context_labels)} of {len(on_disk)} stored quarters)")
+    return keep
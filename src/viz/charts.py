@@ -1,8 +1,81 @@
-import plotly.express as px
+import numpy as np
 import pandas as pd
 
-def line_trend(df: pd.DataFrame, x="date", y="registrations", color=None, title="Trend"):
-    fig = px.line(df, x=x, y=y, color=color, title=title)
+from src.perf import timed
+
+# Figure size is bounded regardless of the selection: at most MAX_SERIES lines
+# (the smallest are folded into "Others"), at most MAX_POINTS per line (LTTB
+# downsampling, ~one point per horizontal pixel), and WebGL (Scattergl) instead
+# of SVG once the figure still carries more than WEBGL_THRESHOLD points.
+WEBGL_THRESHOLD = 5_000
+MAX_POINTS = 1_000
+MAX_SERIES = 12
+MAX_BARS = 30
+OTHERS = "Others"
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the
+    visual shape of (x, y). x must be sorted and numeric.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = x.astype("float64") - float(x[0])
+    y = y.astype("float64")
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (the last point for the final bucket)
+        nlo, nhi = (hi, edges[i + 2]) if i < n_out - 3 else (n - 1, n)
+        ax, ay = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - ax) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ay - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def cap_series(df: pd.DataFrame, x, y, color, max_series: int = MAX_SERIES) -> pd.DataFrame:
+    """Keep the max_series - 1 largest series (by total y); sum the rest into "Others" per x."""
+    totals = df.groupby(color, observed=True)[y].sum()
+    if len(totals) <= max_series:
+        return df
+    keep = df[color].isin(totals.nlargest(max_series - 1).index)
+    others = df.loc[~keep].groupby(x, as_index=False, observed=True)[y].sum()
+    others[color] = OTHERS
+    top = df.loc[keep, [x, y, color]]
+    top = top.assign(**{color: top[color].astype(object)})
+    return pd.concat([top, others[[x, y, color]]], ignore_index=True)
+
+
+def downsample(df: pd.DataFrame, x, y, color=None, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """Per-series LTTB down to max_points rows; short series are untouched."""
+    d = df.dropna(subset=[y]).sort_values([color, x] if color else x, kind="stable")
+    groups = d.groupby(color, observed=True, sort=False).indices if color else {None: np.arange(len(d))}
+    xs = d[x].to_numpy()
+    xs = xs.view("int64") if np.issubdtype(xs.dtype, np.datetime64) else xs
+    ys = d[y].to_numpy()
+    take = [idx[lttb(xs[idx], ys[idx], max_points)] for idx in groups.values()]
+    if all(len(t) == len(g) for t, g in zip(take, groups.values())):
+        return d
+    return d.iloc[np.sort(np.concatenate(take))]
+
+
+@timed
+def line_trend(df: pd.DataFrame, x="date", y="registrations", color=None, title="Trend",
+               max_series: int = MAX_SERIES, max_points: int = MAX_POINTS):
+    d = df[[x, y] + ([color] if color else [])]
+    if color:
+        d = cap_series(d, x, y, color, max_series)
+    d = downsample(d, x, y, color, max_points)
+    import plotly.express as px  # ~150 ms; only once a chart is actually built
+    fig = px.line(d, x=x, y=y, color=color, title=title,
+                  render_mode="webgl" if len(d) > WEBGL_THRESHOLD else "svg")
     fig.update_traces(
         hovertemplate="<b>%{fullData.name}</b><br>Date=%{x|%Y-%m-%d}"
                       "<br>Registrations=%{y:,}<extra></extra>"
@@ -12,7 +85,13 @@ def line_trend(df: pd.DataFrame, x="date", y="registrations", color=None, title=
     fig.update_layout(legend_title_text="")
     return fig
 
-def bar_growth(df: pd.DataFrame, x, y="yoy_pct", color=None, title="Growth %"):
+@timed
+def bar_growth(df: pd.DataFrame, x, y="yoy_pct", color=None, title="Growth %", max_bars: int = MAX_BARS):
+    if len(df) > max_bars:
+        # growth % can't be summed into "Others": show the biggest movers either way
+        df = df.loc[df[y].abs().nlargest(max_bars).index]
+        title = f"{title} (top {max_bars} by |{y}|)"
+    import plotly.express as px
     fig = px.bar(df, x=x, y=y, color=color, title=title)
     fig.update_traces(hovertemplate="<b>%{x}</b><br>%{y:.2f}%<extra></extra>")
     fig.update_layout(legend_title_text="")
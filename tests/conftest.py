@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# src.config is read on first access: point DATA_DIR at a throwaway dir before any test imports src
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="vahan_test_")
+os.environ.pop("DATA_BACKEND", None)
+
+
+@pytest.fixture
+def processed_dir(tmp_path, monkeypatch):
+    """A fresh, empty processed dir for storage/pipeline writes."""
+    from src.data import storage
+    monkeypatch.setattr(storage, "PROCESSED_DIR", tmp_path)
+    storage.clear_cache()
+    return tmp_path
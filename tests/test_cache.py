@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src.cache import LRUCache, frame_nbytes
+
+from app.components import data_source
+
+
+def _frame(n):
+    return pd.DataFrame({"x": range(n)})
+
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    one = frame_nbytes(_frame(1000))
+    cache = LRUCache(max_items=100, max_bytes=int(2.5 * one))
+    cache.put("a", _frame(1000))
+    cache.put("b", _frame(1000))
+    assert cache.get("a") is not None      # a is now more recent than b
+    cache.put("c", _frame(1000))
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.nbytes == 2 * one
+    cache.put("a", _frame(10))             # replacing an entry re-counts its bytes
+    assert cache.nbytes == one + frame_nbytes(_frame(10))
+
+
+def test_oversized_entry_is_kept_alone():
+    cache = LRUCache(max_bytes=100)
+    cache.put("small", b"x" * 10)
+    cache.put("big", b"x" * 1000)
+    assert list(cache._data) == ["big"] and cache.nbytes == 1000
+
+
+def test_get_or_build_builds_once():
+    cache, calls = LRUCache(max_items=2), []
+    build = lambda: calls.append(1) or _frame(3)
+    first = cache.get_or_build("k", build)
+    assert cache.get_or_build("k", build) is first and len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+class _Upload:
+    def __init__(self, file_id, data):
+        self.file_id, self.data = file_id, data
+
+    def getvalue(self):
+        return self.data
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(data_source, "st", SimpleNamespace(session_state={}))
+    monkeypatch.setattr(data_source, "UPLOAD_CACHE", LRUCache(max_items=4))
+    return data_source.st.session_state
+
+
+def test_uploads_are_keyed_by_content(fresh_state):
+    csv = b"date,category,manufacturer,registrations\n2024-01-15,2W,Honda,100\n2024-04-15,2W,Honda,120\n"
+    key = data_source._parse_upload(_Upload("widget-1", csv))
+    # the same bytes from another session/widget are a hit; other bytes are not
+    assert data_source._parse_upload(_Upload("widget-2", csv)) == key
+    assert data_source.UPLOAD_CACHE.stats()["misses"] == 1
+    other = data_source._parse_upload(_Upload("widget-3", csv.replace(b"120", b"121")))
+    assert other != key and len(data_source.UPLOAD_CACHE) == 2
+    df, cube = data_source.UPLOAD_CACHE.get(key)
+    assert df["registrations"].sum() == 220 and "Honda" in cube.index.get_level_values("manufacturer")
+
+
+def test_views_are_memoized_on_filter_state_and_data_version(fresh_state, processed_dir, monkeypatch):
+    from src.data.clean import standardize
+    from src.data.fetch import generate_mock_quarterly
+    from src.data.storage import save_processed
+
+    monkeypatch.setattr(data_source, "VIEW_CACHE", LRUCache(max_items=16))
+    save_processed(standardize(generate_mock_quarterly()), "registrations.parquet")
+    builds = []
+
+    def view(**filters):
+        return data_source.cached_view("chart", "mock", lambda: builds.append(filters) or object(), **filters)
+
+    fig = view(categories=["2W"], date_range=("2024-01-01", "2024-12-31"))
+    assert view(categories=("2W",), date_range=["2024-01-01", "2024-12-31"]) is fig  # lists/tuples alike
+    assert view(categories=["4W"], date_range=("2024-01-01", "2024-12-31")) is not fig
+    assert view(categories=["2W"], date_range=("2024-01-01", "2024-12-31"), top_n=5) is not fig
+    assert len(builds) == 3
+
+    save_processed(standardize(generate_mock_quarterly()).head(10), "registrations.parquet")
+    assert view(categories=["2W"], date_range=("2024-01-01", "2024-12-31")) is not fig
+    assert len(builds) == 4
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.viz.charts import OTHERS, WEBGL_THRESHOLD, cap_series, downsample, line_trend, lttb
+
+
+@pytest.mark.parametrize("n, n_out", [(10_000, 500), (1_001, 1_000), (50, 3)])
+def test_lttb_keeps_endpoints_and_size(n, n_out):
+    rng = np.random.default_rng(0)
+    x = np.arange(n) * 10
+    y = rng.normal(size=n).cumsum()
+    idx = lttb(x, y, n_out)
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_keeps_the_spike():
+    y = np.zeros(10_000)
+    y[4321] = 100
+    assert 4321 in lttb(np.arange(10_000), y, 100)
+
+
+def test_short_series_are_untouched():
+    assert lttb(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def _series(n_makers, n_quarters=8):
+    dates = pd.period_range("2023Q1", periods=n_quarters, freq="Q").to_timestamp(how="end").normalize()
+    return pd.DataFrame([{"date": d, "manufacturer": f"M{m:02d}", "registrations": (m + 1) * 100 + q}
+                         for m in range(n_makers) for q, d in enumerate(dates)])
+
+
+def test_cap_series_folds_the_smallest_into_others():
+    df = _series(20)
+    out = cap_series(df, "date", "registrations", "manufacturer", max_series=5)
+    assert out["manufacturer"].nunique() == 5
+    assert set(out["manufacturer"]) == {"M19", "M18", "M17", "M16", OTHERS}
+    # per date the total is unchanged, Others included
+    pd.testing.assert_series_equal(out.groupby("date")["registrations"].sum(),
+                                   df.groupby("date")["registrations"].sum())
+    assert cap_series(df, "date", "registrations", "manufacturer", max_series=20) is df
+
+
+def test_downsample_bounds_each_series():
+    dates = pd.date_range("2000-01-01", periods=3_000, freq="D")
+    df = pd.concat([pd.DataFrame({"date": dates, "m": m, "v": np.sin(np.arange(3_000) / period)})
+                    for m, period in (("a", 50), ("b", 70))], ignore_index=True)
+    out = downsample(df, "date", "v", "m", max_points=200)
+    assert out.groupby("m").size().tolist() == [200, 200]
+    assert out.groupby("m")["date"].agg(["min", "max"]).eq([dates[0], dates[-1]]).all().all()
+
+
+def test_line_trend_switches_to_webgl_only_when_large():
+    small = line_trend(_series(3), color="manufacturer")
+    assert {t.type for t in small.data} == {"scatter"}
+    dates = pd.date_range("2000-01-01", periods=WEBGL_THRESHOLD, freq="D")
+    big = pd.concat([pd.DataFrame({"date": dates, "manufacturer": m, "registrations": np.arange(len(dates))})
+                     for m in ("a", "b")], ignore_index=True)
+    fig = line_trend(big, color="manufacturer", max_points=WEBGL_THRESHOLD)
+    assert {t.type for t in fig.data} == {"scattergl"}
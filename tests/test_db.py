@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.db import load_growth_cube_db, load_processed_db, query_growth, query_series_keys, save_to_db
+from src.data.fetch import generate_mock_quarterly
+from src.data.storage import PARTITION_COLS, load_processed, processed_filters, save_processed
+from src.features.growth import add_growth, add_totals, build_growth_cube
+
+KEYS = ["category", "manufacturer", "date"]
+VALUES = ["registrations", "prev_q", "qoq_pct", "prev_y", "yoy_pct"]
+
+
+@pytest.fixture
+def both(processed_dir, tmp_path):
+    """The mock data as parquet (04_process_csv) and in a SQLite DB (--db); returns the DB URL."""
+    raw = standardize(generate_mock_quarterly())
+    df = add_growth(add_totals(ensure_quarter_order(raw)))
+    save_processed(df, "registrations.parquet", partition_cols=PARTITION_COLS)
+    save_processed(build_growth_cube(df), "growth_cube.parquet", index=True, partition_cols=PARTITION_COLS)
+    url = f"sqlite:///{tmp_path / 'vahan.db'}"
+    save_to_db(raw, url=url, replace_all=True)
+    return url
+
+
+def _same(a: pd.DataFrame, b: pd.DataFrame):
+    a, b = (x.reset_index() if isinstance(x.index, pd.MultiIndex) else x for x in (a, b))
+    a, b = (x.astype({"category": str, "manufacturer": str}).sort_values(KEYS, ignore_index=True) for x in (a, b))
+    assert len(a) == len(b) and len(a)
+    assert (a[KEYS].astype(str).to_numpy() == b[KEYS].astype(str).to_numpy()).all()
+    for c in VALUES:
+        np.testing.assert_allclose(a[c].to_numpy(dtype=float), b[c].to_numpy(dtype=float), rtol=1e-5)
+
+
+def test_db_matches_parquet(both):
+    _same(query_growth(url=both), load_processed("registrations.parquet"))
+    _same(query_growth(include_all=True, url=both), load_processed("growth_cube.parquet"))
+
+
+@pytest.mark.parametrize("selection", [
+    dict(start="2024-04-01", categories=["2W"]),
+    dict(start="2025-01-01", end="2025-06-30", manufacturers=["Honda", "TOTAL"]),
+    dict(categories=["4W"], manufacturers=["Tata"]),
+])
+def test_filtered_db_matches_parquet(both, selection):
+    # lags of the first selected quarters come from rows outside the filter, as in the full build
+    filters = processed_filters(**selection)
+    _same(query_growth(filters, url=both), load_processed("registrations.parquet", filters=filters))
+
+
+def test_delta_replaces_only_its_series(both):
+    revised = standardize(generate_mock_quarterly())
+    revised = revised[(revised["quarter"] == "2024Q3") & (revised["category"] == "2W")].assign(registrations=1)
+    save_to_db(revised, url=both)
+    out = query_growth(processed_filters(start="2024-07-01", end="2024-09-30"), url=both)
+    by = out.astype({"category": str, "manufacturer": str}).set_index(["category", "manufacturer"])
+    assert (by.loc["2W", "registrations"].drop("TOTAL") == 1).all()
+    assert (by.loc["3W", "registrations"] > 1).all()
+
+
+def test_query_cache_follows_the_db_version(both):
+    filters = processed_filters(categories=["2W"])
+    first = load_processed_db(filters, url=both)
+    assert load_processed_db(list(filters), url=both) is first
+    cube = load_growth_cube_db(url=both)
+    assert load_growth_cube_db(url=both) is cube
+    save_to_db(standardize(generate_mock_quarterly()).head(4), url=both)
+    assert load_processed_db(filters, url=both) is not first
+    assert load_growth_cube_db(url=both) is not cube
+
+
+def test_series_keys_match_the_growth_rows(both):
+    keys = query_series_keys(url=both)
+    rows = query_growth(url=both)
+    rows = rows[rows["manufacturer"] != "TOTAL"].astype({"category": str, "manufacturer": str})
+    expected = rows.groupby(["category", "manufacturer"])["date"].agg(first_date="min", last_date="max").reset_index()
+    pd.testing.assert_frame_equal(keys.astype({"category": str, "manufacturer": str}), expected,
+                                  check_dtype=False)
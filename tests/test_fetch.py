@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+
+from src.data.fetch import (DEFAULT_URL_TEMPLATE, _fetch_all, extract_biggest_table, fetch_from_vahan, make_jobs,
+                            table_to_rows)
+from src.data.mock_vahan import render_report, report_counts, serve_mock_vahan
+
+
+class FlakyFetcher:
+    """Fails the first `fail` calls per job with `error`, then serves the mock report (or `html`)."""
+
+    retry_on = (OSError,)
+
+    def __init__(self, calls: dict, fail: int = 0, error=ConnectionError, html: str = None):
+        self.calls, self.fail, self.error, self.html = calls, fail, error, html
+
+    def get(self, job):
+        self.calls[job.key] = self.calls.get(job.key, 0) + 1
+        if self.calls[job.key] <= self.fail:
+            raise self.error("boom")
+        return self.html or render_report(job.state, job.category, job.year, job.month)
+
+    def close(self):
+        pass
+
+
+def _run(jobs, out_dir, **fetcher):
+    calls = {}
+    stats = asyncio.run(_fetch_all(jobs, lambda: FlakyFetcher(calls, **fetcher), out_dir, concurrency=2,
+                                   rate=0, retries=3, backoff=0))
+    return stats, calls
+
+
+def test_network_errors_are_retried(tmp_path):
+    jobs = make_jobs(["KA"], ["2W", "4W"], "2024-01", "2024-02")
+    stats, calls = _run(jobs, tmp_path, fail=2)
+    assert stats == {"done": 4, "failed": []}
+    assert set(calls.values()) == {3}
+    assert len(list(tmp_path.glob("*.csv"))) == 4
+
+
+def test_unparseable_pages_fail_at_once(tmp_path):
+    jobs = make_jobs(["KA"], ["2W"], "2024-01", "2024-01")
+    stats, calls = _run(jobs, tmp_path, html="<html><body><p>maintenance</p></body></html>")
+    assert stats["failed"] == [jobs[0].key] and calls == {jobs[0].key: 1}
+    stats, calls = _run(jobs, tmp_path, fail=1, error=ValueError)
+    assert stats["failed"] == [jobs[0].key] and calls == {jobs[0].key: 1}
+    assert not list(tmp_path.glob("*.csv"))
+
+
+def test_checkpoints_are_kept_per_source(tmp_path):
+    jobs = make_jobs(["KA"], ["2W"], "2024-01", "2024-02")
+    with serve_mock_vahan() as base:
+        template = DEFAULT_URL_TEMPLATE.replace("{base}", base)
+        df = fetch_from_vahan(jobs, url_template=template, mode="http", rate=0, out_dir=tmp_path)
+        # another source (here: padded reports) must not be served from the first one's checkpoints
+        padded = fetch_from_vahan(jobs, url_template=template + "&rows=6", mode="http", rate=0,
+                                  out_dir=tmp_path)
+    assert len(df) == 2 * len(report_counts("KA", "2W", 2024, 1))
+    assert len(padded) == 2 * 6
+    assert len([d for d in tmp_path.iterdir() if d.is_dir()]) == 2
+
+
+NESTED = """<html><body><table id="layout"><tr><td>
+<table><tr><th>State</th><th>Month</th></tr><tr><td>KA</td><td>2024-01</td></tr></table>
+<table id="report"><thead><tr><th>S No</th><th>Maker</th><th colspan="2">Registrations</th></tr>
+<tr><th></th><th></th><th>2023</th><th>2024</th></tr></thead>
+<tbody><tr><td>1</td><td>HONDA  MOTOR</td><td>1,200</td><td>1,500</td></tr>
+<tr><td>2</td><td>TVS</td><td>900</td><td>12,345</td></tr>
+<tr><td>3</td><td>HERO</td><td>50</td><td></td></tr>
+<tr><td></td><td>TOTAL</td><td>2,150</td><td>13,845</td></tr></tbody></table>
+</td></tr></table></body></html>"""
+
+
+def test_report_table_inside_a_layout_table():
+    # the layout table has one row of its own; the nested report's rows don't count for it
+    table = extract_biggest_table(NESTED)
+    assert list(table.columns) == ["S No", "Maker", "Registrations 2023", "Registrations 2024"]
+    assert table["Maker"].tolist() == ["HONDA MOTOR", "TVS", "HERO", "TOTAL"]
+    assert table["Registrations 2023"].tolist() == [1200, 900, 50, 2150]
+    assert table["Registrations 2024"].iloc[1] == 12345 and np.isnan(table["Registrations 2024"].iloc[2])
+    assert extract_biggest_table(NESTED, table_id="report").equals(table)
+
+
+def test_report_rows_from_a_colspan_header():
+    job = make_jobs(["KA"], ["2W"], "2024-01", "2024-01")[0]
+    rows = table_to_rows(extract_biggest_table(NESTED), job)
+    # the last numeric column is the count; the TOTAL row is dropped
+    assert rows["manufacturer"].tolist() == ["HONDA MOTOR", "TVS"]
+    assert rows["registrations"].tolist() == [1500, 12345]
+    assert (rows["date"] == "2024-01-01").all() and (rows["state"] == "KA").all()
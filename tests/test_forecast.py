@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.forecast import (MIN_BLOCK_SERIES, SEASON, _forecast_blocks, forecast_cube, forecast_grid,
+                                   naive, seasonal_drift, seasonal_naive)
+
+
+def _grid(n_s=6, n_q=10, seed=0):
+    rng = np.random.default_rng(seed)
+    Y = rng.integers(50, 500, size=(n_s, n_q)).astype(float)
+    Y[rng.random(Y.shape) < 0.15] = np.nan
+    Y[:, -1] = rng.integers(50, 500, size=n_s)  # every series observed in the last quarter
+    return Y
+
+
+def _last(row):
+    seen = row[~np.isnan(row)]
+    return seen[-1] if len(seen) else np.nan
+
+
+def test_vectorized_models_match_a_per_series_reference():
+    Y, horizon = _grid(), 6
+    fit, fc = naive(Y, horizon)
+    for y, f, p in zip(Y, fit, fc):
+        np.testing.assert_array_equal(f[1:], [_last(y[:t]) for t in range(1, len(y))])
+        np.testing.assert_array_equal(p, _last(y))
+
+    _, fc = seasonal_naive(Y, horizon)
+    for y, p in zip(Y, fc):
+        np.testing.assert_array_equal(p, [y[len(y) - SEASON + (h - 1) % SEASON] for h in range(1, horizon + 1)])
+
+    _, fc = seasonal_drift(Y, horizon)
+    for y, p in zip(Y, fc):
+        ratio = y[-1] / y[-1 - SEASON]
+        expected = [y[len(y) - SEASON + (h - 1) % SEASON] * ratio ** np.ceil(h / SEASON)
+                    for h in range(1, horizon + 1)]
+        np.testing.assert_allclose(p, expected)
+
+
+def test_cube_picks_the_exact_model():
+    dates = pd.period_range("2022Q1", periods=12, freq="Q").to_timestamp(how="end").normalize()
+    flat = pd.DataFrame({"category": "2W", "manufacturer": "Flat", "date": dates, "registrations": 100})
+    seasonal = flat.assign(manufacturer="Seasonal", registrations=np.tile([100, 200, 300, 400], 3))
+    fc = forecast_cube(pd.concat([flat, seasonal], ignore_index=True), horizon=5, workers=1)
+    by = fc.set_index(["manufacturer", "horizon"])
+    assert (by.loc["Flat", "forecast"] == 100).all()
+    assert by.loc["Seasonal", "forecast"].tolist() == [100, 200, 300, 400, 100]
+    assert set(by.loc["Seasonal", "model"]) == {"seasonal_naive"}
+    assert (fc["backtest_mape_pct"] == 0).all()
+    assert fc["quarter"].iloc[:5].tolist() == ["2025Q1", "2025Q2", "2025Q3", "2025Q4", "2026Q1"]
+
+
+@pytest.mark.parametrize("n_s, workers", [(10, 4), (3 * MIN_BLOCK_SERIES + 7, 2)])
+def test_blocks_match_one_pass(n_s, workers):
+    Y = _grid(n_s=n_s, n_q=12, seed=1)
+    whole, split = forecast_grid(Y, 4), _forecast_blocks(Y, 4, workers)
+    for k in whole:
+        np.testing.assert_array_equal(whole[k], split[k])
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from src.features.growth import add_growth
+
+
+def _series(quarters, values, manufacturer="Honda", category="2W"):
+    dates = pd.PeriodIndex(quarters, freq="Q").to_timestamp(how="end").normalize()
+    return pd.DataFrame({"date": dates, "category": category, "manufacturer": manufacturer,
+                         "registrations": values})
+
+
+def test_lags_follow_the_calendar_across_gaps():
+    # 2024Q2 is missing: 2024Q3's QoQ has no baseline, and YoY is matched by quarter, not position
+    df = _series(["2023Q1", "2023Q2", "2023Q3", "2024Q1", "2024Q3"], [100, 110, 120, 150, 180])
+    out = add_growth(df).set_index(df["date"].dt.to_period("Q").astype(str))
+    assert np.isnan(out.loc["2024Q3", "prev_q"])
+    assert np.isnan(out.loc["2024Q1", "prev_q"])  # 2023Q4 missing too
+    assert out.loc["2024Q1", "prev_y"] == 100
+    assert out.loc["2024Q3", "prev_y"] == 120
+    assert out.loc["2024Q3", "yoy_pct"] == np.float32(50.0)
+    assert out.loc["2023Q2", "qoq_pct"] == np.float32(10.0)
+
+
+def test_series_are_independent_and_input_order_is_kept():
+    a = _series(["2024Q1", "2024Q2"], [100, 200], manufacturer="Honda")
+    b = _series(["2024Q1", "2024Q2"], [10, 5], manufacturer="TVS")
+    df = pd.concat([a, b]).iloc[[3, 0, 2, 1]].reset_index(drop=True)
+    out = add_growth(df)
+    assert out["manufacturer"].tolist() == df["manufacturer"].tolist()
+    np.testing.assert_array_equal(out["prev_q"], [10, np.nan, np.nan, 100])
+    np.testing.assert_array_equal(out["qoq_pct"], np.array([-50, np.nan, np.nan, 100], dtype=np.float32))
+
+
+def test_null_keys_and_dates_belong_to_no_series():
+    df = pd.concat([_series(["2024Q1", "2024Q2"], [100, 200]),
+                    _series(["2024Q1", "2024Q2"], [7, 9], manufacturer=None),
+                    _series(["2024Q1"], [5]).assign(date=pd.NaT)], ignore_index=True)
+    out = add_growth(df)
+    assert out.loc[1, "prev_q"] == 100
+    assert out.loc[2:, ["prev_q", "qoq_pct", "prev_y", "yoy_pct"]].isna().all().all()
@@ -0,0 +1,23 @@
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+
+def _page():
+    import streamlit as st
+    from app.components.perf_panel import perf_begin, perf_end
+
+    perf = perf_begin("test")
+    if st.session_state.get("fail"):
+        raise RuntimeError("page bug")
+    perf_end(perf)
+
+
+def test_capture_left_by_a_failed_run_is_stopped_next_run():
+    at = AppTest.from_function(_page)
+    at.session_state["perf_on"] = at.session_state["perf_mem"] = at.session_state["fail"] = True
+    at.run()
+    assert at.exception and tracemalloc.is_tracing()
+    at.session_state["perf_on"] = at.session_state["fail"] = False
+    at.run()
+    assert not at.exception and not tracemalloc.is_tracing()
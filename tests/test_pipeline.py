@@ -0,0 +1,43 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.fetch import generate_mock_quarterly
+from src.data.storage import PARTITION_COLS, load_processed, save_processed
+from src.features.growth import add_growth, add_totals, build_growth_cube
+from src.pipeline import append_delta
+
+
+def _full_build(raw):
+    # what scripts/04_process_csv does without --append
+    df = add_growth(add_totals(ensure_quarter_order(standardize(raw))))
+    save_processed(df, "registrations.parquet", partition_cols=PARTITION_COLS)
+    save_processed(build_growth_cube(df), "growth_cube.parquet", index=True, partition_cols=PARTITION_COLS)
+
+
+def _read(name):
+    df = load_processed(name)
+    if isinstance(df.index, pd.MultiIndex):
+        df = df.reset_index()
+    df["quarter"] = df["quarter"].astype(str)
+    df["category"] = df["category"].astype(str)
+    df["manufacturer"] = df["manufacturer"].astype(str)
+    return df.sort_values(["quarter", "category", "manufacturer"]).reset_index(drop=True)[sorted(df.columns)]
+
+
+def test_append_delta_matches_full_rebuild(processed_dir):
+    raw = generate_mock_quarterly()
+    cut = raw["date"] >= "2025-01-01"
+    # delta: two new quarters plus a revision of an old one (lags of later quarters must follow)
+    revised = raw[(raw["quarter"] == "2024Q3") & (raw["manufacturer"] == "Honda")].assign(registrations=1)
+    delta = pd.concat([raw[cut], revised], ignore_index=True)
+
+    _full_build(raw[~cut])
+    append_delta(delta)
+    incremental = {n: _read(n) for n in ("registrations.parquet", "growth_cube.parquet")}
+
+    final = pd.concat([raw[~cut], delta]).drop_duplicates(["date", "category", "manufacturer"], keep="last")
+    _full_build(final)
+    for name, df in incremental.items():
+        assert_frame_equal(df, _read(name), check_dtype=False)
+    assert not list(processed_dir.glob("*.stage")) and not list(processed_dir.glob("*.old"))
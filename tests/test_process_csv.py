@@ -0,0 +1,17 @@
+import importlib
+
+import pytest
+
+from src.data.fetch import generate_mock_quarterly
+from src.data.storage import load_processed
+
+process_csv = importlib.import_module("scripts.04_process_csv")
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_glob_with_one_match(processed_dir, tmp_path, chunked):
+    raw = generate_mock_quarterly()
+    raw.to_csv(tmp_path / "vahan_raw_2025.csv", index=False)
+    process_csv.main(str(tmp_path / "vahan_raw_*.csv"), chunked=chunked, validate=False)
+    df = load_processed("registrations.parquet", columns=["manufacturer", "registrations"])
+    assert df.loc[df["manufacturer"] != "TOTAL", "registrations"].sum() == raw["registrations"].sum()
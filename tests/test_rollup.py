@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.fetch import generate_mock_quarterly, split_mock_monthly
+from src.data.storage import load_processed, save_processed
+from src.features import rollup
+from src.features.growth import add_growth, add_totals
+from src.features.rollup import ALL_LEVELS, RollupStore
+
+KEYS = ["category", "manufacturer", "quarter"]
+
+
+@pytest.fixture
+def bootstrapped(processed_dir, monkeypatch):
+    """What 01_bootstrap_mock writes: processed quarterly rows + rollups of the same counts split by month x RTO."""
+    monkeypatch.setattr(rollup, "PROCESSED_DIR", processed_dir)
+    raw = generate_mock_quarterly()
+    save_processed(add_growth(add_totals(ensure_quarter_order(standardize(raw)))), "registrations.parquet")
+    RollupStore.build(split_mock_monthly(raw)).save()
+    return RollupStore.load()
+
+
+def _processed():
+    df = load_processed("registrations.parquet")
+    df = df[df["manufacturer"] != "TOTAL"].astype({k: str for k in KEYS})
+    return df.set_index(KEYS).sort_index()
+
+
+def test_split_months_add_up_to_the_quarters():
+    raw = generate_mock_quarterly()
+    monthly = split_mock_monthly(raw)
+    assert (monthly["registrations"] >= 0).all()
+    assert monthly["registrations"].sum() == raw["registrations"].sum()
+    assert set(monthly["date"].dt.day) == {1}
+
+
+def test_rollup_totals_equal_processed_totals(bootstrapped):
+    processed = _processed()
+    national = bootstrapped.query("quarter", "national").astype({"category": str, "manufacturer": str})
+    national = national.rename(columns={"period": "quarter"}).astype({"quarter": str}).set_index(KEYS).sort_index()
+    assert national.index.equals(processed.index)
+    np.testing.assert_array_equal(national["registrations"], processed["registrations"])
+    total = processed["registrations"].sum()
+    for time, geo in ALL_LEVELS:
+        assert bootstrapped.query(time, geo)["registrations"].sum() == total, (time, geo)
+
+
+def test_rollup_growth_matches_processed_growth(bootstrapped):
+    processed = _processed()
+    g = bootstrapped.query("quarter", "national", growth=True).astype({"category": str, "manufacturer": str})
+    g = g.rename(columns={"period": "quarter"}).astype({"quarter": str}).set_index(KEYS).sort_index()
+    np.testing.assert_allclose(g["growth_4_pct"], processed["yoy_pct"], rtol=1e-5)
+    np.testing.assert_allclose(g["growth_1_pct"], processed["qoq_pct"], rtol=1e-5)
+
+
+def test_filtered_query_sums_its_states(bootstrapped):
+    by_state = bootstrapped.query("year", "state", categories=["2W"], start="2024-01-01", end="2024-12-31")
+    national = bootstrapped.query("year", "national", categories=["2W"], start="2024-01-01", end="2024-12-31")
+    assert set(by_state["period"].astype(str)) == {"2024"}
+    assert by_state["registrations"].sum() == national["registrations"].sum()
+    one = bootstrapped.query("year", "state", categories=["2W"], states=[by_state["state"].iloc[0]],
+                             start="2024-01-01", end="2024-12-31")
+    assert one["state"].nunique() == 1
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.fetch import generate_mock_quarterly
+from src.features.growth import ALL_CATEGORIES, add_growth, add_totals, build_growth_cube
+from src.features.share import ShareIndex, build_share_index
+
+
+def _index():
+    df = add_growth(add_totals(ensure_quarter_order(standardize(generate_mock_quarterly()))))
+    return build_share_index(build_growth_cube(df))
+
+
+def test_shares_sum_to_100_per_leaderboard():
+    idx = _index()
+    sums = idx.groupby(["date", "category"], observed=True)["share_pct"].sum()
+    np.testing.assert_allclose(sums.to_numpy(), 100, rtol=1e-4)
+    assert set(idx["category"].astype(str)) >= {"2W", ALL_CATEGORIES}
+
+
+def test_leaderboard_orders_by_rank_and_registrations():
+    index = ShareIndex(_index())
+    for category in index.categories():
+        board = index.leaderboard(category)
+        assert board["rank"].is_monotonic_increasing
+        assert board["registrations"].is_monotonic_decreasing
+        assert board["rank"].iloc[0] == 1
+    gain = index.leaderboard(ALL_CATEGORIES, by="gain")["share_chg_qoq_pp"]
+    assert gain.is_monotonic_decreasing
+    assert len(index.leaderboard(ALL_CATEGORIES, n=3)) == 3
+
+
+def test_rank_change_follows_the_previous_quarter():
+    # mock quarters are contiguous, so the previous row of a series is the previous quarter
+    idx = _index().sort_values(["category", "manufacturer", "date"])
+    before = idx.groupby(["category", "manufacturer"], observed=True)["rank"].shift()
+    np.testing.assert_array_equal(idx["rank_prev"], before)
+    np.testing.assert_array_equal(idx["rank_change"], before - idx["rank"])
+
+
+def test_empty_cube_gives_an_empty_index():
+    cube = build_growth_cube(add_growth(add_totals(ensure_quarter_order(
+        standardize(generate_mock_quarterly()))))).iloc[0:0]
+    idx = build_share_index(cube)
+    assert idx.empty and "rank_change" in idx.columns
+    assert ShareIndex(idx).latest is None
+    assert ShareIndex(idx).leaderboard().empty
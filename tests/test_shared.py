@@ -0,0 +1,56 @@
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src import config
+from src.data import shared
+from src.data.clean import standardize, ensure_quarter_order
+from src.data.fetch import generate_mock_quarterly
+from src.data.storage import PARTITION_COLS, dataset_version, load_processed, processed_filters, save_processed
+from src.features.growth import add_growth, add_totals, build_growth_cube
+
+
+@pytest.fixture
+def shm(processed_dir, tmp_path, monkeypatch):
+    """SHARED_DIR in a temp dir; snapshots keyed on this test's processed dir."""
+    monkeypatch.setattr(config, "SHARED_DIR", tmp_path / "shm", raising=False)
+    monkeypatch.setattr(config, "PROCESSED_DIR", processed_dir, raising=False)
+    shared.clear_shared()
+    df = add_growth(add_totals(ensure_quarter_order(standardize(generate_mock_quarterly()))))
+    save_processed(df, "registrations.parquet", partition_cols=PARTITION_COLS)
+    save_processed(build_growth_cube(df), "growth_cube.parquet", index=True, partition_cols=PARTITION_COLS)
+    yield
+    shared.clear_shared()
+
+
+@pytest.mark.parametrize("name", ["registrations.parquet", "growth_cube.parquet"])
+def test_snapshot_round_trip(shm, name):
+    out = shared.load_shared(name, dataset_version(name))
+    assert_frame_equal(out, load_processed(name), check_index_type=False)
+    assert shared.snapshot_path(name, dataset_version(name)).exists()
+
+
+def test_filtered_snapshot_matches_parquet_pushdown(shm):
+    name, version = "registrations.parquet", dataset_version("registrations.parquet")
+    filters = processed_filters(start="2024-07-01", categories=["2W", "4W"], manufacturers=["Honda", "TOTAL"])
+    columns = ["date", "category", "manufacturer", "registrations", "yoy_pct"]
+    out = shared.load_shared(name, version, filters=filters, columns=columns)
+    expected = load_processed(name, filters=filters, columns=columns)
+    key = ["category", "manufacturer", "date"]
+    assert_frame_equal(out[columns].sort_values(key, ignore_index=True),
+                       expected.sort_values(key, ignore_index=True), check_categorical=False)
+
+
+def test_unfiltered_reads_are_views_of_the_mapping(shm):
+    out = shared.load_shared("registrations.parquet", dataset_version("registrations.parquet"))
+    assert not out["registrations"].to_numpy().flags.writeable
+
+
+def test_new_version_replaces_the_old_snapshot(shm):
+    name = "registrations.parquet"
+    old = dataset_version(name)
+    shared.load_shared(name, old)
+    save_processed(standardize(generate_mock_quarterly()).head(20), name, partition_cols=PARTITION_COLS)
+    new = dataset_version(name)
+    assert len(shared.load_shared(name, new)) == 20
+    assert shared.snapshot_path(name, new).exists() and not shared.snapshot_path(name, old).exists()
+    assert [p.name for p in config.SHARED_DIR.iterdir()] == [shared.snapshot_dir().name]
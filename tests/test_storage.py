@@ -0,0 +1,59 @@
+import pytest
+
+from src.data.clean import standardize
+from src.data.fetch import generate_mock_quarterly
+from src.data.storage import (PARTITION_COLS, dataset_version, load_processed, load_processed_cached,
+                              processed_filters, save_processed)
+
+NAME = "registrations.parquet"
+
+
+def _save(df):
+    save_processed(df, NAME, partition_cols=PARTITION_COLS)
+
+
+def test_cached_frame_is_reused_until_the_dataset_changes(processed_dir):
+    df = standardize(generate_mock_quarterly())
+    _save(df)
+    first = load_processed_cached(NAME)
+    assert load_processed_cached(NAME) is first
+    v1 = dataset_version(NAME)
+
+    _save(df[df["category"] != "3W"])
+    assert dataset_version(NAME) != v1
+    fresh = load_processed_cached(NAME)
+    assert fresh is not first
+    assert len(fresh) == (df["category"] != "3W").sum()
+    assert set(fresh["category"].astype(str)) == {"2W", "4W"}
+
+
+def test_filters_and_columns_are_cached_separately(processed_dir):
+    _save(standardize(generate_mock_quarterly()))
+    everything = load_processed_cached(NAME)
+    two_w = load_processed_cached(NAME, filters=[("category", "in", ["2W"])], columns=["manufacturer"])
+    assert list(two_w.columns) == ["manufacturer"]
+    assert len(two_w) == (everything["category"] == "2W").sum()
+    assert load_processed_cached(NAME, filters=[("category", "in", ["2W"])], columns=["manufacturer"]) is two_w
+    assert load_processed_cached(NAME) is everything
+
+
+def test_filters_prune_partitions_and_columns(processed_dir):
+    df = standardize(generate_mock_quarterly())
+    _save(df)
+    # a partition the filter excludes is never opened: corrupting it must not matter
+    # (not the first one, which dataset discovery reads the schema from)
+    for f in (processed_dir / NAME / "quarter=2024Q2").rglob("*.parquet"):
+        f.write_bytes(b"not parquet")
+    filters = processed_filters(start="2025-01-01", categories=["2W"], manufacturers=["Honda", "TVS"])
+    out = load_processed(NAME, filters=filters, columns=["date", "manufacturer", "registrations"])
+    expected = df[(df["date"] >= "2025-01-01") & (df["category"] == "2W")
+                  & df["manufacturer"].isin(["Honda", "TVS"])]
+    assert list(out.columns) == ["date", "manufacturer", "registrations"]
+    assert sorted(out["registrations"]) == sorted(expected["registrations"])
+    with pytest.raises(Exception):
+        load_processed(NAME)
+
+
+def test_empty_selection_reads_nothing(processed_dir):
+    _save(standardize(generate_mock_quarterly()))
+    assert load_processed(NAME, filters=processed_filters(manufacturers=[])).empty
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from src.data.ingest_upload import parse_csv_chunked, parse_granular_csv, parse_many
+from src.data.validate import validate_csvs
+
+HEADER = "date,state,category,manufacturer,registrations\n"
+
+
+@pytest.fixture
+def csv(tmp_path):
+    def write(body: str, name: str = "regs.csv"):
+        path = tmp_path / name
+        path.write_text(HEADER + body)
+        return path
+    return write
+
+
+def _checks(result, severity):
+    return set(result.issues.loc[result.issues["severity"] == severity, "check"].astype(str))
+
+
+def test_clean_file_matches_parse_csv_chunked(csv):
+    path = csv("2024-01-15,KA,2W,Honda,100\n2024-02-15,KA,2W,Honda,50\n2024-04-01,MH,4W,Tata,7\n")
+    result = validate_csvs(path, chunksize=2)
+    assert result.n_quarantined == 0
+    assert result.report["issues"] == {}
+    expected = parse_csv_chunked(path)
+    assert result.data["registrations"].tolist() == expected["registrations"].tolist()
+    assert result.data["quarter"].tolist() == ["2024Q1", "2024Q2"]
+
+
+@pytest.mark.parametrize("row, check", [
+    ("2024-13-01,KA,2W,Honda,5", "bad_date"),
+    ("2024-03-01,KA,2W,Honda,abc", "non_numeric_count"),
+    ("2024-03-01,KA,2W,Honda,-3", "negative_count"),
+    ("2024-03-01,KA,,Honda,5", "missing_category"),
+    ("2024-03-01,KA,2W,  ,5", "missing_manufacturer"),
+])
+def test_unusable_rows_are_quarantined(csv, row, check):
+    path = csv(f"2024-01-15,KA,2W,Honda,100\n{row}\n")
+    result = validate_csvs(path, chunksize=1)
+    assert result.n_quarantined == 1
+    assert _checks(result, "error") == {check}
+    assert result.issues.loc[result.issues["check"] == check, "line"].tolist() == [3]
+    assert result.quarantined_rows(path) == [2]
+    assert result.data["registrations"].tolist() == [100]
+
+
+def test_unknown_categories_are_kept_and_aliases_folded(csv):
+    path = csv("2024-01-15,KA,Two Wheeler,Honda,10\n2024-01-15,KA,LMV,Tata,7\n2024-02-15,KA,LMV,Tata,1\n")
+    result = validate_csvs(path, chunksize=2)
+    assert result.n_quarantined == 0
+    assert _checks(result, "warning") == {"unknown_category"}
+    assert result.report["issues"]["unknown_category"] == 2
+    assert dict(zip(result.data["category"], result.data["registrations"])) == {"2W": 10, "LMV": 8}
+
+
+def test_duplicates_are_summed_and_reported(csv):
+    # keys compare after normalization: 2024/01/15 is 2024-01-15, across chunks too
+    path = csv("2024-01-15,KA,2W,Honda,100\n2024-01-15,KA,2W,Honda,50\n"
+               "2024-01-15,MH,2W,Honda,1\n2024/01/15,KA,2W,Honda ,5\n2024-01-16,KA,2W,Honda,2\n")
+    result = validate_csvs(path, chunksize=3)
+    assert result.n_quarantined == 0
+    dups = result.issues[result.issues["check"] == "duplicate"]
+    assert dups["line"].tolist() == [3, 5]
+    assert dups["detail"].str.contains("line 2").all()
+    assert result.data["registrations"].tolist() == [158]
+
+
+def test_later_file_wins_per_quarter(csv):
+    csv("2024-01-15,KA,2W,Honda,100\n2024-04-15,KA,2W,Honda,80\n", name="a.csv")
+    b = csv("2024-02-15,KA,2W,Honda,120\n", name="b.csv")
+    result = validate_csvs(b.parent, chunksize=10, workers=1)
+    assert result.data["registrations"].tolist() == [120, 80]
+
+
+def test_workers_and_chunks_match_parse_many(csv):
+    # validation replaces the --chunked / --workers parse, so it must give the same rows
+    csv("2024-01-15,KA,2W,Honda,100\n2024-04-15,KA,2W,Honda,80\n2024-04-15,MH,4W,Tata,9\n", name="a.csv")
+    b = csv("2024-02-15,KA,2W,Honda,120\n2024-08-01,KA,2W,TVS,4\n", name="b.csv")
+    result = validate_csvs(b.parent, chunksize=1, workers=2)
+    expected = parse_many(b.parent, workers=2, chunked=True, chunksize=1)
+    assert result.data.astype(str).values.tolist() == expected.astype(str).values.tolist()
+
+
+def test_quarantined_rows_feed_granular_skiprows(csv):
+    path = csv("2024-01-15,KA,2W,Honda,100\n2024-13-01,KA,2W,Honda,5\n2024-02-15,KA,2W,Honda,3\n")
+    result = validate_csvs(path, chunksize=2)
+    granular = parse_granular_csv(path, skiprows=result.quarantined_rows(path))
+    assert granular["registrations"].sum() == result.data["registrations"].sum() == 103
+    with pytest.raises(ValueError):
+        parse_granular_csv(path)
+
+
+def test_series_checks_flag_gaps_and_jumps(csv):
+    rows = [f"{q},KA,2W,Honda,{v}" for q, v in
+            [("2023-02-01", 1000), ("2023-05-01", 1000), ("2023-08-01", 1000), ("2024-02-01", 9000)]]
+    result = validate_csvs(csv("\n".join(rows) + "\n"), chunksize=10)
+    issues = result.issues.set_index("check")
+    assert issues.loc["missing_quarter", "quarter"] == "2023Q4"
+    assert issues.loc["outlier_jump", "quarter"] == "2024Q1"
+    assert result.n_quarantined == 0 and np.all(result.data["registrations"] > 0)